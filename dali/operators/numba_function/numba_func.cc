@@ -45,6 +45,13 @@ output can be accessed by ``outs[1][0]``.
 
 If no setup function provided, the output shape and data type will be the same as the input.
 
+The compiled functions are cached in memory and on disk, in the ``numba_function`` subdirectory
+of ``NUMBA_CACHE_DIR`` (if set) or ``~/.cache/dali``, so that other processes do not compile
+them again. The functions are identified by their code and the values of the globals they use,
+so changing a global compiles them again. If a global cannot be pickled, nothing is cached.
+The cache keeps the files of at most 256 most recently used functions and can
+be safely removed.
+
 .. note::
     This operator is experimental and its API might change without notice.
 
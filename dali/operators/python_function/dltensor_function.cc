@@ -26,6 +26,8 @@ DALI_SCHEMA(DLTensorPythonFunctionImpl)
     .AddArg("function_id", R"code(Id of the python function)code", DALI_INT64)
     .AddOptionalArg("num_outputs", R"code(Number of outputs)code", 1)
     .AddArg("batch_processing", "Batch processing.", DALI_BOOL)
+    .AddOptionalArg("batch_layout", R"code(Passes the batches of contiguous, uniformly shaped
+samples as single DLPack tensors if set to ``"dense"``.)code", "list")
     .NumInput(0, 256)
     .OutputFn([](const OpSpec &spec) {return spec.GetArgument<int>("num_outputs");})
     .AddOptionalArg<std::vector<TensorLayout>>("output_layouts",
@@ -73,9 +75,15 @@ If set to True, the function will receive its arguments as lists of DLPack tenso
 namespace detail {
 
 template <>
-py::list PrepareDLTensorInputs<CPUBackend>(HostWorkspace &ws) {
+py::list PrepareDLTensorInputs<CPUBackend>(HostWorkspace &ws, bool dense_batch) {
   py::list input_tuple;
   for (Index idx = 0; idx < ws.NumInput(); ++idx) {
+    auto &tvec = ws.InputRef<CPUBackend>(idx);
+    if (dense_batch && IsDenseBatch(tvec)) {
+      input_tuple.append(DenseBatchToDLPackView<CPUBackend>(
+          const_cast<TensorVector<CPUBackend>&>(tvec), 0));
+      continue;
+    }
     py::list dl_tensor_list;
     for (Index i = 0; i < ws.GetInputBatchSize(idx); ++i) {
       auto &t = ws.Input<CPUBackend>(idx, i);
@@ -88,10 +96,15 @@ py::list PrepareDLTensorInputs<CPUBackend>(HostWorkspace &ws) {
 }
 
 template <>
-py::list PrepareDLTensorInputs<GPUBackend>(DeviceWorkspace &ws) {
+py::list PrepareDLTensorInputs<GPUBackend>(DeviceWorkspace &ws, bool dense_batch) {
   py::list input_tuple;
   for (Index idx = 0; idx < ws.NumInput(); ++idx) {
     auto &tlist = ws.InputRef<GPUBackend>(idx);
+    if (dense_batch && IsDenseBatch(tlist)) {
+      input_tuple.append(DenseBatchToDLPackView<GPUBackend>(
+          const_cast<TensorList<GPUBackend>&>(tlist), tlist.device_id()));
+      continue;
+    }
     py::list dl_tensor_list = TensorListToDLPackView(tlist);
     input_tuple.append(dl_tensor_list);
   }
@@ -141,6 +154,34 @@ TensorListShape<> GetDLTensorListShape(const std::vector<DLMTensorPtr>& dl_tenso
   return list_shape;
 }
 
+TensorListShape<> GetDenseDLTensorShape(const DLMTensorPtr &dl_tensor) {
+  auto &tensor = dl_tensor->dl_tensor;
+  TensorShape<> sample_shape(tensor.shape + 1, tensor.shape + tensor.ndim);
+  return uniform_list_shape(tensor.shape[0], sample_shape);
+}
+
+template <>
+void CopyDenseOutputData(TensorVector<CPUBackend> &output, DLMTensorPtr &dl_tensor,
+                         int batch_size, HostWorkspace &workspace) {
+  auto &thread_pool = workspace.GetThreadPool();
+  auto out_shape = output.shape();
+  for (int i = 0; i < batch_size; ++i) {
+    thread_pool.AddWork([&, i](int) {
+      CopyDenseDlTensorSample<CPUBackend>(output[i].raw_mutable_data(), dl_tensor, i);
+    }, out_shape.tensor_size(i));
+  }
+  thread_pool.RunAll();
+}
+
+template <>
+void CopyDenseOutputData(TensorList<GPUBackend>& output, DLMTensorPtr &dl_tensor,
+                         int batch_size, DeviceWorkspace &workspace) {
+  for (int i = 0; i < batch_size; ++i) {
+    CopyDenseDlTensorSample<GPUBackend>(output.raw_mutable_tensor(i), dl_tensor, i,
+                                        workspace.stream());
+  }
+}
+
 template <>
 void CopyOutputData(TensorVector<CPUBackend> &output, std::vector<DLMTensorPtr> &dl_tensors,
                    int batch_size, HostWorkspace &workspace) {
@@ -17,6 +17,7 @@
 #include <dali/util/pybind.h>
 #include <pybind11/embed.h>
 #include <pybind11/stl.h>
+#include <memory>
 #include <vector>
 #include <utility>
 #include <string>
@@ -76,6 +77,93 @@ std::vector<DLMTensorPtr> CastToDLTensorList(py::list &list, Index exp_size, Ind
 
 TensorListShape<> GetDLTensorListShape(const std::vector<DLMTensorPtr> &dl_tensors);
 
+template <typename Backend>
+DLMTensorPtr CastToDenseDLTensor(const py::capsule &capsule, Index exp_size, Index out_idx) {
+  auto caps = capsule;
+  auto result = DLMTensorPtrFromCapsule(caps);
+  auto &dl_tensor = result->dl_tensor;
+  DALI_ENFORCE(dl_tensor.device.device_type == Backend2DLDevice<Backend>(),
+               "Wrong output backend.");
+  DALI_ENFORCE(dl_tensor.ndim >= 1 && dl_tensor.shape[0] == exp_size,
+      "Function called by DLTensorPythonFunction returned a dense batch of wrong size at idx "
+      + std::to_string(out_idx) + ". The outermost dimension should be equal to the batch size "
+      + std::to_string(exp_size) + ".");
+  return result;
+}
+
+/**
+ * @brief Returns the shape of the samples of the dense batch
+ * (the outermost dimension of the DLPack tensor indexes the samples).
+ */
+TensorListShape<> GetDenseDLTensorShape(const DLMTensorPtr &dl_tensor);
+
+/**
+ * @brief Copies the `sample_idx`-th sample of the dense batch stored in the DLPack tensor.
+ */
+template <typename Backend>
+void CopyDenseDlTensorSample(void *out_data, DLMTensorPtr &dlm_tensor_ptr, Index sample_idx,
+                             cudaStream_t stream = 0) {
+  auto &dl_tensor = dlm_tensor_ptr->dl_tensor;
+  auto item_size = dl_tensor.dtype.bits / 8;
+  int sample_ndim = dl_tensor.ndim - 1;
+  const Index *sample_shape = dl_tensor.shape + 1;
+  Index sample_stride = volume(sample_shape, sample_shape + sample_ndim) * item_size;
+  std::vector<Index> strides;
+  if (dl_tensor.strides) {
+    sample_stride = dl_tensor.strides[0] * item_size;
+    // scalar samples are copied as they are
+    if (sample_ndim > 0) {
+      strides.resize(sample_ndim);
+      for (int i = 0; i < sample_ndim; ++i) strides[i] = dl_tensor.strides[i + 1] * item_size;
+    }
+  }
+  auto *data = static_cast<const uint8_t *>(dl_tensor.data) + dl_tensor.byte_offset
+               + sample_idx * sample_stride;
+  CopyWithStride<Backend>(out_data, data, strides.empty() ? nullptr : strides.data(),
+                          sample_shape, sample_ndim, item_size, stream);
+}
+
+/**
+ * @brief Checks whether the samples of the batch have the same shape and are stored
+ * back to back in memory, so the batch can be viewed as a single tensor.
+ */
+template <typename Batch>
+bool IsDenseBatch(const Batch &batch) {
+  auto num_samples = batch.num_samples();
+  if (num_samples == 0) return true;
+  const auto &sample_shape = batch.tensor_shape(0);
+  auto sample_bytes = volume(sample_shape) * TypeTable::GetTypeInfo(batch.type()).size();
+  auto *first = static_cast<const uint8_t *>(batch.raw_tensor(0));
+  for (size_t i = 1; i < num_samples; ++i) {
+    if (batch.tensor_shape(i) != sample_shape ||
+        static_cast<const uint8_t *>(batch.raw_tensor(i)) != first + i * sample_bytes)
+      return false;
+  }
+  return true;
+}
+
+/**
+ * @brief Wraps a dense batch (see `IsDenseBatch`) into a single DLPack tensor, without copying.
+ * The outermost dimension of the tensor indexes the samples.
+ */
+template <typename Backend, typename Batch>
+py::capsule DenseBatchToDLPackView(Batch &batch, int device_id) {
+  int num_samples = batch.num_samples();
+  TensorShape<> sample_shape;
+  void *data = nullptr;
+  if (num_samples > 0) {
+    sample_shape = batch.tensor_shape(0);
+    data = batch.raw_mutable_tensor(0);
+  } else {
+    sample_shape.resize(batch.sample_dim());
+    for (int d = 0; d < sample_shape.size(); ++d) sample_shape[d] = 0;
+  }
+  auto dl_tensor = MakeDLTensor(data, batch.type(), std::is_same<Backend, GPUBackend>::value,
+                                device_id, std::make_unique<DLTensorResource>(
+                                    shape_cat(static_cast<int64_t>(num_samples), sample_shape)));
+  return DLTensorToCapsule(std::move(dl_tensor));
+}
+
 template <typename Backend>
 void CopyDlTensor(void *out_data, DLMTensorPtr &dlm_tensor_ptr, cudaStream_t stream = 0) {
   auto &dl_tensor = dlm_tensor_ptr->dl_tensor;
@@ -91,8 +179,12 @@ void CopyDlTensor(void *out_data, DLMTensorPtr &dlm_tensor_ptr, cudaStream_t str
   }
 }
 
+/**
+ * @brief Prepares the input batches as lists of DLPack tensors or, if `dense_batch` is set,
+ * the batches of contiguous, uniformly shaped samples as single DLPack tensors.
+ */
 template <typename Backend>
-py::list PrepareDLTensorInputs(workspace_t<Backend> &ws);
+py::list PrepareDLTensorInputs(workspace_t<Backend> &ws, bool dense_batch = false);
 
 template <typename Backend>
 py::list PrepareDLTensorInputsPerSample(workspace_t<Backend> &ws);
@@ -101,10 +193,24 @@ template <typename Workspace, typename Output>
 void CopyOutputData(Output& output, std::vector<DLMTensorPtr> &dl_tensors,
                     int batch_size, Workspace &workspace);
 
+template <typename Workspace, typename Output>
+void CopyDenseOutputData(Output& output, DLMTensorPtr &dl_tensor,
+                         int batch_size, Workspace &workspace);
+
 template <typename Backend>
 void PrepareOutputs(workspace_t<Backend> &ws, const py::object &output_o, int batch_size) {
   py::tuple return_tuple = (py::tuple::check_(output_o)) ? output_o : py::make_tuple(output_o);
   for (Index idx = 0; idx < ws.NumOutput(); ++idx) {
+    if (py::capsule::check_(return_tuple[idx])) {
+      // a dense batch returned as a single tensor
+      auto dl_tensor = CastToDenseDLTensor<Backend>(
+          py::cast<py::capsule>(return_tuple[idx]), batch_size, idx);
+      auto &tlist = ws.template OutputRef<Backend>(idx);
+      tlist.set_type(DLToDALIType(dl_tensor->dl_tensor.dtype));
+      tlist.Resize(GetDenseDLTensorShape(dl_tensor));
+      CopyDenseOutputData(tlist, dl_tensor, batch_size, ws);
+      continue;
+    }
     py::list dl_list = py::cast<py::list>(return_tuple[idx]);
     auto dl_tensors = CastToDLTensorList<Backend>(dl_list, batch_size, idx);
     if (dl_tensors.empty()) continue;
@@ -172,6 +278,7 @@ class DLTensorPythonFunctionImpl : public Operator<Backend> {
           reinterpret_cast<PyObject*>(spec.GetArgument<int64_t>("function_id")))) {
     synchronize_stream_ = spec.GetArgument<bool>("synchronize_stream");
     batch_processing = spec.GetArgument<bool>("batch_processing");
+    dense_batch_ = spec.GetArgument<std::string>("batch_layout") == "dense";
     size_t num_outputs = spec.GetArgument<int>("num_outputs");
     bool listed_layouts = spec.TryGetRepeatedArgument(output_layouts_, "output_layouts");
     if (!listed_layouts && spec.HasArgument("output_layouts")) {
@@ -197,7 +304,7 @@ class DLTensorPythonFunctionImpl : public Operator<Backend> {
     try {
       detail::StreamSynchronizer<Backend> sync(ws, synchronize_stream_);
       if (batch_processing) {
-        auto input = detail::PrepareDLTensorInputs<Backend>(ws);
+        auto input = detail::PrepareDLTensorInputs<Backend>(ws, dense_batch_);
         output_o = python_function(*input);
       } else {
         auto inputs = detail::PrepareDLTensorInputsPerSample<Backend>(ws);
@@ -245,6 +352,7 @@ class DLTensorPythonFunctionImpl : public Operator<Backend> {
   py::object python_function;
   bool synchronize_stream_;
   bool batch_processing;
+  bool dense_batch_;
   std::vector<TensorLayout> output_layouts_;
 
  private:
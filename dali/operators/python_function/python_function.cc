@@ -57,7 +57,24 @@ The function should not modify input tensors.
 once per batch or separately for every sample in the batch.
 
 If set to True, the function will receive its arguments as lists of NumPy or CuPy arrays,
-for CPU and GPU backend, respectively.)code", false);
+for CPU and GPU backend, respectively.)code", false)
+        .AddOptionalArg("batch_layout", R"code(Determines how the batches are passed to
+the function when ``batch_processing`` is set to True.
+
+If set to ``"list"``, every input is passed as a list of samples and every output should be
+returned as a list of samples.
+If set to ``"dense"``, every input batch, which must consist of samples of the same shape, is
+passed as a single array with the outermost dimension indexing the samples. When the samples are
+stored contiguously in memory, the array is a view of the input data, so no copy is made.
+The outputs can be returned as single arrays as well, which are split into samples along the
+outermost dimension.)code", "list")
+        .AddOptionalArg("parallel", R"code(Runs the function in the Python worker processes
+of the pipeline (see ``py_num_workers`` and ``py_start_method`` arguments of the Pipeline).
+
+Supported only for the CPU operator with ``batch_processing`` set to False and at least
+one input. The samples of a batch are distributed among the workers and passed to them through
+the shared memory. The outputs are returned in the order of the samples.
+If ``py_start_method="spawn"`` is used, the function must be picklable.)code", false);
 
 DALI_SCHEMA(TorchPythonFunction)
         .DocStr(R"code(Executes a function that is operating on Torch tensors.
@@ -70,6 +87,13 @@ as PyTorch tensors.)code")
         .NoPrune()
         .AddParent("PythonFunctionBase")
         .AddOptionalArg("batch_processing", R"code(Determines whether the function gets
-an entire batch as an input.)code", false);
+an entire batch as an input.)code", false)
+        .AddOptionalArg("batch_layout", R"code(Determines how the batches are passed to
+the function when ``batch_processing`` is set to True.
+
+If set to ``"list"``, every input is passed as a list of tensors.
+If set to ``"dense"``, every input batch, which must consist of samples of the same shape, is
+passed as a single tensor with the outermost dimension indexing the samples and the outputs can
+be returned as single tensors.)code", "list");
 
 }  // namespace dali
@@ -26,13 +26,18 @@ class ScheduledTasks:
         Index of the memory chunk in the circular buffer to store the output in
     `tasks` : nvidia.dali.types.SampleInfo list
         List of task ordered to be computed.
+    `inputs` : SharedBatchMeta, optional
+        Description of the input batch written by the pool into the shared memory.
+        If specified, each task is a one-element tuple with the index of the sample
+        in the input batch, whose elements are passed to the callback as arguments.
     """
 
-    def __init__(self, context_i, batch_i, dst_chunk_i, tasks):
+    def __init__(self, context_i, batch_i, dst_chunk_i, tasks, inputs=None):
         self.context_i = context_i
         self.batch_i = batch_i
         self.dst_chunk_i = dst_chunk_i
         self.tasks = tasks
+        self.inputs = inputs
 
 
 class CompletedTasks:
@@ -16,13 +16,15 @@ import os
 import socket
 import threading
 import multiprocessing
+from multiprocessing import reduction
 from collections import OrderedDict
 from nvidia.dali import backend as _b
 from nvidia.dali import pickling
 from nvidia.dali._multiproc.worker import worker
 from nvidia.dali._multiproc.messages import ScheduledTasks
-from nvidia.dali._multiproc.shared_batch import SharedBatchMeta
-from nvidia.dali._multiproc.shared_batch import deserialize_batch, import_numpy
+from nvidia.dali._multiproc.shared_batch import SharedBatchMeta, SharedMemChunk
+from nvidia.dali._multiproc.shared_batch import deserialize_batch, import_numpy, write_batch
+from nvidia.dali._multiproc.shared_batch import write_buffers
 from nvidia.dali._multiproc import shared_mem
 
 
@@ -216,14 +218,20 @@ starts thread keeping track of running processes and initializes communication.
         self._from_tracker = None
         self._to_tracker = None
         self._tracker_thread = None
+        shared_buffers = None
+        if callback_pickler is None:
+            callbacks_arg = callbacks
+        else:
+            # The callbacks are serialized once for all the workers. Large buffers referenced
+            # by them (e.g. NumPy arrays) are passed in a single shared memory chunk
+            # that the workers map instead of unpickling their own copies.
+            data, buffers = callback_pickler.dumps_out_of_band(callbacks)
+            shared_buffers, layout = write_buffers(buffers)
+            callbacks_arg = (data, layout)
         for i in range(self._num_workers):
             task_r, task_w = mp.Pipe(duplex=False)
             res_r, res_w = mp.Pipe(duplex=False)
             sock_reader, sock_writer = socket.socketpair()
-            if callback_pickler is None:
-                callbacks_arg = callbacks
-            else:
-                callbacks_arg = callback_pickler.dumps(callbacks)
             process = mp.Process(
                 target=worker,
                 args=(i, callbacks_arg, prefetch_queue_depths, initial_chunk_size,
@@ -234,6 +242,11 @@ starts thread keeping track of running processes and initializes communication.
             self._processes.append(process)
             self._socks.append(sock_reader)
         self._start_processes()
+        if shared_buffers is not None:
+            for sock, process in zip(self._socks, self._processes):
+                reduction.send_handle(sock, shared_buffers.handle, process.pid)
+            # the workers hold their own handles, the memory is released when all of them exit
+            shared_buffers.close()
 
     def get_recv_pipes(self):
         """Return all pipes with incoming communication.
@@ -368,6 +381,12 @@ class WorkerPool:
         self.pool = pool
         self.queue_depths = queue_depths
         self.rec_pipes = self.pool.get_recv_pipes()
+        # per-context shared memory chunks with the input batches, created on the first use
+        self.input_chunks = {}
+        self.input_handles_sent = set()
+        # Contexts can be used from different threads (e.g. by the generators of DALIDataset
+        # inputs), the pipes and sockets of the workers are shared by all of them
+        self._lock = threading.RLock()
 
     @classmethod
     def from_groups(
@@ -391,12 +410,21 @@ class WorkerPool:
         `initial_chunk_size` : int
             Initial size of each shared memory chunk.
         """
-        callbacks = [group.callback for group in groups]
+        callbacks = [group.parallel_callback for group in groups]
         queue_depths = [keep_alive_queue_size + group.prefetch_queue_depth for group in groups]
         pool = ProcPool(callbacks, queue_depths, num_workers, start_method, initial_chunk_size, py_callback_pickler)
         return cls(len(callbacks), queue_depths, pool)
 
-    def schedule_batch(self, context_i, batch_i, dst_chunk_i, tasks):
+    @property
+    def num_workers(self):
+        return self.pool.num_workers
+
+    @property
+    def lock(self):
+        """Lock serializing scheduling and receiving of the batches of all the contexts."""
+        return self._lock
+
+    def schedule_batch(self, context_i, batch_i, dst_chunk_i, tasks, worker_id=None, inputs=None):
         """Distribute `tasks` among workers to run them by calling `context_i`th callaback
 
         Parameters
@@ -411,7 +439,16 @@ class WorkerPool:
         `tasks` : list of (nvidia.dali.types.SampleInfo,)
             You can think of resulting batch as [callback(*task) for task in tasks] with the exception that
             callbacks will be run in parallel.
+        `worker_id` : int, optional
+            If specified, all the `tasks` are sent to the given worker, which runs them in order.
+        `inputs` : list of tuples of numpy arrays, optional
+            Input batch passed to the workers through the shared memory. If specified,
+            the task ``(i,)`` calls the callback with the elements of ``inputs[i]`` as arguments.
         """
+        with self._lock:
+            self._schedule_batch(context_i, batch_i, dst_chunk_i, tasks, worker_id, inputs)
+
+    def _schedule_batch(self, context_i, batch_i, dst_chunk_i, tasks, worker_id, inputs):
         tasks = list(enumerate(tasks))
         if not tasks:
             raise RuntimeError("Cannot schedule empty list of tasks")
@@ -421,11 +458,37 @@ class WorkerPool:
             # or failed with error, once user receives batch that raised exception they should reset
             # the context before scheduling new tasks
             return
-        self._distribute(context_i, batch_i, dst_chunk_i, tasks)
+        inputs_meta = None
+        if inputs is not None:
+            inputs_meta = self._write_inputs(context_i, inputs)
+        if worker_id is None:
+            self._distribute(context_i, batch_i, dst_chunk_i, tasks, inputs_meta)
+        else:
+            with self.pool.task_pipes_lock:
+                self._send(worker_id, ScheduledTasks(context_i, batch_i, dst_chunk_i, tasks, inputs_meta))
         # TODO check if raising from doubly scheduled task makes sense?
         context.push_scheduled(batch_i, tasks)
 
-    def _distribute(self, context_i, batch_i, dst_chunk_i, tasks):
+    def _write_inputs(self, context_i, inputs):
+        """Writes the input batch into the context's shared memory chunk. The previous
+        input batch of the context must have been already processed by the workers."""
+        chunk = self.input_chunks.get(context_i)
+        if chunk is None:
+            chunk = SharedMemChunk("input_{}".format(context_i), 1024 * 1024)
+            self.input_chunks[context_i] = chunk
+        return write_batch(chunk, list(enumerate(inputs)))
+
+    def _send(self, worker_id, scheduled_tasks):
+        self.pool.send(worker_id, scheduled_tasks)
+        inputs = scheduled_tasks.inputs
+        # the worker needs the handle to the inputs' shared memory chunk only once
+        if inputs is not None and (worker_id, inputs.mem_chunk_id) not in self.input_handles_sent:
+            self.input_handles_sent.add((worker_id, inputs.mem_chunk_id))
+            chunk = self.input_chunks[scheduled_tasks.context_i]
+            reduction.send_handle(
+                self.pool.sock(worker_id), chunk.shm_chunk.handle, self.pool.pids()[worker_id])
+
+    def _distribute(self, context_i, batch_i, dst_chunk_i, tasks, inputs_meta=None):
         num_workers = self.pool.num_workers
         tasks_no = len(tasks)
         chunk_size = tasks_no // num_workers
@@ -437,9 +500,10 @@ class WorkerPool:
                 if worker_chunk == 0:
                     break
                 scheduled_tasks = ScheduledTasks(
-                    context_i, batch_i, dst_chunk_i, tasks[queued_no: queued_no + worker_chunk])
+                    context_i, batch_i, dst_chunk_i, tasks[queued_no: queued_no + worker_chunk],
+                    inputs_meta)
                 queued_no += worker_chunk
-                self.pool.send(worker_id, scheduled_tasks)
+                self._send(worker_id, scheduled_tasks)
 
     def receive_batch(self, context_i):
         """Returns the next produced batch (in the order of schedule_batch calls) for the
@@ -451,14 +515,15 @@ class WorkerPool:
             Specifies which callback you want the results from, ordering corresponds to the order of
             callbacks passed when constructing the pool.
         """
-        context = self.contexts[context_i]
-        assert len(context.scheduled) > 0, "No task has been scheduled"
-        batch_i, tasks = context.pop_scheduled()
-        while context.is_not_received(batch_i, tasks) and not context.is_error(batch_i):
-            self._receive_chunk()
-        context.handle_error(batch_i)
-        res = context.get_batch(batch_i, tasks)
-        return res
+        with self._lock:
+            context = self.contexts[context_i]
+            assert len(context.scheduled) > 0, "No task has been scheduled"
+            batch_i, tasks = context.pop_scheduled()
+            while context.is_not_received(batch_i, tasks) and not context.is_error(batch_i):
+                self._receive_chunk()
+            context.handle_error(batch_i)
+            res = context.get_batch(batch_i, tasks)
+            return res
 
     def _receive_chunk(self):
         ready_workers = multiprocessing.connection.wait(self.rec_pipes)
@@ -487,11 +552,15 @@ class WorkerPool:
         return self.pool.pids()
 
     def reset(self):
-        for context in self.contexts:
-            context.reset()
+        with self._lock:
+            for context in self.contexts:
+                context.reset()
 
     def reset_context(self, context_i):
-        self.contexts[context_i].reset()
+        with self._lock:
+            self.contexts[context_i].reset()
 
     def close(self):
         self.pool.close()
+        for chunk in self.input_chunks.values():
+            chunk.close()
@@ -146,6 +146,35 @@ class SharedMemChunk:
         self.shm_chunk.close()
 
 
+def write_buffers(buffers):
+    """Copies the ``buffers`` into a newly allocated shared memory chunk.
+
+    Returns
+    -------
+    (SharedMem, list of (offset, size))
+        The shared memory (None if there are no buffers) and the placement of the buffers in it.
+    """
+    layout = []
+    size = 0
+    for buffer in buffers:
+        offset = _align_up(size, SharedBatchWriter.SAMPLE_ALIGNMENT)
+        size = offset + buffer.raw().nbytes
+        layout.append((offset, buffer.raw().nbytes))
+    if not layout:
+        return None, layout
+    shm = shared_mem.SharedMem.allocate(_align_up(size, SharedBatchWriter.BUFFER_ALIGNMENT))
+    memview = shm.buf
+    for buffer, (offset, nbytes) in zip(buffers, layout):
+        memview[offset:(offset + nbytes)] = buffer.raw()
+    return shm, layout
+
+
+def read_buffers(shm: shared_mem.SharedMem, layout):
+    """Returns read-only views of the buffers placed in ``shm`` by :func:`write_buffers`."""
+    memview = shm.buf
+    return [memview[offset:(offset + nbytes)].toreadonly() for offset, nbytes in layout]
+
+
 def assert_valid_data_type(sample):
     """Check if the output of the callback is type that can be serialized"""
     _apply_to_sample(lambda x : _assert_cpu_sample_data_type(x, _sample_error_msg), sample)
@@ -18,6 +18,8 @@ import os
 import socket
 from multiprocessing import reduction
 from nvidia.dali._multiproc.shared_batch import SharedMemChunk, write_batch, assert_valid_data_type
+from nvidia.dali._multiproc.shared_batch import read_buffers
+from nvidia.dali._multiproc.shared_mem import SharedMem
 from nvidia.dali._multiproc.messages import CompletedTasks
 
 
@@ -194,6 +196,9 @@ def worker(worker_id, callbacks, prefetch_queue_depths, initial_chunk_size, task
     ----------
     `callbacks` : callable list
         List of callables that worker can call to perform a (part of parallelized) task.
+        If ``callback_pickler`` is specified, it is a tuple of the serialized callbacks and the
+        placement of their out-of-band buffers in the shared memory chunk, whose handle
+        is received through the ``sock``.
     `prefetch_queue_depths` : list of int
         Number of shared memory chunks that should be allocated per callaback, used in cycle buffer manner
         to pass callback results to parent process.
@@ -204,11 +209,20 @@ def worker(worker_id, callbacks, prefetch_queue_depths, initial_chunk_size, task
     `res_pipe`: Pipe
         Pipe used to notify the parent process about another batch ready to read in the given memory chunk.
     `sock` : socket
-        Python wrapper around Unix socket used to pass file descriptors identifying shared memory chunk to parent process.
+        Python wrapper around Unix socket used to pass file descriptors identifying shared memory chunk to parent process
+        and to receive the descriptors of the chunks with the input batches from the parent process.
     """
     if callback_pickler is not None:
-        callbacks = callback_pickler.loads(callbacks)
+        data, buffers_layout = callbacks
+        buffers = None
+        if buffers_layout:
+            handle = reduction.recv_handle(sock)
+            # the mapping must outlive the callbacks, which may reference the buffers
+            shared_buffers = SharedMem.open(handle, os.fstat(handle).st_size)
+            buffers = read_buffers(shared_buffers, buffers_layout)
+        callbacks = callback_pickler.loads_out_of_band(data, buffers)
     contexts = None
+    inputs_consumer = None
     batch_dispatcher = SharedBatchesDispatcher(worker_id, sock, res_pipe)
     task_receiver = TaskReceiver(task_pipe)
     # run the thread as a daemon so that even when results queue blocks, worker process can exit anyway
@@ -232,8 +246,15 @@ def worker(worker_id, callbacks, prefetch_queue_depths, initial_chunk_size, task
             context = contexts[scheduled.context_i]
             callback = context.callback
             try:
+                tasks = scheduled.tasks
+                if scheduled.inputs is not None:
+                    if inputs_consumer is None:
+                        from nvidia.dali._multiproc.pool import SharedBatchesConsumer
+                        inputs_consumer = SharedBatchesConsumer()
+                    inputs = dict(inputs_consumer.load_batch(sock, scheduled.inputs))
+                    tasks = [(task_id, inputs[sample_idx]) for (task_id, (sample_idx,)) in tasks]
                 data_batch = [(task_id, callback(*task_args))
-                              for (task_id, task_args) in scheduled.tasks]
+                              for (task_id, task_args) in tasks]
                 for i, sample in data_batch:
                     assert_valid_data_type(sample)
             except Exception as exception:
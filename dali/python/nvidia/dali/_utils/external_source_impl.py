@@ -185,6 +185,20 @@ class _CycleGenFunc():
                 return next(self.it)
 
 
+def _generator_accepts_worker_info(gen_func):
+    """Checks whether the generator function expects an argument of type `WorkerInfo`.
+
+    Only the positional parameters without default values are taken into account, so that
+    generator functions such as ``def gen(n=10)`` are still called without arguments"""
+    try:
+        params = inspect.signature(gen_func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    positional = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    return any(param.kind in positional and param.default is inspect.Parameter.empty
+               for param in params)
+
+
 def _is_generator_function(x):
     """Checks whether x is a generator function or a callable object
     where __call__ is a generator function"""
@@ -214,6 +228,111 @@ def _cycle_enabled(cycle):
   - "raise" - raise StopIteration on each rewind.""".format(repr(cycle)))
 
 
+def _whole_data_generator(gen_func, accepts_worker_info):
+    """When run outside of the parallel workers, a generator function accepting `WorkerInfo`
+    is responsible for the whole data set"""
+    if not accepts_worker_info:
+        return gen_func
+    return lambda: gen_func(types.WorkerInfo(0, 1))
+
+
+def _rewinding(make_iter):
+    """Iterates over the iterators returned by `make_iter` one after another, as a single
+    stream, so that the position in the stream is kept when the source is rewound"""
+    while True:
+        empty = True
+        for item in make_iter():
+            empty = False
+            yield item
+        if empty:
+            return
+
+
+def _strided(iterator, block_size, worker_id, num_workers):
+    """Yields the blocks of `block_size` consecutive items of the `iterator` that fall to
+    the worker `worker_id` when the blocks are assigned to `num_workers` workers round-robin"""
+    position = 0
+    for item in iterator:
+        if (position // block_size) % num_workers == worker_id:
+            yield item
+        position += 1
+
+
+class _ShardedSourceTask:
+    """Request for the next item of the source instance run by a parallel worker.
+
+    Parameters
+    ----------
+    `worker_id` : int
+        Id of the worker the request was sent to.
+    `num_workers` : int
+        Number of the workers sharing the source.
+    `epoch_idx` : int
+        Ordinal of the epoch, the cycling source is restarted when it changes.
+    `block_size` : int
+        Number of consecutive items computed by a single worker, that is batch size in the
+        per-sample mode and 1 in the batch mode.
+    """
+    def __init__(self, worker_id, num_workers, epoch_idx, block_size):
+        self.worker_id = worker_id
+        self.num_workers = num_workers
+        self.epoch_idx = epoch_idx
+        self.block_size = block_size
+
+
+class _ShardedSource:
+    """Callback run by the parallel workers for iterable or generator function source.
+
+    Every worker keeps its own instance of the source. A generator function accepting an argument
+    receives `WorkerInfo` and is expected to produce only the data of the given worker. In other
+    cases every worker iterates over the whole source and keeps only the items of the batches
+    assigned to it, so that the batches interleaved round-robin by the pool come in the same order
+    as in the non-parallel mode. With ``cycle="quiet"`` such a source is rewound as a single stream
+    (the position of the worker's blocks is kept across the rewinds), which preserves the order
+    even if the number of batches in the epoch is not a multiple of the number of workers.
+    """
+    def __init__(self, source_desc):
+        self.source = source_desc.source
+        self.kind = source_desc.kind
+        self.accepts_worker_info = source_desc.has_inputs
+        self.cycle = source_desc.cycle
+        self.cycle_quietly = _cycle_enabled(self.cycle) and self.cycle != "raise"
+        self.it = None
+        self.epoch_idx = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # running iterator is specific to the worker
+        state["it"] = None
+        state["epoch_idx"] = None
+        return state
+
+    def _shard_iter(self, task):
+        if self.kind == SourceKind.GENERATOR_FUNC and self.accepts_worker_info:
+            return iter(self.source(types.WorkerInfo(task.worker_id, task.num_workers)))
+        if self.kind == SourceKind.GENERATOR_FUNC:
+            make_iter = lambda: iter(self.source())
+        else:
+            make_iter = lambda: iter(self.source)
+        it = _rewinding(make_iter) if self.cycle_quietly else make_iter()
+        return _strided(it, task.block_size, task.worker_id, task.num_workers)
+
+    def __call__(self, task):
+        restart = _cycle_enabled(self.cycle) and task.epoch_idx != self.epoch_idx
+        if self.it is None or restart:
+            self.it = self._shard_iter(task)
+        self.epoch_idx = task.epoch_idx
+        try:
+            return next(self.it)
+        except StopIteration:
+            if not self.cycle_quietly or not self.accepts_worker_info:
+                # other sources are rewound by `_rewinding`, unless they are empty
+                raise
+            # quietly rewind the worker's shard
+            self.it = self._shard_iter(task)
+            return next(self.it)
+
+
 def accepted_arg_count(callable):
     if not inspect.isfunction(callable) and not inspect.ismethod(callable) and hasattr(callable, '__call__'):
         callable = callable.__call__
@@ -242,8 +361,9 @@ def get_callback_from_source(source, cycle):
                         "of calling a generator function, pass that function instead as `source`.")
                 if _is_generator_function(source):
                     # We got a generator function, each call returns new "generator iterator"
-                    desc = SourceDescription(source, SourceKind.GENERATOR_FUNC, False, cycle)
-                    iterator = iter(_CycleGenFunc(source, cycle))
+                    has_inputs = _generator_accepts_worker_info(source)
+                    desc = SourceDescription(source, SourceKind.GENERATOR_FUNC, has_inputs, cycle)
+                    iterator = iter(_CycleGenFunc(_whole_data_generator(source, has_inputs), cycle))
                 else:
                     # We hopefully got an iterable, iter(source) should return new iterator.
                     # TODO(klecki): Iterators are self-iterable (they return self from `iter()`),
@@ -255,8 +375,9 @@ def get_callback_from_source(source, cycle):
                 # In non-cycling case, we go over the data once.
                 if _is_generator_function(source):
                     # If we got a generator, we extract the "generator iterator"
-                    desc = SourceDescription(source, SourceKind.GENERATOR_FUNC, False, cycle)
-                    source = source()
+                    has_inputs = _generator_accepts_worker_info(source)
+                    desc = SourceDescription(source, SourceKind.GENERATOR_FUNC, has_inputs, cycle)
+                    source = _whole_data_generator(source, has_inputs)()
                 else:
                     desc = SourceDescription(source, SourceKind.ITERABLE, False, cycle)
 
@@ -402,7 +523,7 @@ def get_iterable_from_iterable_or_generator(source_desc, is_batched):
     If the source is generator function it must be called first.
     """
     if source_desc.kind == SourceKind.GENERATOR_FUNC:
-        first_iter = iter(source_desc.source())
+        first_iter = iter(_whole_data_generator(source_desc.source, source_desc.has_inputs)())
     else:
         first_iter = iter(source_desc.source)
     first =  next(first_iter)
@@ -420,7 +541,8 @@ def get_iterable_from_iterable_or_generator(source_desc, is_batched):
                 PeekFirstGenerator.first_iterator = None
             else:
                 if source_desc.kind == SourceKind.GENERATOR_FUNC:
-                    self.it = iter(source_desc.source())
+                    self.it = iter(
+                        _whole_data_generator(source_desc.source, source_desc.has_inputs)())
                 else:
                     self.it = iter(source_desc.source)
             return self
@@ -439,6 +561,43 @@ def get_iterable_from_iterable_or_generator(source_desc, is_batched):
     return PeekFirstGenerator, dtype, shape
 
 
+def get_batch_iterable_from_parallel_group(group, pool, context_i, batch_size):
+    """Wrap the parallel ExternalSource group into an iterable over the batches computed
+    by the worker pool, while peeking the first batch.
+
+    The batches are stacked (or copied) into a new array, as the pool reuses its shared memory.
+    TF runs the generator of every input in a separate thread, so the access to the pool is
+    serialized with the pool's lock.
+    """
+
+    def receive_batch():
+        with pool.lock:
+            group.prefetch(pool, context_i, batch_size)
+            batch = group.receive_batch(pool, context_i, batch_size)
+        result = batch_to_numpy(batch, _tf_batch_error_msg, non_uniform_str=_tf_uniform_error_msg)
+        # samples of the list were already stacked into a new array
+        return result if isinstance(batch, list) else np.copy(result)
+
+    first = receive_batch()
+    dtype, shape = _inspect_data(first, True)
+
+    class ParallelBatchIterator:
+        first_value = first
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            if ParallelBatchIterator.first_value is not None:
+                result = ParallelBatchIterator.first_value
+                ParallelBatchIterator.first_value = None
+            else:
+                result = receive_batch()
+            return result
+
+    return ParallelBatchIterator, dtype, shape
+
+
 def _get_generator_from_source_desc(source_desc, batch_size, is_batched):
     """Based on DALI source description create a generator function, type and shape specification
     compatible with TF Generator Dataset.
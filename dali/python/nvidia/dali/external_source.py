@@ -18,7 +18,8 @@ import nvidia.dali.types
 from nvidia.dali._utils.external_source_impl import \
         get_callback_from_source as _get_callback_from_source, \
         accepted_arg_count as _accepted_arg_count, \
-        SourceKind as _SourceKind
+        SourceKind as _SourceKind, \
+        _ShardedSource, _ShardedSourceTask
 
 
 def _get_batch_shape(data):
@@ -65,10 +66,15 @@ class _ExternalSourceGroup(object):
     def __init__(
             self, callback, is_multioutput, instances=[], *,
             cuda_stream=None, use_copy_kernel=None, batch=True, parallel=False,
-            prefetch_queue_depth=None):
+            prefetch_queue_depth=None, source_desc=None):
         self.instances = list(instances)  # we need a copy!
         self.is_multioutput = is_multioutput
         self.callback = callback
+        # iterables and generator functions run in parallel have separate instance in every worker
+        self.sharded = parallel and source_desc is not None and \
+            source_desc.kind != _SourceKind.CALLABLE
+        self.parallel_callback = _ShardedSource(source_desc) if self.sharded else callback
+        self.epoch_idx = 0  # changes every time the source is rewound
         self._cuda_stream = cuda_stream
         self.use_copy_kernel = use_copy_kernel
         self.batch = batch
@@ -110,6 +116,7 @@ class _ExternalSourceGroup(object):
     def reset_indices(self):
         self.current_iter = 0
         self.current_sample = 0
+        self.epoch_idx += 1
         self.cancel_prefetch()
 
     def cancel_prefetch(self):
@@ -125,9 +132,18 @@ class _ExternalSourceGroup(object):
     def schedule_batch(self, pool, context_i, lead, batch_size):
         """Schedule computing new batch from source callback by the parallel pool."""
         dst_chunk_i = (self.flat_iter_idx + lead) % pool.queue_depths[context_i]
-        pool.schedule_batch(context_i, self.scheduled_job_idx, dst_chunk_i, [
-            self.callback_args(i, batch_size, lead) for i in range(batch_size)
-        ])
+        if self.sharded:
+            # The whole batch is computed by a single worker, consecutive batches are assigned
+            # to the workers round-robin so that the order of the batches is deterministic
+            worker_id = (self.current_iter + lead) % pool.num_workers
+            block_size = 1 if self.batch else batch_size
+            task = _ShardedSourceTask(worker_id, pool.num_workers, self.epoch_idx, block_size)
+            pool.schedule_batch(context_i, self.scheduled_job_idx, dst_chunk_i,
+                                [(task,)] * block_size, worker_id=worker_id)
+        else:
+            pool.schedule_batch(context_i, self.scheduled_job_idx, dst_chunk_i, [
+                self.callback_args(i, batch_size, lead) for i in range(batch_size)
+            ])
         self.scheduled_job_idx += 1
 
     def schedule_and_receive(self, pipeline, pool, context_i, batch_size):
@@ -136,16 +152,31 @@ class _ExternalSourceGroup(object):
         Schedule the execution of the source callback in the pool to compute next batch.
         Used by the parallel ExternalSource variant.
 
+        Args:
+            context_i (int): Index of the callback (in the list of parallel groups)"""
+        callback_out = self.receive_batch(pool, context_i, batch_size)
+        return _ExternalDataBatch(self, pipeline, callback_out, batch_size)
+
+    def receive_batch(self, pool, context_i, batch_size):
+        """Obtain the computed results of calling source callback in parallel pool and
+        schedule the execution of the source callback in the pool to compute next batch.
+
+        The returned data may reside in the shared memory of the pool, it is valid only
+        until next `prefetch_queue_depth` batches are received.
+
         Args:
             context_i (int): Index of the callback (in the list of parallel groups)"""
         try:
             callback_out = pool.receive_batch(context_i)
+            if self.sharded and self.batch:
+                # the only task produced the whole batch
+                callback_out = callback_out[0]
             self.scheduled_ahead -= 1
             self.flat_iter_idx += 1
             self.current_sample += batch_size
             self.current_iter += 1
             self.prefetch(pool, context_i, batch_size)
-            return _ExternalDataBatch(self, pipeline, callback_out, batch_size)
+            return callback_out
         except StopIteration:
             self.reset_indices()
             pool.reset_context(context_i)
@@ -343,18 +374,34 @@ Keyword Args
     When ``parallel`` is set to True, ``source`` must return NumPy/MXNet/PyTorch CPU array,
     TensorCPU, or tuple/list of these types with length matching num_outputs.
 
-    Only callables that accept one argument (:meth:`~nvidia.dali.types.SampleInfo` objects that
-    represent the index of the requested sample) can be used as ``source`` when ``parallel`` is
-    set to True. It can be a function or an object implementing ``__call__`` operator, which
-    allows to add an initial state to the object instance.
+    A callable used as ``source`` when ``parallel`` is set to True must accept one argument
+    (:meth:`~nvidia.dali.types.SampleInfo` object that represents the index of the requested
+    sample). It can be a function or an object implementing ``__call__`` operator, which
+    allows to add an initial state to the object instance. The ``source`` callback must raise
+    StopIteration when the end of data is reached.
+
+    The ``source`` can also be an iterable or a generator function. In that case every worker
+    runs its own instance of the ``source`` and computes whole batches, which are assigned to the
+    workers round-robin. A generator function can accept one argument of type
+    :meth:`~nvidia.dali.types.WorkerInfo` that describes the worker (``worker_id`` and
+    ``num_workers``), and it should produce only the data of that worker's shard, for example
+    read only every ``num_workers``-th file. Only the generator functions with a positional
+    parameter without a default value receive the ``WorkerInfo``. Otherwise, every worker iterates
+    over the whole ``source`` and skips the batches assigned to other workers, so the order of
+    the data is the same as without ``parallel``. The epoch ends when the first worker (in the
+    round-robin order) runs out of data. ``cycle`` is supported: with ``"raise"`` all the workers
+    start over in the next epoch. With ``"quiet"``, the sources iterated by every worker are
+    rewound as a single stream, which keeps the order of the non-parallel mode, while a generator
+    function accepting ``WorkerInfo`` is rewound by each worker on its own, so the order of the
+    batches after the rewind differs from the non-parallel mode whenever the number of batches
+    in the epoch is not a multiple of ``py_num_workers``.
 
     Keep in mind, that **copies** of the ``source`` will be distributed between Python workers,
     and no global state can be shared between them.
 
-    The ``source`` callback must raise StopIteration when the end of data is reached.
-
     Setting ``parallel`` to True makes the external source work in per-sample mode.
-    If ``batch`` was not set it is set to False.
+    If ``batch`` was not set it is set to False. Only iterables and generator functions can be
+    used with ``batch=True`` in the parallel mode.
 
 `prefetch_queue_depth` : int, option, default = 1
     When run in ``parallel=True`` mode, specifies the number of batches to be computed in advance and stored
@@ -468,9 +515,9 @@ Keyword Args
             if not no_copy:
                 raise ValueError("The argument ``no_copy`` cannot be specified to False " +
                     " when used with ``parallel=True``.")
-            if batch:
-                raise ValueError("ExternalSource can be run in parallel only in per-sample " +
-                    "(``batch=False``) mode.")
+            if batch and source_desc.kind == _SourceKind.CALLABLE:
+                raise ValueError("ExternalSource with callable ``source`` can be run in parallel " +
+                    "only in per-sample (``batch=False``) mode.")
             if prefetch_queue_depth < 1:
                 raise ValueError(
                     "``prefetch_queue_depth`` must be a positive integer, got {}.".format(
@@ -482,13 +529,6 @@ Keyword Args
                             "argument of type `nvidia.dali.types.SampleInfo`. This argument "
                             "represents the requested sample index. Got a callable that does not "
                             "accept arguments instead."))
-            else:
-                what = "an iterable" if source_desc.kind == _SourceKind.ITERABLE else "a generator function"
-                raise TypeError(("External Source in parallel mode (when `parallel=True`) accepts "
-                        "as `source` only callables that accept exactly one argument of type"
-                        "`nvidia.dali.types.SampleInfo`. This argument represents the requested "
-                        "sample index. Got {} instead.\nOnly callables allow to distribute work "
-                        "between worker processes without duplicating it.").format(what))
         else:
             if prefetch_queue_depth is not None:
                 raise ValueError("The argument `prefetch_queue_depth` is valid only for " +
@@ -526,6 +566,7 @@ Keyword Args
             'batch': batch,
             'parallel': parallel,
             'prefetch_queue_depth': prefetch_queue_depth,
+            'source_desc': source_desc,
         }
 
         if self._num_outputs is not None:
@@ -580,6 +621,9 @@ def _is_external_source(op_instance):
 
 
 def _has_external_source(pipeline):
+    if not pipeline._py_graph_built and pipeline._serialized_graph is not None:
+        # only the graphs without External Source are cached
+        return False
     if not pipeline._py_graph_built:
         pipeline._build_graph()
     for op in pipeline._ops:
@@ -107,6 +107,41 @@ def _wrap_op(op_class, submodule, parent_module, wrapper_doc):
             parent_module = _internal.get_submodule(fn_module, submodule[:-1])
             setattr(parent_module, wrapper_name, wrap_func)
 
+def _wrap_op_lazy(op_name, get_op_class, submodule, parent_module, get_wrapper_doc):
+    """Register the fn API wrapper of the DALI Operator in the appropriate module.
+    The wrapper (and the Op class) is created when it is accessed for the first time.
+
+    Args:
+        op_name (str): Name of the Op class to wrap
+        get_op_class: Callable returning the Op class to wrap
+        submodule: Additional submodule (scope)
+        parent_module (str): If set to None, the wrapper is placed in nvidia.dali.fn module,
+            otherwise in a specified parent module.
+        get_wrapper_doc: Callable returning the documentation of the wrapper function
+            for given Op class
+    """
+    schema = _b.TryGetSchema(op_name)
+    make_hidden = schema.IsDocHidden() if schema else False
+    wrapper_name = _to_snake_case(op_name)
+    if parent_module is None:
+        fn_module = sys.modules[__name__]
+    else:
+        fn_module = sys.modules[parent_module]
+    module = _internal.get_submodule(fn_module, submodule)
+    if not _internal.has_attr(module, wrapper_name):
+        def create_wrapper():
+            op_class = get_op_class()
+            wrap_func = _wrap_op_fn(op_class, wrapper_name, get_wrapper_doc(op_class))
+            if submodule:
+                wrap_func.__module__ = module.__name__
+            return wrap_func
+
+        _internal.set_lazy_attr(module, wrapper_name, create_wrapper)
+        if make_hidden:
+            parent_module = _internal.get_submodule(fn_module, submodule[:-1])
+            _internal.set_lazy_attr(parent_module, wrapper_name,
+                                    lambda: getattr(module, wrapper_name))
+
 
 from nvidia.dali.external_source import external_source
 external_source.__module__ = __name__
@@ -1,5 +1,6 @@
 import sys
 import types
+import threading
 
 def get_submodule(root, path):
     """Gets or creates sumbodule(s) of `root`.
@@ -35,3 +36,57 @@ Parameters
                 root, part, m))
         root = m
     return root
+
+
+_lazy_attrs_lock = threading.RLock()
+
+
+def _install_lazy_attrs(module):
+    """Adds module-level `__getattr__` and `__dir__` (PEP 562) to `module`, that create
+    the attributes registered with `set_lazy_attr` on the first access."""
+    lazy_attrs = {}
+
+    def __getattr__(name):
+        with _lazy_attrs_lock:
+            if name in module.__dict__:
+                return module.__dict__[name]
+            factory = lazy_attrs.get(name)
+            if factory is None:
+                raise AttributeError("module '{}' has no attribute '{}'".format(
+                    module.__name__, name))
+            value = factory()
+            setattr(module, name, value)
+            del lazy_attrs[name]
+            return value
+
+    def __dir__():
+        return sorted(set(module.__dict__.keys()).union(lazy_attrs.keys()))
+
+    module.__getattr__ = __getattr__
+    module.__dir__ = __dir__
+    module._lazy_attrs = lazy_attrs
+    return lazy_attrs
+
+
+def set_lazy_attr(module, name, factory):
+    """Registers attribute `name` of the `module` that will be created by calling `factory`
+when it is accessed for the first time.
+
+Parameters
+----------
+    `module`
+        module object
+    `name`
+        name of the attribute
+    `factory`
+        callable without arguments returning the value of the attribute"""
+    with _lazy_attrs_lock:
+        lazy_attrs = module.__dict__.get("_lazy_attrs")
+        if lazy_attrs is None:
+            lazy_attrs = _install_lazy_attrs(module)
+        lazy_attrs[name] = factory
+
+
+def has_attr(module, name):
+    """Checks if `module` has the attribute `name`, without creating the lazy attributes"""
+    return name in module.__dict__ or name in module.__dict__.get("_lazy_attrs", ())
@@ -19,6 +19,7 @@ import ast
 from itertools import count
 import threading
 import warnings
+import functools
 from nvidia.dali import backend as _b
 from nvidia.dali.types import \
         _type_name_convert_to_string, _type_convert_value, _default_converter, \
@@ -728,7 +729,15 @@ def _op_name(op_schema_name, api="fn"):
 def _wrap_op(op_class, submodule = [], parent_module=None):
     return _functional._wrap_op(op_class, submodule, parent_module, _docstring_generator_fn(op_class))
 
+def _create_op_class(op_reg_name, op_name, module):
+    op_class = python_op_factory(op_name, op_reg_name, op_device = "cpu")
+    op_class.__module__ = module.__name__
+    return op_class
+
 def _load_ops():
+    """Registers the operators from the backend in the `ops` and `fn` modules.
+
+    The operator classes and `fn` wrappers are created lazily, on the first access."""
     global _cpu_ops
     global _gpu_ops
     global _mixed_ops
@@ -743,19 +752,20 @@ def _load_ops():
         make_hidden = schema.IsDocHidden() if schema else False
         op_full_name, submodule, op_name = _process_op_name(op_reg_name, make_hidden)
         module = _internal.get_submodule(ops_module, submodule)
-        if not hasattr(module, op_name):
-            op_class = python_op_factory(op_name, op_reg_name, op_device = "cpu")
-            op_class.__module__ = module.__name__
-            setattr(module, op_name, op_class)
+        if not _internal.has_attr(module, op_name):
+            _internal.set_lazy_attr(module, op_name,
+                                    functools.partial(_create_op_class, op_reg_name, op_name, module))
+            get_op_class = functools.partial(getattr, module, op_name)
 
             if op_name not in ["ExternalSource"]:
-                _wrap_op(op_class, submodule)
+                _functional._wrap_op_lazy(op_name, get_op_class, submodule, None,
+                                          _docstring_generator_fn)
 
             # The operator was inserted into nvidia.dali.ops.hidden module, let's import it here
             # so it would be usable, but not documented as coming from other module
             if make_hidden:
                 parent_module = _internal.get_submodule(ops_module, submodule[:-1])
-                setattr(parent_module, op_name, op_class)
+                _internal.set_lazy_attr(parent_module, op_name, get_op_class)
 
 def Reload():
     _load_ops()
@@ -937,6 +947,80 @@ def _dlpack_from_array(array):
     return nvidia.dali.python_function_plugin.ArrayToDLTensor(array)
 
 
+def _stack_batch(samples, stack):
+    """Stacks a batch of uniformly shaped samples into a single array.
+
+    Used with ``batch_layout="dense"`` for the input batches that the operator could not pass
+    as a single DLPack tensor, because the samples are not stored contiguously in memory.
+    """
+    shape, dtype = samples[0].shape, samples[0].dtype
+    for sample in samples:
+        if sample.shape != shape or sample.dtype != dtype:
+            raise ValueError("Python function operator with `batch_layout=\"dense\"` requires "
+                             "a batch of samples of the same shape and type, got samples of "
+                             "shapes {} and {}.".format(tuple(shape), tuple(sample.shape)))
+    return stack(samples)
+
+
+def _check_batch_layout(batch_layout, batch_processing):
+    if batch_layout not in ("list", "dense"):
+        raise ValueError("Unsupported `batch_layout`: \"{}\". Expected \"list\" or "
+                         "\"dense\".".format(batch_layout))
+    if batch_layout == "dense" and not batch_processing:
+        raise ValueError("`batch_layout=\"dense\"` can be used only with `batch_processing=True`.")
+
+
+class _PythonFunctionWorkers:
+    """Runs the per-sample function of a CPU ``PythonFunction`` with ``parallel=True``
+    in the Python workers of the pipeline.
+
+    The operator passes whole batches to the instance, the samples are sent to the workers
+    through the shared memory and the results are returned in the order of the samples.
+    Until the pipeline attaches the worker pool (or if it has no workers),
+    the function is run in the current process.
+    """
+
+    # the results are consumed as soon as they are received, there is nothing to prefetch
+    prefetch_queue_depth = 1
+
+    def __init__(self, function, num_outputs):
+        self.parallel_callback = function
+        self.num_outputs = num_outputs
+        self.pool = None
+        self.context_i = None
+        self.batch_i = 0
+
+    def attach(self, pool, context_i):
+        self.pool = pool
+        self.context_i = context_i
+
+    def __call__(self, *dlpack_inputs):
+        samples = list(zip(*[[_dlpack_to_array(dlpack) for dlpack in dl_input]
+                             for dl_input in dlpack_inputs]))
+        if self.pool is None:
+            outputs = [self.parallel_callback(*sample) for sample in samples]
+        else:
+            self.pool.schedule_batch(self.context_i, self.batch_i, 0,
+                                     [(i,) for i in range(len(samples))], inputs=samples)
+            self.batch_i += 1
+            try:
+                outputs = self.pool.receive_batch(self.context_i)
+            except StopIteration:
+                raise RuntimeError("The function of the `PythonFunction` operator must not raise "
+                                   "StopIteration.")
+        for output in outputs:
+            PythonFunction.check_outputs(output, self.num_outputs)
+        if self.num_outputs == 1:
+            return [_dlpack_from_array(output) for output in outputs]
+        return tuple([_dlpack_from_array(output[i]) for output in outputs]
+                     for i in range(self.num_outputs))
+
+
+def _parallel_python_function_workers(op_instance):
+    """Returns the `_PythonFunctionWorkers` of the operator instance or None."""
+    return getattr(op_instance._op, "_workers", None)
+
+
 class PythonFunction(PythonFunctionBase):
     global _cpu_ops
     global _gpu_ops
@@ -969,8 +1053,21 @@ class PythonFunction(PythonFunctionBase):
             return to_dlpack(arr_out)
 
     @staticmethod
-    def function_wrapper_batch(function, num_outputs, from_dlpack, to_dlpack, *dlpack_inputs):
-        arrays = [[from_dlpack(dlpack) for dlpack in dl_input] for dl_input in dlpack_inputs]
+    def function_wrapper_batch(function, num_outputs, from_dlpack, to_dlpack, *dlpack_inputs,
+                               stack=None):
+        """Calls the ``function`` on the whole batch.
+
+        With ``batch_layout="dense"``, the operator passes every input batch of contiguous,
+        uniformly shaped samples as a single DLPack tensor, other batches are passed as lists
+        and combined with ``stack``, if provided. The outputs returned as single arrays are
+        passed to the operator as single DLPack tensors.
+        """
+        def convert_input(dl_input):
+            if not isinstance(dl_input, list):
+                return from_dlpack(dl_input)
+            samples = [from_dlpack(dlpack) for dlpack in dl_input]
+            return _stack_batch(samples, stack) if stack is not None else samples
+        arrays = [convert_input(dl_input) for dl_input in dlpack_inputs]
         arr_outs = function(*arrays)
         if arr_outs is None:
             return
@@ -986,11 +1083,16 @@ class PythonFunction(PythonFunctionBase):
             return convert_batch(arr_outs)
 
     @staticmethod
-    def _function_wrapper_cpu(batch_processing, function, num_outputs, *dlpack_inputs):
+    def _function_wrapper_cpu(batch_processing, function, num_outputs, *dlpack_inputs,
+                              batch_layout="list"):
         if batch_processing:
+            stack = None
+            if batch_layout == "dense":
+                import numpy as np
+                stack = np.stack
             return PythonFunction.function_wrapper_batch(function, num_outputs,
                                                          _dlpack_to_array, _dlpack_from_array,
-                                                         *dlpack_inputs)
+                                                         *dlpack_inputs, stack=stack)
         else:
             return PythonFunction.function_wrapper_per_sample(function, num_outputs,
                                                               _dlpack_to_array, _dlpack_from_array,
@@ -1006,28 +1108,58 @@ class PythonFunction(PythonFunctionBase):
         return out
 
     @staticmethod
-    def _function_wrapper_gpu(batch_processing, function, num_outputs, *dlpack_inputs):
+    def _function_wrapper_gpu(batch_processing, function, num_outputs, *dlpack_inputs,
+                              batch_layout="list"):
         def wrapped_func(*inputs):
             return PythonFunction._cupy_stream_wrapper(function, *inputs)
         if batch_processing:
+            stack = cupy.stack if batch_layout == "dense" else None
             return PythonFunction.function_wrapper_batch(wrapped_func, num_outputs, cupy.fromDlpack,
-                                                         lambda t: t.toDlpack(), *dlpack_inputs)
+                                                         lambda t: t.toDlpack(), *dlpack_inputs,
+                                                         stack=stack)
         else:
             return PythonFunction.function_wrapper_per_sample(wrapped_func, num_outputs, cupy.fromDlpack,
                                                               lambda t: t.toDlpack(),
                                                               *dlpack_inputs)
 
-    def __init__(self, function, num_outputs=1, device='cpu', batch_processing=False, **kwargs):
+    def __init__(self, function, num_outputs=1, device='cpu', batch_processing=False,
+                 batch_layout="list", parallel=False, **kwargs):
+        _check_batch_layout(batch_layout, batch_processing)
+        self._workers = None
+        if parallel:
+            if device != 'cpu':
+                raise ValueError("Only the CPU `PythonFunction` can be run in parallel.")
+            if batch_processing:
+                raise ValueError("`parallel=True` is not supported with `batch_processing=True`.")
+            if num_outputs == 0:
+                raise ValueError("`parallel=True` is not supported for functions with no outputs.")
+            self._workers = _PythonFunctionWorkers(function, num_outputs)
+            # the operator passes whole batches, which are split into samples by the workers
+            super(PythonFunction, self).__init__(impl_name="DLTensorPythonFunctionImpl",
+                                                 function=self._workers,
+                                                 num_outputs=num_outputs, device=device,
+                                                 synchronize_stream=False,
+                                                 batch_processing=True, **kwargs)
+            return
         if device == 'gpu':
             _setup_cupy()
-        func = (lambda *ts: PythonFunction._function_wrapper_cpu(batch_processing, function, num_outputs, *ts))\
+        func = (lambda *ts: PythonFunction._function_wrapper_cpu(batch_processing, function, num_outputs, *ts,
+                                                                 batch_layout=batch_layout))\
                if device == 'cpu' else \
-               (lambda *ts: PythonFunction._function_wrapper_gpu(batch_processing, function, num_outputs, *ts))
+               (lambda *ts: PythonFunction._function_wrapper_gpu(batch_processing, function, num_outputs, *ts,
+                                                                 batch_layout=batch_layout))
         super(PythonFunction, self).__init__(impl_name="DLTensorPythonFunctionImpl",
                                              function=func,
                                              num_outputs=num_outputs, device=device,
                                              synchronize_stream=False,
-                                             batch_processing=batch_processing, **kwargs)
+                                             batch_processing=batch_processing,
+                                             batch_layout=batch_layout, **kwargs)
+
+
+    def __call__(self, *inputs, **kwargs):
+        if self._workers is not None and len(inputs) == 0:
+            raise ValueError("`PythonFunction` with `parallel=True` requires at least one input.")
+        return super(PythonFunction, self).__call__(*inputs, **kwargs)
 
 
 class DLTensorPythonFunction(PythonFunctionBase):
@@ -1209,9 +1341,10 @@ def _arithm_op(name, *inputs):
     input_desc = _generate_input_desc(categories_idxs, integers, reals)
     expression_desc = "{}({})".format(name, input_desc)
     dev = _choose_device(edges)
-    # Create "instance" of operator
-    op = ArithmeticGenericOp(device = dev, expression_desc = expression_desc,
-                             integer_constants = integers, real_constants = reals)
+    # Create "instance" of operator, the class is created lazily so it is not a global yet
+    op_class = getattr(sys.modules[__name__], "ArithmeticGenericOp")
+    op = op_class(device = dev, expression_desc = expression_desc,
+                  integer_constants = integers, real_constants = reals)
     # If we are on gpu, we must mark all inputs as gpu
     if dev == "gpu":
         dev_inputs = list(edge.gpu() for edge in edges)
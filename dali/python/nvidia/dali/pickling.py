@@ -32,6 +32,9 @@ class _DaliPickle:
 
 class _CustomPickler:
 
+    # buffers of at least that many bytes are pickled out-of-band, if the pickler supports it
+    OUT_OF_BAND_MIN_SIZE = 64 * 1024
+
     @classmethod
     def create(cls, py_callback_pickler):
         if py_callback_pickler is None or isinstance(py_callback_pickler, cls):
@@ -48,13 +51,16 @@ class _CustomPickler:
 
     @classmethod
     def create_from_reducer(cls, reducer, dumps_kwargs=None, loads_kwargs=None):
-        return cls(reducer.dumps, reducer.loads, dumps_kwargs, loads_kwargs)
+        # only the DALI pickler is known to accept protocol 5 buffer arguments
+        out_of_band = reducer is _DaliPickle and pickle.HIGHEST_PROTOCOL >= 5
+        return cls(reducer.dumps, reducer.loads, dumps_kwargs, loads_kwargs, out_of_band)
 
-    def __init__(self, dumps, loads, dumps_kwargs, loads_kwargs):
+    def __init__(self, dumps, loads, dumps_kwargs, loads_kwargs, out_of_band=False):
         self._dumps = dumps
         self._loads = loads
         self.dumps_kwargs = dumps_kwargs or {}
         self.loads_kwargs = loads_kwargs or {}
+        self.out_of_band = out_of_band
 
     def dumps(self, obj):
         return self._dumps(obj, **self.dumps_kwargs)
@@ -62,6 +68,34 @@ class _CustomPickler:
     def loads(self, obj):
         return self._loads(obj, **self.loads_kwargs)
 
+    def dumps_out_of_band(self, obj):
+        """Serializes ``obj``, large contiguous buffers (such as data of NumPy arrays) are not
+        included in the returned data but returned as a separate list of ``pickle.PickleBuffer``,
+        if the pickler supports protocol 5 out-of-band buffers.
+
+        Returns
+        -------
+        (data, buffers)
+        """
+        if not self.out_of_band:
+            return self.dumps(obj), []
+        buffers = []
+
+        def buffer_callback(buffer):
+            if buffer.raw().nbytes < self.OUT_OF_BAND_MIN_SIZE:
+                return True  # serialize in-band
+            buffers.append(buffer)
+            return False
+
+        data = self._dumps(obj, protocol=5, buffer_callback=buffer_callback, **self.dumps_kwargs)
+        return data, buffers
+
+    def loads_out_of_band(self, data, buffers):
+        """Counterpart of :meth:`dumps_out_of_band`."""
+        if not buffers:
+            return self.loads(data)
+        return self._loads(data, buffers=buffers, **self.loads_kwargs)
+
 
 def pickle_by_value(fun):
     """
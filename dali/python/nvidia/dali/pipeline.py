@@ -13,7 +13,7 @@
 # limitations under the License.
 
 # pylint: disable=no-member
-from collections import deque
+from collections import deque, OrderedDict
 from nvidia.dali import backend as b
 from nvidia.dali import tensors as Tensors
 from nvidia.dali import types
@@ -27,6 +27,8 @@ import inspect
 import warnings
 import weakref
 import ctypes
+import hashlib
+import pickle
 
 pipeline_tls = tls()
 
@@ -120,10 +122,12 @@ Parameters
     If DALI should print operator output buffer statistics.
     Usefull for `bytes_per_sample_hint` operator parameter.
 `py_num_workers`: int, optional, default = 1
-    The number of Python workers that will process ``ExternalSource`` callbacks.
-    The pool starts only if there is at least one ExternalSource with ``parallel`` set to True.
-    Setting it to 0 disables the pool and all ExternalSource operators fall back to non-parallel
-    mode even if ``parallel`` is set to True.
+    The number of Python workers that will process ``ExternalSource`` callbacks and
+    the functions of the CPU ``PythonFunction`` operators.
+    The pool starts only if there is at least one ExternalSource or PythonFunction with ``parallel``
+    set to True.
+    Setting it to 0 disables the pool and all ExternalSource and PythonFunction operators
+    fall back to non-parallel mode even if ``parallel`` is set to True.
 `py_start_method` : str, default = "fork"
     Determines how Python workers are started. Supported methods:
 
@@ -162,6 +166,10 @@ Parameters
     by decorating them with `@dali.pickling.pickle_by_value`. It may be especially useful when
     working with Jupyter notebook to work around the issue of worker process being unable to import
     the callback defined as a global function inside the notebook.
+
+    With the default DALI pickler, the callbacks are serialized once for all the workers and large
+    NumPy arrays referenced by them are passed out-of-band in a single shared memory chunk, which
+    the workers map as read-only arrays instead of keeping their own copies.
 """
     def __init__(self, batch_size = -1, num_threads = -1, device_id = -1, seed = -1,
                  exec_pipelined=True, prefetch_queue_depth=2,
@@ -193,6 +201,8 @@ Parameters
         self._cpu_batches_to_consume = 0
         self._gpu_batches_to_consume = 0
         self._names_and_devices = None
+        self._serialized_graph = None  # set when the graph is taken from the pipeline graph cache
+        self._graph_cache_key = None  # set when the graph should be stored in the cache once built
         self._exec_async = exec_async
         self._bytes_per_sample = bytes_per_sample
         self._set_affinity = set_affinity
@@ -214,6 +224,7 @@ Parameters
         self._input_callbacks = None
         self._parallel_input_callbacks = None
         self._seq_input_callbacks = None
+        self._parallel_py_functions = None
         self._enable_memory_stats = enable_memory_stats
         self._prefetch_queue_depth = prefetch_queue_depth
         if type(prefetch_queue_depth) is dict:
@@ -592,11 +603,16 @@ Parameters
             self._pipe.SetPyObjDependency(self._py_pool)
 
     def _start_py_workers(self):
-        if not self._parallel_input_callbacks:
+        if not self._parallel_input_callbacks and not self._parallel_py_functions:
             return
         self._py_pool = WorkerPool.from_groups(
-            self._parallel_input_callbacks, self._prefetch_queue_depth, self._py_start_method,
+            self._parallel_input_callbacks + self._parallel_py_functions,
+            self._prefetch_queue_depth, self._py_start_method,
             self._py_num_workers, py_callback_pickler=self._py_callback_pickler)
+        # the contexts of the pool are ordered as the callbacks passed to it
+        for i, workers in enumerate(self._parallel_py_functions,
+                                    len(self._parallel_input_callbacks)):
+            workers.attach(self._py_pool, i)
         # ensure processes started by the pool are termineted when pipeline is no longer used
         weakref.finalize(self, lambda pool : pool.close(), self._py_pool)
         self._py_pool_started = True
@@ -643,6 +659,15 @@ Parameters
         else:
             self._parallel_input_callbacks = [group for group in groups if group.parallel]
             self._seq_input_callbacks = [group for group in groups if not group.parallel]
+        from nvidia.dali.ops import _parallel_python_function_workers
+        self._parallel_py_functions = []
+        if self._py_num_workers != 0:
+            for op in self._ops:
+                workers = _parallel_python_function_workers(op)
+                # the same operator object can be called many times
+                if workers is not None and \
+                        not any(workers is other for other in self._parallel_py_functions):
+                    self._parallel_py_functions.append(workers)
 
     def start_py_workers(self):
         """
@@ -665,6 +690,9 @@ Parameters
 
         If you use the method you cannot specify ``define_graph`` argument when calling :meth:`build`.
         """
+        if self._serialized_graph is not None:
+            # The graph from the cache has no External Sources, so there are no workers to start
+            return
         if not self._py_graph_built:
             self._build_graph()
         if not self._py_pool_started:
@@ -695,6 +723,11 @@ Parameters
             raise ValueError("Pipeline created with `num_threads` < 1 can only be used "
                              "for serialization.")
 
+        if self._serialized_graph is not None:
+            # The graph from the cache has no Python callbacks, the backend can be built directly
+            self.deserialize_and_build(self._serialized_graph)
+            return
+
         self.start_py_workers()
         if not self._backend_prepared:
             self._init_pipeline_backend()
@@ -702,6 +735,16 @@ Parameters
 
         self._pipe.Build(self._names_and_devices)
         self._built = True
+        self._store_in_graph_cache()
+
+    def _store_in_graph_cache(self, serialized_graph=None):
+        """Stores the serialized graph in the pipeline graph cache, if it was requested
+        by `pipeline_def` and the graph can be restored from its serialized form."""
+        if self._graph_cache_key is not None and _is_graph_cacheable(self):
+            if serialized_graph is None:
+                serialized_graph = self._pipe.SerializeToProtobuf()
+            _graph_cache_put(self._graph_cache_key, serialized_graph)
+        self._graph_cache_key = None
 
     def feed_input(self, data_node, data, layout = None, cuda_stream = None, use_copy_kernel = False):
         """Pass a mutlidimensional array or DLPack (or a list thereof) to an output of ExternalSource.
@@ -1066,12 +1109,16 @@ Parameters
                 "Provided `define_graph` argument is not callable." +
                 (" Didn't you want to write `.serialize(filename=...)`?"
                 if isinstance(define_graph, str) else ""))
-        if not self._py_graph_built:
-            self._build_graph(define_graph)
-        if not self._backend_prepared:
-            self._init_pipeline_backend()
-            self._pipe.SetOutputNames(self._names_and_devices)
-        ret = self._pipe.SerializeToProtobuf()
+        if self._serialized_graph is not None:
+            ret = self._serialized_graph
+        else:
+            if not self._py_graph_built:
+                self._build_graph(define_graph)
+            if not self._backend_prepared:
+                self._init_pipeline_backend()
+                self._pipe.SetOutputNames(self._names_and_devices)
+            ret = self._pipe.SerializeToProtobuf()
+            self._store_in_graph_cache(ret)
         if filename is not None:
             with open(filename, 'wb') as pipeline_file:
                 pipeline_file.write(ret)
@@ -1265,7 +1312,60 @@ def _discriminate_args(func, **func_kwargs):
     return ctor_args, fn_args
 
 
-def pipeline_def(fn=None, **pipeline_kwargs):
+# Maximal number of the serialized graphs kept in the pipeline graph cache
+_GRAPH_CACHE_SIZE = 64
+
+_graph_cache = OrderedDict()
+
+
+def _graph_cache_get(key):
+    graph = _graph_cache.get(key)
+    if graph is not None:
+        _graph_cache.move_to_end(key)
+    return graph
+
+
+def _graph_cache_put(key, graph):
+    """Stores the graph, evicting the least recently used ones above `_GRAPH_CACHE_SIZE`."""
+    _graph_cache[key] = graph
+    _graph_cache.move_to_end(key)
+    while len(_graph_cache) > _GRAPH_CACHE_SIZE:
+        _graph_cache.popitem(last=False)
+
+
+def _graph_cache_key(func, args, fn_kwargs, ctor_args):
+    """Key of the pipeline graph cache: identity and code of the graph definition function
+    and the arguments used to create the pipeline.
+    Returns None if the pipeline should not be cached."""
+    if ctor_args.get("seed", -1) in (None, -1):
+        # The random seeds of the operators would be fixed in the cached graph
+        return None
+    try:
+        closure = tuple(cell.cell_contents for cell in func.__closure__ or ())
+        args_hash = hashlib.sha256(pickle.dumps(
+            (args, sorted(fn_kwargs.items()), sorted(ctor_args.items()), closure))).hexdigest()
+    except Exception:
+        # the arguments cannot be reliably compared
+        return None
+    # code objects compare by value (bytecode, constants, names)
+    return (func.__module__, func.__qualname__, func.__code__, args_hash)
+
+
+def _is_graph_cacheable(pipe):
+    """Graphs with External Source or Python operators refer to live Python objects,
+    which cannot be restored from the serialized graph."""
+    import nvidia.dali.ops as ops
+    from nvidia.dali.external_source import _is_external_source
+    for op in pipe._ops:
+        if _is_external_source(op) or isinstance(op._op, ops.PythonFunctionBase):
+            return False
+        # operators defined in plugins (like Numba) may refer to Python objects as well
+        if not type(op._op).__module__.startswith("nvidia.dali.ops"):
+            return False
+    return True
+
+
+def pipeline_def(fn=None, *, enable_graph_cache=False, **pipeline_kwargs):
     """
     Decorator that converts a graph definition function into a DALI pipeline factory.
 
@@ -1336,12 +1436,36 @@ def pipeline_def(fn=None, **pipeline_kwargs):
 
         pipe = my_pipe(batch_size=42, num_threads=3)
         ...
+
+    When a pipeline factory is called many times with the same arguments (for example, to create
+    a pipeline per rank or per trial), the construction of the graph in Python can be skipped
+    by enabling the graph cache::
+
+        @pipeline_def(enable_graph_cache=True, seed=1234)
+        def my_pipe(flip_vertical, flip_horizontal):
+            ...
+
+    The first pipeline stores its serialized graph when it is built, keyed by the identity and
+    the code of the function and by all the arguments. At most 64 most recently used graphs are
+    kept. Subsequent calls with equal arguments create
+    the pipeline from the serialized graph (see :meth:`Pipeline.serialize`) when it is built.
+    The graph is assumed to depend only on the arguments (and the variables captured by the
+    function). Pipelines without fixed ``seed``, with the arguments that cannot be pickled,
+    or with External Source and Python operators are not cached.
     """
     def actual_decorator(func):
         @functools.wraps(func)
         def create_pipeline(*args, **kwargs):
             ctor_args, fn_kwargs = _discriminate_args(func, **kwargs)
-            pipe = Pipeline(**{**pipeline_kwargs, **ctor_args})  # Merge and overwrite dict
+            ctor_args = {**pipeline_kwargs, **ctor_args}  # Merge and overwrite dict
+            cache_key = None
+            if enable_graph_cache:
+                cache_key = _graph_cache_key(func, args, fn_kwargs, ctor_args)
+            pipe = Pipeline(**ctor_args)
+            cached_graph = _graph_cache_get(cache_key) if cache_key is not None else None
+            if cached_graph is not None:
+                pipe._serialized_graph = cached_graph
+                return pipe
             with pipe:
                 pipe_outputs = func(*args, **fn_kwargs)
                 if isinstance(pipe_outputs, tuple):
@@ -1351,6 +1475,8 @@ def pipeline_def(fn=None, **pipeline_kwargs):
                 else:
                     po = (pipe_outputs,)
                 pipe.set_outputs(*po)
+            # the graph is stored in the cache when the pipeline is built (or serialized)
+            pipe._graph_cache_key = cache_key
             return pipe
         return create_pipeline
     return actual_decorator(fn) if fn else actual_decorator
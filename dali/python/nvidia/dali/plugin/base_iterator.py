@@ -16,9 +16,10 @@ from nvidia.dali import types
 import math
 import logging
 import numpy as np
+import time
 import warnings
 from enum import Enum, unique
-from collections import Iterable
+from collections import Iterable, deque
 
 def _iterator_deprecation_warning():
     warnings.warn("Please set `reader_name` and don't set last_batch_padded and size manually " +
@@ -42,6 +43,51 @@ class LastBatchPolicy(Enum):
     DROP = 1
     PARTIAL = 2
 
+class _IteratorStats(object):
+    """
+    Rolling window of per-iteration measurements gathered by the DALI iterators.
+
+    Parameters
+    ----------
+    window_size : int
+                Number of the most recent iterations kept for the statistics
+    callback : callable or None
+                Called at the end of every iteration with a dictionary holding
+                the measurements of that iteration
+    """
+    metrics = ("share_outputs", "copy", "schedule", "queue_depth")
+
+    def __init__(self, window_size, callback):
+        assert window_size > 0, "Statistics window size should be positive"
+        self._window = {metric: deque(maxlen=window_size) for metric in self.metrics}
+        self._callback = callback
+        self._current = {}
+        self.iterations = 0
+
+    def record(self, metric, value):
+        self._current[metric] = value
+        self._window[metric].append(value)
+
+    def end_iteration(self):
+        self.iterations += 1
+        if self._callback is not None:
+            current = self._current
+            current["iteration"] = self.iterations
+            self._callback(current)
+        self._current = {}
+
+    def summary(self, percentiles):
+        result = {"iterations": self.iterations}
+        for metric, values in self._window.items():
+            if not values:
+                continue
+            values = np.array(values)
+            summary = {"mean": float(np.mean(values)), "max": float(np.max(values))}
+            for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+                summary["p{}".format(percentile)] = float(value)
+            result[metric] = summary
+        return result
+
 class _DaliBaseIterator(object):
     """
     DALI base iterator class. Shouldn't be used directly.
@@ -170,6 +216,7 @@ class _DaliBaseIterator(object):
         self._reader_name = reader_name
         self._extract_from_reader_and_validate()
         self._ever_scheduled = False
+        self._stats = None
 
     def _calculate_shard_sizes(self, shard_nums):
         shards_beg = np.floor(shard_nums * self._size_no_pad / self._shards_num).astype(np.int)
@@ -247,6 +294,11 @@ class _DaliBaseIterator(object):
         if self._size > 0 and self._counter >= self._size:
             self._end_iteration()
 
+        stats = self._stats
+        if stats is not None:
+            # number of batches that were scheduled and not yet consumed by the iterator
+            stats.record("queue_depth", min(p._batches_to_consume for p in self._pipes))
+            start = time.perf_counter()
         outputs = []
         try:
             for p in self._pipes:
@@ -257,6 +309,8 @@ class _DaliBaseIterator(object):
             if self._size < 0 and self._auto_reset:
                 self.reset()
             raise e
+        if stats is not None:
+            stats.record("share_outputs", time.perf_counter() - start)
         self._check_batch_size(outputs)
         return outputs
 
@@ -281,11 +335,80 @@ class _DaliBaseIterator(object):
         Schedule DALI runs
         """
         self._ever_scheduled = True
+        # the very first scheduling only prefetches, it is not a part of any iteration
+        stats = self._stats if release_outputs else None
+        if stats is not None:
+            start = time.perf_counter()
         for p in self._pipes:
             with p._check_api_type_scope(types.PipelineAPIType.ITERATOR):
                 if release_outputs:
                     p.release_outputs()
                 p.schedule_run()
+        if stats is not None:
+            stats.record("schedule", time.perf_counter() - start)
+            stats.end_iteration()
+
+    def _stats_timer(self):
+        """
+        Returns the starting point of a measurement or None when the statistics are disabled
+        """
+        if self._stats is None:
+            return None
+        return time.perf_counter()
+
+    def _stats_record(self, metric, start):
+        """
+        Records the time elapsed since `start` obtained from :meth:`_stats_timer`
+        """
+        if self._stats is not None and start is not None:
+            self._stats.record(metric, time.perf_counter() - start)
+
+    def enable_stats(self, window_size=100, callback=None):
+        """
+        Enables collection of the per-iteration statistics that help to tell whether
+        the training is input-bound. For every iteration the iterator records:
+
+            * ``share_outputs`` - time (in seconds) spent waiting for the pipeline outputs
+            * ``copy`` - time (in seconds) spent copying the outputs to the framework's tensors
+            * ``schedule`` - time (in seconds) spent scheduling the next pipeline run
+            * ``queue_depth`` - number of batches scheduled and not yet consumed
+
+        The statistics are disabled by default and cost nothing until enabled.
+        They can be combined with :meth:`nvidia.dali.Pipeline.executor_statistics`
+        to get the full picture of the data loading.
+
+        Parameters
+        ----------
+        window_size : int, optional, default = 100
+                    Number of the most recent iterations used to compute :meth:`stats`
+        callback : callable, optional, default = None
+                    Called at the end of every iteration with a dictionary holding
+                    the measurements of that iteration and its number under ``iteration`` key.
+                    It can be used to forward the measurements to a metrics exporter
+        """
+        self._stats = _IteratorStats(window_size, callback)
+
+    def disable_stats(self):
+        """
+        Disables collection of the statistics enabled with :meth:`enable_stats`
+        """
+        self._stats = None
+
+    def stats(self, percentiles=(50, 90, 99)):
+        """
+        Returns the statistics collected since :meth:`enable_stats` was called as a dictionary.
+        Each recorded metric maps to a dictionary with ``mean``, ``max`` and the requested
+        percentiles (``p50``, ``p90``...) computed over the rolling window. The total number
+        of the recorded iterations is available under ``iterations`` key.
+
+        Parameters
+        ----------
+        percentiles : list of int, optional, default = (50, 90, 99)
+                    Percentiles to compute for every metric
+        """
+        if self._stats is None:
+            raise RuntimeError("Statistics are not enabled. Use `enable_stats` first.")
+        return self._stats.summary(percentiles)
 
     def _advance_and_check_drop_last(self):
         """
@@ -90,7 +90,8 @@ class _DALIMXNetIteratorBase(mx.io.DataIter, _DaliBaseIterator):
                  last_batch_padded=False,
                  auto_reset=False,
                  last_batch_policy=LastBatchPolicy.FILL,
-                 prepare_first_batch=True):
+                 prepare_first_batch=True,
+                 ndarray_pool_size=0):
         _DaliBaseIterator.__init__(self,
                                    pipelines,
                                    size,
@@ -100,6 +101,31 @@ class _DALIMXNetIteratorBase(mx.io.DataIter, _DaliBaseIterator):
                                    last_batch_padded,
                                    last_batch_policy,
                                    prepare_first_batch=prepare_first_batch)
+        assert ndarray_pool_size >= 0, "ndarray_pool_size cannot be negative"
+        self._ndarray_pool_size = ndarray_pool_size
+        # per pipeline: [description of the outputs, list of sets of NDArrays, index of the next one]
+        self._ndarray_pool = [None for _ in range(self._num_gpus)]
+
+    def _get_arrays(self, pipe_idx, key, allocate):
+        """
+        Returns the NDArrays for the outputs of the given pipeline. The NDArrays are taken
+        from the pool when they were allocated for the same `key` (shapes, types and devices
+        of the outputs), otherwise `allocate` is called to create new ones
+        """
+        if not self._ndarray_pool_size:
+            return allocate()
+        entry = self._ndarray_pool[pipe_idx]
+        if entry is None or entry[0] != key:
+            entry = [key, [], 0]
+            self._ndarray_pool[pipe_idx] = entry
+        arrays_sets = entry[1]
+        if len(arrays_sets) < self._ndarray_pool_size:
+            arrays = allocate()
+            arrays_sets.append(arrays)
+            return arrays
+        idx = entry[2]
+        entry[2] = (idx + 1) % len(arrays_sets)
+        return arrays_sets[idx]
 
     def next(self):
         """
@@ -204,6 +230,14 @@ class DALIGenericIterator(_DALIMXNetIteratorBase):
     prepare_first_batch : bool, optional, default = True
                 Whether DALI should buffer the first batch right after the creation of the iterator,
                 so one batch is already prepared when the iterator is prompted for the data
+    ndarray_pool_size : int, optional, default = 0
+                Number of sets of NDArrays kept for every pipeline to be reused in the next
+                iterations when the shapes and types of the outputs do not change, e.g. 2 gives
+                double-buffering. Before being overwritten each NDArray waits until MXNet engine
+                no longer uses it, still a batch returned by the iterator is overwritten after
+                `ndarray_pool_size` subsequent iterations, so it should be greater than the number
+                of batches kept alive at once. 0 disables the pool and new NDArrays are allocated
+                in every iteration
     Example
     -------
     With the data set ``[1,2,3,4,5,6,7]`` and the batch size 2:
@@ -232,7 +266,8 @@ class DALIGenericIterator(_DALIMXNetIteratorBase):
                  dynamic_shape=False,
                  last_batch_padded=False,
                  last_batch_policy=LastBatchPolicy.FILL,
-                 prepare_first_batch=True):
+                 prepare_first_batch=True,
+                 ndarray_pool_size=0):
 
         # check the assert first as _DaliBaseIterator would run the prefetch
         self._output_names_map = [x[0] for x in output_map]
@@ -243,6 +278,10 @@ class DALIGenericIterator(_DALIMXNetIteratorBase):
         assert len(set(self._output_names_map)) == len(self._output_names_map), \
             "output_names in output_map should be distinct"
         self.output_map = output_map
+        self._data_indices = [j for j, category in enumerate(self._output_categories_map)
+                              if category == DALIGenericIterator.DATA_TAG]
+        self._label_indices = [j for j, category in enumerate(self._output_categories_map)
+                               if category == DALIGenericIterator.LABEL_TAG]
 
         super().__init__(pipelines,
                          size,
@@ -251,7 +290,8 @@ class DALIGenericIterator(_DALIMXNetIteratorBase):
                          last_batch_padded,
                          auto_reset,
                          last_batch_policy,
-                         prepare_first_batch=prepare_first_batch)
+                         prepare_first_batch=prepare_first_batch,
+                         ndarray_pool_size=ndarray_pool_size)
         self._squeeze_labels = squeeze_labels
 
         self._first_batch = None
@@ -305,58 +345,38 @@ class DALIGenericIterator(_DALIMXNetIteratorBase):
 
         # Gather outputs
         outputs = self._get_outputs()
+        copy_start = self._stats_timer()
 
         data_batches = [None for i in range(self._num_gpus)]
 
         for i in range(self._num_gpus):
+            # Change DALI TensorLists into Tensors
+            tensors = [out.as_tensor() for out in outputs[i]]
+            if self._squeeze_labels:
+                for j in self._label_indices:
+                    tensors[j].squeeze(-1)  # Squeeze last dimension if necessary
+            key = [(t.shape(), t.dtype(), type(t) is TensorGPU) for t in tensors]
+
+            def allocate():
+                mx_gpu_device = mx.gpu(self._pipes[i].device_id)
+                mx_cpu_device = mx.cpu(0)
+                return [get_mx_array(shape, mx_gpu_device if is_gpu else mx_cpu_device,
+                                     dtype=np.dtype(dtype))
+                        for shape, dtype, is_gpu in key]
+
+            arrays = self._get_arrays(i, key, allocate)
+
             # MXNet wants batches with clear distinction between
             # data and label entries, so segregate outputs into
             # 2 categories
-            category_outputs = {key : [] for key in self._output_categories}
-            for j, out in enumerate(outputs[i]):
-                category_outputs[self._output_categories_map[j]].append(out)
-            # Change DALI TensorLists into Tensors
-            category_tensors = dict()
-            category_info = dict()
-            # For data proceed normally
-            category_tensors[DALIGenericIterator.DATA_TAG] = \
-                [x.as_tensor() for x in category_outputs[DALIGenericIterator.DATA_TAG]]
-            category_info[DALIGenericIterator.DATA_TAG] = \
-                [(x.shape(), np.dtype(x.dtype())) for x in category_tensors[DALIGenericIterator.DATA_TAG]]
-            # For labels we squeeze the tensors
-            category_tensors[DALIGenericIterator.LABEL_TAG] = \
-                [x.as_tensor() for x in category_outputs[DALIGenericIterator.LABEL_TAG]]
-            if self._squeeze_labels:
-                for label in category_tensors[DALIGenericIterator.LABEL_TAG]:
-                    label.squeeze(-1)  # Squeeze last dimension if necessary
-            category_info[DALIGenericIterator.LABEL_TAG] = \
-                [(x.shape(), np.dtype(x.dtype())) for x in category_tensors[DALIGenericIterator.LABEL_TAG]]
-
-            mx_gpu_device = mx.gpu(self._pipes[i].device_id)
-            mx_cpu_device = mx.cpu(0)
-            category_device = {key : [] for key in self._output_categories}
-            for category in self._output_categories:
-                for t in category_tensors[category]:
-                    if type(t) is TensorGPU:
-                        category_device[category].append(mx_gpu_device)
-                    else:
-                        category_device[category].append(mx_cpu_device)
-            d = []
-            l = []
-            for j, (shape, dtype) in enumerate(category_info[DALIGenericIterator.DATA_TAG]):
-                d.append(get_mx_array(shape, category_device[DALIGenericIterator.DATA_TAG][j], dtype = dtype))
-            for j, (shape, dtype) in enumerate(category_info[DALIGenericIterator.LABEL_TAG]):
-                l.append(get_mx_array(shape, category_device[DALIGenericIterator.LABEL_TAG][j], dtype = dtype))
-
-            data_batches[i] = mx.io.DataBatch(data=d, label=l)
-
-            d = data_batches[i].data
-            l = data_batches[i].label
-            for j, d_arr in enumerate(d):
-                feed_ndarray(category_tensors[DALIGenericIterator.DATA_TAG][j], d_arr)
-            for j, l_arr in enumerate(l):
-                feed_ndarray(category_tensors[DALIGenericIterator.LABEL_TAG][j], l_arr)
+            data_batches[i] = mx.io.DataBatch(data=[arrays[j] for j in self._data_indices],
+                                              label=[arrays[j] for j in self._label_indices])
+
+            # Copy data from DALI Tensors to MXNet NDArrays
+            for tensor, arr in zip(tensors, arrays):
+                feed_ndarray(tensor, arr)
 
+        self._stats_record("copy", copy_start)
         self._schedule_runs()
 
         self._advance_and_check_drop_last()
@@ -473,6 +493,14 @@ class DALIClassificationIterator(DALIGenericIterator):
     prepare_first_batch : bool, optional, default = True
                 Whether DALI should buffer the first batch right after the creation of the iterator,
                 so one batch is already prepared when the iterator is prompted for the data
+    ndarray_pool_size : int, optional, default = 0
+                Number of sets of NDArrays kept for every pipeline to be reused in the next
+                iterations when the shapes and types of the outputs do not change, e.g. 2 gives
+                double-buffering. Before being overwritten each NDArray waits until MXNet engine
+                no longer uses it, still a batch returned by the iterator is overwritten after
+                `ndarray_pool_size` subsequent iterations, so it should be greater than the number
+                of batches kept alive at once. 0 disables the pool and new NDArrays are allocated
+                in every iteration
 
     Example
     -------
@@ -503,7 +531,8 @@ class DALIClassificationIterator(DALIGenericIterator):
                  dynamic_shape=False,
                  last_batch_padded=False,
                  last_batch_policy=LastBatchPolicy.FILL,
-                 prepare_first_batch=True):
+                 prepare_first_batch=True,
+                 ndarray_pool_size=0):
         super(DALIClassificationIterator, self).__init__(pipelines,
                                                          [(data_name, DALIClassificationIterator.DATA_TAG),
                                                           (label_name, DALIClassificationIterator.LABEL_TAG)],
@@ -516,7 +545,8 @@ class DALIClassificationIterator(DALIGenericIterator):
                                                          dynamic_shape=dynamic_shape,
                                                          last_batch_padded = last_batch_padded,
                                                          last_batch_policy = last_batch_policy,
-                                                         prepare_first_batch = prepare_first_batch)
+                                                         prepare_first_batch = prepare_first_batch,
+                                                         ndarray_pool_size = ndarray_pool_size)
 
 ###############################################
 ###############################################
@@ -587,6 +617,14 @@ class DALIGluonIterator(_DALIMXNetIteratorBase):
     prepare_first_batch : bool, optional, default = True
                 Whether DALI should buffer the first batch right after the creation of the iterator,
                 so one batch is already prepared when the iterator is prompted for the data
+    ndarray_pool_size : int, optional, default = 0
+                Number of sets of NDArrays kept for every pipeline to be reused in the next
+                iterations when the shapes and types of the outputs do not change, e.g. 2 gives
+                double-buffering. Before being overwritten each NDArray waits until MXNet engine
+                no longer uses it, still a batch returned by the iterator is overwritten after
+                `ndarray_pool_size` subsequent iterations, so it should be greater than the number
+                of batches kept alive at once. 0 disables the pool and new NDArrays are allocated
+                in every iteration
 
     Example
     -------
@@ -613,7 +651,8 @@ class DALIGluonIterator(_DALIMXNetIteratorBase):
                  fill_last_batch=None,
                  last_batch_padded=False,
                  last_batch_policy=LastBatchPolicy.FILL,
-                 prepare_first_batch=True):
+                 prepare_first_batch=True,
+                 ndarray_pool_size=0):
 
         # check the assert first as _DaliBaseIterator would run the prefetch
         self._output_tags = {DALIGluonIterator.DENSE_TAG, DALIGluonIterator.SPARSE_TAG}
@@ -630,7 +669,8 @@ class DALIGluonIterator(_DALIMXNetIteratorBase):
             last_batch_padded,
             auto_reset,
             last_batch_policy,
-            prepare_first_batch = prepare_first_batch)
+            prepare_first_batch = prepare_first_batch,
+            ndarray_pool_size = ndarray_pool_size)
 
         self._first_batch = None
         if self._prepare_first_batch:
@@ -647,6 +687,7 @@ class DALIGluonIterator(_DALIMXNetIteratorBase):
 
         # Gather outputs
         dali_outputs = self._get_outputs()
+        copy_start = self._stats_timer()
 
         data_batches = [None for i in range(self._num_gpus)]
         for i in range(self._num_gpus):
@@ -661,7 +702,11 @@ class DALIGluonIterator(_DALIMXNetIteratorBase):
                     s = [t.shape() for t in output_elements[-1]]
                     shapes.append(s)
 
-            data_batches[i] = self._create_data_batch(output_elements, shapes, self._pipes[i].device_id)
+            first_tensors = [el[0] if isinstance(el, list) else el for el in output_elements]
+            key = (shapes, [(t.dtype(), type(t) is TensorGPU) for t in first_tensors])
+            data_batches[i] = self._get_arrays(
+                i, key,
+                lambda: self._create_data_batch(output_elements, shapes, self._pipes[i].device_id))
 
             batch = data_batches[i]
             # Copy data from DALI Tensors to MXNet NDArrays
@@ -676,6 +721,7 @@ class DALIGluonIterator(_DALIMXNetIteratorBase):
                     for output_el in batch]
                    for batch in data_batches]
 
+        self._stats_record("copy", copy_start)
         self._schedule_runs()
 
         self._advance_and_check_drop_last()
@@ -18,10 +18,16 @@ from nvidia.dali.pipeline import Pipeline
 from nvidia.dali.data_node import DataNode as _DataNode
 from nvidia.dali import ops
 from nvidia.dali import types as dali_types
-from numba import types as numba_types
-from numba import njit, cfunc, carray
+from numba import njit, carray
 import numpy as np
 import numba as nb
+import hashlib
+import importlib.util
+import os
+import pickle
+import tempfile
+import threading
+import types
 
 _to_numpy = {
     dali_types.UINT8 : "uint8",
@@ -58,6 +64,260 @@ def _get_shape_view(shapes_ptr, ndims_ptr, num_dims, num_samples):
         l.append(d)
     return l
 
+# Bump, when the generated code changes, to invalidate the compilation cache
+_CACHE_VERSION = 1
+
+_RUN_FN_SIG = "void(uint64, uint64, uint64, int32, uint64, uint64, uint64, int32{})"
+_SETUP_FN_SIG = "void(uint64, uint64, int32, uint64, uint64, int32, int32)"
+
+_compiled_functions = {}
+_compiled_functions_lock = threading.Lock()
+
+
+def _carray_expr(ptr, shape, dtype, ndim):
+    dims = "".join("{}[{}], ".format(shape, i) for i in range(ndim))
+    return "carray(address_as_void_pointer({}), ({}), dtype=np.{})".format(
+        ptr, dims, _to_numpy[dtype])
+
+
+def _generate_source(out_types, in_types, outs_ndim, ins_ndim, with_setup, batch_processing,
+                     cache):
+    """Generates the source of the module defining the ``run_cfunc`` (and ``setup_cfunc``)
+    C callbacks, specialized for the given types and dimensionalities of the inputs and outputs.
+
+    The module expects the jitted user functions as ``run_fn`` and ``setup_fn`` globals.
+    """
+    lines = [
+        "# Generated by nvidia.dali.plugin.numba.experimental, version {}".format(_CACHE_VERSION),
+        "import numpy as np",
+        "from numba import cfunc, carray",
+        "from nvidia.dali.plugin.numba.experimental import address_as_void_pointer, "
+        "_get_shape_view",
+        "",
+    ]
+    if with_setup:
+        lines += [
+            "@cfunc({!r}, nopython=True, cache={})".format(_SETUP_FN_SIG, cache),
+            "def setup_cfunc(out_shapes_ptr, out_ndims_ptr, num_outs, "
+            "in_shapes_ptr, in_ndims_ptr, num_ins, num_samples):",
+            "    out_shapes_np = _get_shape_view(out_shapes_ptr, out_ndims_ptr, num_outs, "
+            "num_samples)",
+            "    in_shapes_np = _get_shape_view(in_shapes_ptr, in_ndims_ptr, num_ins, num_samples)",
+            "    setup_fn(out_shapes_np, in_shapes_np)",
+            "",
+        ]
+    num_samples = "num_samples" if batch_processing else "1"
+    lines += [
+        "@cfunc({!r}, nopython=True, cache={})".format(
+            _RUN_FN_SIG.format(", int32" if batch_processing else ""), cache),
+        "def run_cfunc(out_ptr, out_shapes_ptr, out_ndims_ptr, num_outs, "
+        "in_ptr, in_shapes_ptr, in_ndims_ptr, num_ins{}):".format(
+            ", num_samples" if batch_processing else ""),
+    ]
+    args = []
+    for prefix, dtypes, ndims in (("out", out_types, outs_ndim), ("in", in_types, ins_ndim)):
+        lines += [
+            "    {0}_shapes_np = _get_shape_view({0}_shapes_ptr, {0}_ndims_ptr, num_{0}s, {1})"
+            .format(prefix, num_samples),
+            "    {0}_arr = carray(address_as_void_pointer({0}_ptr), (num_{0}s, {1}), "
+            "dtype=np.int64)".format(prefix, num_samples),
+        ]
+        for i, (dtype, ndim) in enumerate(zip(dtypes, ndims)):
+            name = "{}{}".format(prefix, i)
+            if batch_processing:
+                lines.append("    {} = [{} for ptr, shape in zip({}_arr[{}], {}_shapes_np[{}])]"
+                             .format(name, _carray_expr("ptr", "shape", dtype, ndim),
+                                     prefix, i, prefix, i))
+            else:
+                lines.append("    {} = {}".format(name, _carray_expr(
+                    "{}_arr[{}][0]".format(prefix, i), "{}_shapes_np[{}][0]".format(prefix, i),
+                    dtype, ndim)))
+            args.append(name)
+    lines += ["    run_fn({})".format(", ".join(args)), ""]
+    return "\n".join(lines)
+
+
+def _code_names(code):
+    """Global names used by ``code`` and by the functions defined in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _update_digest(digest, obj, visited):
+    """Feeds a representation of ``obj`` that is stable across processes to ``digest``.
+
+    Unlike ``marshal`` (whose output depends on the reference counts of the objects) or ``repr``
+    of sets (whose order depends on the hash seed), it depends only on the values.
+    Functions include the values of the globals they use, as numba freezes them at compile time.
+    Raises ``TypeError`` if some value cannot be represented."""
+    def update(tag, data=b""):
+        digest.update(tag.encode() + b":" + str(len(data)).encode() + b":" + data)
+
+    obj = getattr(obj, "py_func", obj)
+    if isinstance(obj, (types.FunctionType, types.CodeType)):
+        if id(obj) in visited:  # recursive closures
+            update("visited")
+            return
+        visited.add(id(obj))
+    if isinstance(obj, types.FunctionType):
+        update("function")
+        closure = tuple(cell.cell_contents for cell in obj.__closure__ or ())
+        for part in (obj.__code__, obj.__defaults__, closure):
+            _update_digest(digest, part, visited)
+        for name in sorted(_code_names(obj.__code__)):
+            if name in obj.__globals__:  # builtins and attribute names are not
+                update("global", name.encode())
+                _update_digest(digest, obj.__globals__[name], visited)
+    elif isinstance(obj, types.CodeType):
+        update("code", obj.co_code)
+        update("flags", repr((obj.co_argcount, obj.co_kwonlyargcount, obj.co_flags)).encode())
+        for part in (obj.co_consts, obj.co_names, obj.co_varnames, obj.co_freevars,
+                     obj.co_cellvars):
+            _update_digest(digest, part, visited)
+    elif isinstance(obj, (tuple, list)):
+        update(type(obj).__name__, str(len(obj)).encode())
+        for item in obj:
+            _update_digest(digest, item, visited)
+    elif isinstance(obj, (set, frozenset)):
+        items = []
+        for item in obj:
+            item_digest = hashlib.sha256()
+            _update_digest(item_digest, item, visited)
+            items.append(item_digest.digest())
+        update(type(obj).__name__, b"".join(sorted(items)))
+    elif isinstance(obj, np.ndarray):
+        update("ndarray", repr((obj.dtype.str, obj.shape)).encode())
+        digest.update(np.ascontiguousarray(obj).tobytes())
+    elif obj is None or isinstance(obj, (bool, int, float, complex, str, bytes, np.generic)):
+        update(type(obj).__name__, repr(obj).encode())
+    elif isinstance(obj, types.ModuleType):
+        update("module", obj.__name__.encode())
+    else:
+        try:
+            data = pickle.dumps(obj)
+        except Exception as e:
+            raise TypeError(f"Cannot compute a digest of {type(obj).__name__}") from e
+        update("pickle", data)
+
+
+def _function_digest(fn):
+    """Digest of the bytecode, constants, names, defaults, closure and used globals of ``fn``,
+    the same in every process."""
+    digest = hashlib.sha256()
+    _update_digest(digest, fn, set())
+    return digest.hexdigest()
+
+
+def _cache_dir():
+    cache_dir = nb.config.CACHE_DIR
+    if not cache_dir:
+        cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME",
+                                                os.path.join(os.path.expanduser("~"), ".cache")),
+                                 "dali")
+    return os.path.join(cache_dir, "numba_function")
+
+
+# Maximal number of the generated modules kept in the cache directory
+_MAX_CACHED_MODULES = 256
+
+
+def _prune_cache(cache_dir, max_modules=_MAX_CACHED_MODULES):
+    """Removes the least recently used generated modules (and numba's cache files of them)
+    when there are more than ``max_modules`` of them in the cache directory."""
+    modules = [entry for entry in os.scandir(cache_dir)
+               if entry.name.startswith("dali_numba_function_") and entry.name.endswith(".py")]
+    if len(modules) <= max_modules:
+        return
+    modules.sort(key=lambda entry: entry.stat().st_mtime)
+    stale = tuple(entry.name[:-len(".py")] for entry in modules[:len(modules) - max_modules])
+    # numba keeps the index and the machine code in __pycache__ next to the module
+    # or in NUMBA_CACHE_DIR
+    roots = {cache_dir} | ({nb.config.CACHE_DIR} if nb.config.CACHE_DIR else set())
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.startswith(stale):
+                    try:
+                        os.remove(os.path.join(dirpath, filename))
+                    except OSError:
+                        pass  # removed by another process
+
+
+def _load_module(name, source, cache_dir, run_fn, setup_fn):
+    """Imports the generated module from the cache directory, so that numba can persist
+    the compiled callbacks next to it. The module is executed in memory when the directory
+    is not writable."""
+    module = types.ModuleType(name)
+    module.run_fn = run_fn
+    module.setup_fn = setup_fn
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, name + ".py")
+        if not os.path.exists(path):
+            # the file is written atomically, as many processes may compile the same function
+            fd, tmp_path = tempfile.mkstemp(suffix=".py", dir=cache_dir)
+            with os.fdopen(fd, "w") as f:
+                f.write(source)
+            os.replace(tmp_path, path)
+            _prune_cache(cache_dir)
+        else:
+            # the modification time orders the modules for pruning
+            os.utime(path)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        module.run_fn = run_fn
+        module.setup_fn = setup_fn
+        spec.loader.exec_module(module)
+    except OSError:
+        exec(compile(source.replace("cache=True", "cache=False"), name, "exec"), module.__dict__)
+    return module
+
+
+def _compile(run_fn, setup_fn, out_types, in_types, outs_ndim, ins_ndim, batch_processing):
+    """Returns the ``(run_cfunc, setup_cfunc)`` pair, compiled for the given user functions,
+    types and dimensionalities.
+
+    The compiled callbacks are cached in memory and on disk, in numba's cache directory
+    (``NUMBA_CACHE_DIR``, if set, or ``~/.cache/dali``), keyed by the generated code and by
+    the bytecode, closures and the values of the globals of the user functions - including
+    the functions and numba dispatchers they call, recursively. Modules are identified by name.
+    If any of these values cannot be digested (e.g. it cannot be pickled), the functions are
+    compiled every time and nothing is cached. At most ``_MAX_CACHED_MODULES`` generated modules
+    are kept on disk, the least recently used ones are removed.
+    """
+    with_setup = setup_fn is not None
+    source = _generate_source(out_types, in_types, outs_ndim, ins_ndim, with_setup,
+                              batch_processing, cache=True)
+    try:
+        key = hashlib.sha256("\n".join(
+            [source, _function_digest(run_fn)]
+            + ([_function_digest(setup_fn)] if with_setup else [])).encode()).hexdigest()
+    except (TypeError, ValueError, AttributeError, pickle.PicklingError):
+        key = None  # e.g. a global cannot be pickled, the functions are compiled every time
+    with _compiled_functions_lock:
+        if key is not None and key in _compiled_functions:
+            return _compiled_functions[key]
+        run_fn = njit(run_fn)
+        setup_fn = njit(setup_fn) if with_setup else None
+        if key is None:
+            module = types.ModuleType("dali_numba_function")
+            module.run_fn = run_fn
+            module.setup_fn = setup_fn
+            exec(compile(source.replace("cache=True", "cache=False"), module.__name__, "exec"),
+                 module.__dict__)
+        else:
+            module = _load_module("dali_numba_function_" + key[:32], source, _cache_dir(),
+                                  run_fn, setup_fn)
+        # the cfunc objects must outlive the pipelines, which only store their addresses
+        compiled = (module.run_cfunc, module.setup_cfunc if with_setup else None)
+        if key is not None:
+            _compiled_functions[key] = compiled
+        return compiled
+
+
 class NumbaFunction(metaclass=ops._DaliOperatorMeta):
     ops.register_cpu_op('NumbaFunction')
 
@@ -77,52 +337,6 @@ class NumbaFunction(metaclass=ops._DaliOperatorMeta):
     def preserve(self):
         return self._preserve
 
-    def _setup_fn_sig(self):
-        return numba_types.void(numba_types.uint64,
-                        numba_types.uint64,
-                        numba_types.int32,
-                        numba_types.uint64,
-                        numba_types.uint64,
-                        numba_types.int32, numba_types.int32)
-
-    def _run_fn_sig(self, batch_processing=False):
-        sig_types = []
-        sig_types.append(numba_types.uint64)
-        sig_types.append(numba_types.uint64)
-        sig_types.append(numba_types.uint64)
-        sig_types.append(numba_types.int32)
-
-        sig_types.append(numba_types.uint64)
-        sig_types.append(numba_types.uint64)
-        sig_types.append(numba_types.uint64)
-        sig_types.append(numba_types.int32)
-
-        if batch_processing:
-            sig_types.append(numba_types.int32)
-        return numba_types.void(*sig_types)
-
-    def _get_carray_eval_lambda(self, dtype, ndim):
-        eval_string = "lambda ptr, shape: carray(ptr, ("
-        for i in range(ndim):
-            eval_string += "shape[{}]".format(i)
-            eval_string += ", " if i + 1 != ndim else "), "
-        eval_string += "dtype=np.{})".format(_to_numpy[dtype])
-        return njit(eval(eval_string))
-
-    def _get_carrays_eval_lambda(self, types, ndim):
-        return tuple([self._get_carray_eval_lambda(dtype, ndim) for dtype, ndim in zip(types, ndim)] + [njit(eval(("lambda x, y: None"))) for i in range(6 - len(types))])
-
-    def _get_run_fn_lambda(self, num_outs, num_ins):
-        eval_string = "lambda run_fn, out0, out1, out2, out3, out4, out5, in0, in1, in2, in3, in4, in5 : "
-        eval_string += "run_fn("
-        for i in range(num_outs):
-            eval_string += "out{}".format(i)
-            eval_string += ", " if i + 1 != num_outs else  ", "
-        for i in range(num_ins):
-            eval_string += "in{}".format(i)
-            eval_string += ", " if i + 1 != num_ins else  ")"
-        return njit(eval(eval_string))
-
     def __call__(self, *inputs, **kwargs):
         pipeline = Pipeline.current()
         if pipeline is None:
@@ -187,92 +401,8 @@ class NumbaFunction(metaclass=ops._DaliOperatorMeta):
         if not isinstance(in_types, list):
             in_types = [in_types]
 
-        setup_fn_address = None
-        if setup_fn != None:
-            setup_fn = njit(setup_fn)
-            @cfunc(self._setup_fn_sig(), nopython=True)
-            def setup_cfunc(out_shapes_ptr, out_ndims_ptr, num_outs, in_shapes_ptr, in_ndims_ptr, num_ins, num_samples):
-                out_shapes_np = _get_shape_view(out_shapes_ptr, out_ndims_ptr, num_outs, num_samples)
-                in_shapes_np = _get_shape_view(in_shapes_ptr, in_ndims_ptr, num_outs, num_samples)
-                setup_fn(out_shapes_np, in_shapes_np)
-            setup_fn_address = setup_cfunc.address
-
-        out0_lambda, out1_lambda, out2_lambda, out3_lambda, out4_lambda, out5_lambda = self._get_carrays_eval_lambda(out_types, outs_ndim)
-        in0_lambda, in1_lambda, in2_lambda, in3_lambda, in4_lambda, in5_lambda = self._get_carrays_eval_lambda(in_types, ins_ndim)
-        run_fn = njit(run_fn)
-        run_fn_lambda = self._get_run_fn_lambda(len(out_types), len(in_types))
-        if batch_processing:
-            @cfunc(self._run_fn_sig(batch_processing=True), nopython=True)
-            def run_cfunc(out_ptr, out_shapes_ptr, out_ndims_ptr, num_outs, in_ptr, in_shapes_ptr, in_ndims_ptr, num_ins, num_samples):
-                out0 = out1 = out2 = out3 = out4 = out5 = None
-                out_shapes_np = _get_shape_view(out_shapes_ptr, out_ndims_ptr, num_outs, num_samples)
-                out_arr = carray(address_as_void_pointer(out_ptr), (num_outs, num_samples), dtype=np.int64)
-                if num_outs >= 1:
-                    out0 = [out0_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(out_arr[0], out_shapes_np[0])]
-                if num_outs >= 2:
-                    out1 = [out1_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(out_arr[1], out_shapes_np[1])]
-                if num_outs >= 3:
-                    out2 = [out2_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(out_arr[2], out_shapes_np[2])]
-                if num_outs >= 4:
-                    out3 = [out3_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(out_arr[3], out_shapes_np[3])]
-                if num_outs >= 5:
-                    out4 = [out4_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(out_arr[4], out_shapes_np[4])]
-                if num_outs >= 6:
-                    out5 = [out5_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(out_arr[5], out_shapes_np[5])]
-
-                in0 = in1 = in2 = in3 = in4 = in5 = None
-                in_shapes_np = _get_shape_view(in_shapes_ptr, in_ndims_ptr, num_ins, num_samples)
-                in_arr = carray(address_as_void_pointer(in_ptr), (num_ins, num_samples), dtype=np.int64)
-                if num_ins >= 1:
-                    in0 = [in0_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(in_arr[0], in_shapes_np[0])]
-                if num_ins >= 2:
-                    in1 = [in1_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(in_arr[1], in_shapes_np[1])]
-                if num_ins >= 3:
-                    in2 = [in2_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(in_arr[2], in_shapes_np[2])]
-                if num_ins >= 4:
-                    in3 = [in3_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(in_arr[3], in_shapes_np[3])]
-                if num_ins >= 5:
-                    in4 = [in4_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(in_arr[4], in_shapes_np[4])]
-                if num_ins >= 6:
-                    in5 = [in5_lambda(address_as_void_pointer(ptr), shape) for ptr, shape in zip(in_arr[5], in_shapes_np[5])]
-
-                run_fn_lambda(run_fn, out0, out1, out2, out3, out4, out5, in0, in1, in2, in3, in4, in5)
-        else:
-            @cfunc(self._run_fn_sig(batch_processing=False), nopython=True)
-            def run_cfunc(out_ptr, out_shapes_ptr, out_ndims_ptr, num_outs, in_ptr, in_shapes_ptr, in_ndims_ptr, num_ins):
-                out0 = out1 = out2 = out3 = out4 = out5 = None
-                out_shapes_np = _get_shape_view(out_shapes_ptr, out_ndims_ptr, num_outs, 1)
-                out_arr = carray(address_as_void_pointer(out_ptr), num_outs, dtype=np.int64)
-                if num_outs >= 1:
-                    out0 = out0_lambda(address_as_void_pointer(out_arr[0]), out_shapes_np[0][0])
-                if num_outs >= 2:
-                    out1 = out1_lambda(address_as_void_pointer(out_arr[1]), out_shapes_np[1][0])
-                if num_outs >= 3:
-                    out2 = out2_lambda(address_as_void_pointer(out_arr[2]), out_shapes_np[2][0])
-                if num_outs >= 4:
-                    out3 = out3_lambda(address_as_void_pointer(out_arr[3]), out_shapes_np[3][0])
-                if num_outs >= 5:
-                    out4 = out4_lambda(address_as_void_pointer(out_arr[4]), out_shapes_np[4][0])
-                if num_outs >= 6:
-                    out5 = out5_lambda(address_as_void_pointer(out_arr[5]), out_shapes_np[5][0])
-
-                in0 = in1 = in2 = in3 = in4 = in5 = None
-                in_shapes_np = _get_shape_view(in_shapes_ptr, in_ndims_ptr, num_ins, 1)
-                in_arr = carray(address_as_void_pointer(in_ptr), num_ins, dtype=np.int64)
-                if num_ins >= 1:
-                    in0 = in0_lambda(address_as_void_pointer(in_arr[0]), in_shapes_np[0][0])
-                if num_ins >= 2:
-                    in1 = in1_lambda(address_as_void_pointer(in_arr[1]), in_shapes_np[1][0])
-                if num_ins >= 3:
-                    in2 = in2_lambda(address_as_void_pointer(in_arr[2]), in_shapes_np[2][0])
-                if num_ins >= 4:
-                    in3 = in3_lambda(address_as_void_pointer(in_arr[3]), in_shapes_np[3][0])
-                if num_ins >= 5:
-                    in4 = in4_lambda(address_as_void_pointer(in_arr[4]), in_shapes_np[4][0])
-                if num_ins >= 6:
-                    in5 = in5_lambda(address_as_void_pointer(in_arr[5]), in_shapes_np[5][0])
-
-                run_fn_lambda(run_fn, out0, out1, out2, out3, out4, out5, in0, in1, in2, in3, in4, in5)
+        run_cfunc, setup_cfunc = _compile(run_fn, setup_fn, out_types, in_types, outs_ndim,
+                                          ins_ndim, batch_processing)
 
         self._impl_name = "NumbaFuncImpl"
         self._schema = _b.GetSchema(self._impl_name)
@@ -285,7 +415,7 @@ class NumbaFunction(metaclass=ops._DaliOperatorMeta):
             self._spec.AddArg(key, value)
 
         self.run_fn = run_cfunc.address
-        self.setup_fn = setup_fn_address
+        self.setup_fn = setup_cfunc.address if setup_cfunc is not None else None
         self.out_types = out_types
         self.in_types = in_types
         self.outs_ndim = outs_ndim
@@ -83,6 +83,18 @@ def feed_ndarray(dali_tensor, ptr, cuda_stream=None):
     return ptr
 
 
+def _current_stream(device_id):
+    """
+    Returns the raw handle of Paddle's current CUDA stream for the given device
+    or None if the installed Paddle version does not expose it
+    """
+    try:
+        from paddle.device import cuda as pd_cuda
+        return pd_cuda.current_stream(device_id).cuda_stream
+    except (ImportError, AttributeError):
+        return None
+
+
 def recursive_length(tensor, lod_level):
     def _recurse(data, result, level):
         if level > 0:
@@ -188,6 +200,12 @@ class DALIGenericIterator(_DaliBaseIterator):
     prepare_first_batch : bool, optional, default = True
                 Whether DALI should buffer the first batch right after the creation of the iterator,
                 so one batch is already prepared when the iterator is prompted for the data
+    tensor_pool_size : int, optional, default = 0
+                Number of LoDTensors kept for every output to be reused in the next iterations
+                when the output shape and type do not change. A tensor returned by the iterator
+                is overwritten after `tensor_pool_size` subsequent iterations, so it should be
+                greater than the number of batches the training loop keeps alive at once.
+                0 disables the pool and a new LoDTensor is allocated in every iteration
 
     Example
     -------
@@ -216,7 +234,8 @@ class DALIGenericIterator(_DaliBaseIterator):
                  dynamic_shape=False,
                  last_batch_padded=False,
                  last_batch_policy=LastBatchPolicy.FILL,
-                 prepare_first_batch=True):
+                 prepare_first_batch=True,
+                 tensor_pool_size=0):
 
         normalized_map = {}
         for v in output_map:
@@ -244,6 +263,11 @@ class DALIGenericIterator(_DaliBaseIterator):
 
         self._counter = 0
 
+        assert tensor_pool_size >= 0, "tensor_pool_size cannot be negative"
+        self._tensor_pool_size = tensor_pool_size
+        # per pipeline and output: [(shape, type, is GPU), list of LoDTensors, index of the next one]
+        self._tensor_pool = [{} for _ in range(self._num_gpus)]
+
         self._first_batch = None
         if self._prepare_first_batch:
             try:
@@ -259,6 +283,7 @@ class DALIGenericIterator(_DaliBaseIterator):
 
         # Gather outputs
         outputs = self._get_outputs()
+        copy_start = self._stats_timer()
 
         data_batches = [None for i in range(self._num_gpus)]
 
@@ -305,27 +330,42 @@ class DALIGenericIterator(_DaliBaseIterator):
                     category_place[cat] = pd_cpu_place
 
             pd_tensors = {}
+            allocated = False
             for cat, tensor in category_tensors.items():
-                lod_tensor = fluid.core.LoDTensor()
+                pool_key = (tuple(category_shapes[cat]), category_pd_type[cat],
+                            category_place[cat] is pd_gpu_place)
+                lod_tensor = self._get_pooled_tensor(i, cat, pool_key)
+                if lod_tensor is None:
+                    lod_tensor = fluid.core.LoDTensor()
+                    lod_tensor._set_dims(category_shapes[cat])
+                    lod_tensor._mutable_data(category_place[cat],
+                                             category_pd_type[cat])
+                    self._put_pooled_tensor(i, cat, pool_key, lod_tensor)
+                    allocated = True
                 pd_tensors[cat] = lod_tensor
-                lod_tensor._set_dims(category_shapes[cat])
-                seq_len = category_lengths[cat]
-                lod_tensor.set_recursive_sequence_lengths(seq_len)
-                lod_tensor._mutable_data(category_place[cat],
-                                         category_pd_type[cat])
+                lod_tensor.set_recursive_sequence_lengths(category_lengths[cat])
             data_batches[i] = pd_tensors
 
             # due to https://github.com/PaddlePaddle/Paddle/issues/35555 the tensors are allocated
-            # first by setting shape and calling _mutable_data, then the device is synchronized
-            # and after that, another call to _mutable_data is made to obtain the pointer and
-            # copy data from the pipeline to the tensor
-            # when the issue is solved the copy can be moved to the preceding loop
-            fluid.core._cuda_synchronize(pd_gpu_place)
+            # first by setting shape and calling _mutable_data, and another call to _mutable_data
+            # is made to obtain the pointer and copy data from the pipeline to the tensor.
+            # The allocation is ordered on Paddle's current stream, so copying on the same stream
+            # is enough to keep the order, also against the kernels still reading the pooled tensors.
+            # Only when Paddle doesn't expose its stream the device needs to be synchronized
+            stream = None
+            if any(place is pd_gpu_place for place in category_place.values()):
+                stream = _current_stream(dev_id)
+                if stream is None and (allocated or self._tensor_pool_size):
+                    fluid.core._cuda_synchronize(pd_gpu_place)
             for cat, tensor in category_tensors.items():
                 ptr = pd_tensors[cat]._mutable_data(category_place[cat],
                                                category_pd_type[cat])
-                feed_ndarray(tensor, ptr)
+                if category_place[cat] is pd_gpu_place:
+                    feed_ndarray(tensor, ptr, cuda_stream=stream)
+                else:
+                    feed_ndarray(tensor, ptr)
 
+        self._stats_record("copy", copy_start)
         self._schedule_runs()
 
         self._advance_and_check_drop_last()
@@ -369,6 +409,36 @@ class DALIGenericIterator(_DaliBaseIterator):
 
         return data_batches
 
+    def _get_pooled_tensor(self, pipe_idx, category, key):
+        """
+        Returns the next LoDTensor from the pool of the given output if it was allocated
+        for the same `key` (shape, type and device), otherwise None.
+        Only the outputs without LoD information are pooled
+        """
+        if not self._tensor_pool_size or self.normalized_map[category] > 0:
+            return None
+        entry = self._tensor_pool[pipe_idx].get(category)
+        if entry is None or entry[0] != key or len(entry[1]) < self._tensor_pool_size:
+            return None
+        tensors = entry[1]
+        idx = entry[2]
+        entry[2] = (idx + 1) % len(tensors)
+        return tensors[idx]
+
+    def _put_pooled_tensor(self, pipe_idx, category, key, lod_tensor):
+        """
+        Stores a newly allocated LoDTensor in the pool of the given output, dropping
+        the tensors allocated for a different `key`
+        """
+        if not self._tensor_pool_size or self.normalized_map[category] > 0:
+            return
+        pool = self._tensor_pool[pipe_idx]
+        entry = pool.get(category)
+        if entry is None or entry[0] != key:
+            entry = [key, [], 0]
+            pool[category] = entry
+        entry[1].append(lod_tensor)
+
 
 class DALIClassificationIterator(DALIGenericIterator):
     """
@@ -433,6 +503,12 @@ class DALIClassificationIterator(DALIGenericIterator):
     prepare_first_batch : bool, optional, default = True
                 Whether DALI should buffer the first batch right after the creation of the iterator,
                 so one batch is already prepared when the iterator is prompted for the data
+    tensor_pool_size : int, optional, default = 0
+                Number of LoDTensors kept for every output to be reused in the next iterations
+                when the output shape and type do not change. A tensor returned by the iterator
+                is overwritten after `tensor_pool_size` subsequent iterations, so it should be
+                greater than the number of batches the training loop keeps alive at once.
+                0 disables the pool and a new LoDTensor is allocated in every iteration
 
     Example
     -------
@@ -460,7 +536,8 @@ class DALIClassificationIterator(DALIGenericIterator):
                  dynamic_shape=False,
                  last_batch_padded=False,
                  last_batch_policy=LastBatchPolicy.FILL,
-                 prepare_first_batch=True):
+                 prepare_first_batch=True,
+                 tensor_pool_size=0):
         super(DALIClassificationIterator, self).__init__(
             pipelines, ["data", "label"], size, reader_name=reader_name,
             auto_reset=auto_reset,
@@ -468,4 +545,5 @@ class DALIClassificationIterator(DALIGenericIterator):
             dynamic_shape=dynamic_shape,
             last_batch_padded=last_batch_padded,
             last_batch_policy=last_batch_policy,
-            prepare_first_batch=prepare_first_batch)
+            prepare_first_batch=prepare_first_batch,
+            tensor_pool_size=tensor_pool_size)
@@ -188,6 +188,7 @@ class DALIGenericIterator(_DaliBaseIterator):
 
         # Gather outputs
         outputs = self._get_outputs()
+        copy_start = self._stats_timer()
 
         data_batches = [None for i in range(self._num_gpus)]
         for i in range(self._num_gpus):
@@ -236,6 +237,7 @@ class DALIGenericIterator(_DaliBaseIterator):
                 else:
                     feed_ndarray(tensor, pyt_tensors[category])
 
+        self._stats_record("copy", copy_start)
         self._schedule_runs()
 
         self._advance_and_check_drop_last()
@@ -385,15 +387,17 @@ class TorchPythonFunction(ops.PythonFunctionBase):
         self.stream.synchronize()
         return out
 
-    def torch_wrapper(self, batch_processing, function, device, *args):
+    def torch_wrapper(self, batch_processing, function, device, *args, batch_layout="list"):
         func = function if device == 'cpu' else \
                lambda *ins: self._torch_stream_wrapper(function, *ins)
         if batch_processing:
+            stack = torch.stack if batch_layout == "dense" else None
             return ops.PythonFunction.function_wrapper_batch(func,
                                                              self.num_outputs,
                                                              torch.utils.dlpack.from_dlpack,
                                                              torch.utils.dlpack.to_dlpack,
-                                                             *args)
+                                                             *args,
+                                                             stack=stack)
         else:
             return ops.PythonFunction.function_wrapper_per_sample(func,
                                                                   self.num_outputs,
@@ -409,15 +413,19 @@ class TorchPythonFunction(ops.PythonFunctionBase):
             self.stream = torch.cuda.Stream(device=pipeline.device_id)
         return super(TorchPythonFunction, self).__call__(*inputs, **kwargs)
 
-    def __init__(self, function, num_outputs=1, device='cpu', batch_processing=False, **kwargs):
+    def __init__(self, function, num_outputs=1, device='cpu', batch_processing=False,
+                 batch_layout="list", **kwargs):
+        ops._check_batch_layout(batch_layout, batch_processing)
         self.stream = None
         super(TorchPythonFunction, self).__init__(impl_name="DLTensorPythonFunctionImpl",
                                                   function=lambda *ins:
                                                   self.torch_wrapper(batch_processing,
                                                                     function, device,
-                                                                    *ins),
+                                                                    *ins,
+                                                                    batch_layout=batch_layout),
                                                   num_outputs=num_outputs, device=device,
-                                                  batch_processing=batch_processing, **kwargs)
+                                                  batch_processing=batch_processing,
+                                                  batch_layout=batch_layout, **kwargs)
 
 
 
@@ -22,7 +22,8 @@ from nvidia.dali import internal as _internal
 
 from nvidia.dali.external_source import _is_external_source, _is_external_source_with_callback, _has_external_source
 
-from nvidia.dali._utils.external_source_impl import _get_generator_from_source_desc, _cycle_enabled
+from nvidia.dali._utils.external_source_impl import _get_generator_from_source_desc, _cycle_enabled, \
+    get_batch_iterable_from_parallel_group as _get_batch_iterable_from_parallel_group
 
 from collections import Iterable
 from distutils.version import LooseVersion
@@ -86,6 +87,14 @@ a dense, uniform tensor (each sample has the same dimensions). Only CPU data is
 This allows TensorFlow DALIDataset to work with most Pipelines that have External Source
 ``source`` already specified.
 
+External Source nodes with ``parallel=True`` are run by the Python worker pool of the pipeline
+(see ``py_num_workers`` Pipeline argument), the same way as in the standalone Pipeline.
+The whole batches computed by the workers are passed to the generator dataset, so the
+``source`` itself is not run by the TensorFlow's generator thread. In that case, the batches
+must be dense, uniform tensors even if the node works in per-sample mode. As the workers are
+started when the pipeline is built, use ``py_start_method="spawn"`` or call
+:meth:`~nvidia.dali.Pipeline.start_py_workers` before TensorFlow acquires CUDA context.
+
 .. warning::
     This class is experimental and its API might change without notice.
 
@@ -548,14 +557,26 @@ if dataset_compatible_tensorflow():
             in_layouts_list = []
             in_batched_list = []
 
+            # Parallel External Sources are run by the worker pool started with the pipeline
+            py_pool = self._pipeline_instance._py_pool
+            parallel_groups = self._pipeline_instance._parallel_input_callbacks or []
+
             for input_name, external_source in callbacked_es_map.items():
                 in_names_list.append(input_name)
                 layout = _get_external_source_param(input_name, None, callbacked_es_map, 'layout')
                 in_layouts_list.append(layout or "")
 
-                # Batched mode is supported by default
-                batched = _get_external_source_param(input_name, None, callbacked_es_map, 'batch')
-                in_batched_list.append(batched if batched is not None else True)
+                group = external_source._group
+                is_parallel = py_pool is not None and group in parallel_groups \
+                    and not group.is_multioutput
+
+                if is_parallel:
+                    # The pool computes whole batches, regardless of the per-sample mode
+                    in_batched_list.append(True)
+                else:
+                    # Batched mode is supported by default
+                    batched = _get_external_source_param(input_name, None, callbacked_es_map, 'batch')
+                    in_batched_list.append(batched if batched is not None else True)
 
                 source_desc = external_source._op._source_desc
                 if source_desc.cycle == 'raise':
@@ -564,12 +585,17 @@ if dataset_compatible_tensorflow():
 
                 # All generator datasets must be placed on CPU.
                 with tf.device('/cpu:0'):
-                    tf_gen, dtype, shape = _get_generator_from_source_desc(
-                        source_desc, self._batch_size, external_source._batch)
+                    if is_parallel:
+                        tf_gen, dtype, shape = _get_batch_iterable_from_parallel_group(
+                            group, py_pool, parallel_groups.index(group), self._batch_size)
+                    else:
+                        tf_gen, dtype, shape = _get_generator_from_source_desc(
+                            source_desc, self._batch_size, external_source._batch)
                     # dataset = tf.data.Dataset.from_generator(tf_gen, output_types=dtype)
                     signature = _get_signature(dtype, shape)
                     dataset = tf.data.Dataset.from_generator(tf_gen, output_signature=signature)
-                    if _cycle_enabled(source_desc.cycle):
+                    # Parallel sources are rewound by the workers themselves
+                    if _cycle_enabled(source_desc.cycle) and not is_parallel:
                         dataset = dataset.repeat()
                     # if DALIDataset was placed on GPU, we need to add the copy targetting
                     # that device (with proper id).
@@ -0,0 +1,208 @@
+# Copyright (c) 2021, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import weakref
+
+np = None
+
+
+def _import_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy as np
+        except ImportError:
+            raise RuntimeError('Could not import numpy. Please make sure you have numpy '
+                               'installed before you use shared arrays.')
+
+
+def _default_dir():
+    # tmpfs backed, so the files are in fact named shared memory
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _remove_file(path, owner_pid):
+    # forked workers inherit the finalizers, only the creating process removes the file
+    if os.getpid() == owner_pid:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class SharedArray:
+    """Read-only NumPy array stored in a memory-mapped file that can be shared with
+    the Python workers of parallel ExternalSource without copying.
+
+    Use :func:`shared_array` to create an instance. Indexing the instance or converting it
+    with ``np.asarray`` returns read-only views of the mapped memory. When the instance is pickled
+    (``py_start_method="spawn"``), only the path of the file is serialized and the workers map
+    the same file. With ``fork``, the workers inherit the mapping and, as the data is never written,
+    no page gets copied.
+    """
+
+    def __init__(self, path, dtype, shape, owner=False):
+        _import_numpy()
+        self._path = path
+        self._dtype = np.dtype(dtype)
+        self._shape = tuple(shape)
+        self._array = None
+        if owner:
+            weakref.finalize(self, _remove_file, path, os.getpid())
+
+    @property
+    def path(self):
+        """Path of the file with the data."""
+        return self._path
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def shape(self):
+        return self._shape
+
+    @property
+    def array(self):
+        """Read-only NumPy view of the whole data."""
+        if self._array is None:
+            if int(np.prod(self._shape)) == 0:
+                # empty files cannot be mapped
+                array = np.empty(self._shape, dtype=self._dtype)
+                array.flags.writeable = False
+            else:
+                array = np.memmap(self._path, dtype=self._dtype, mode='r', shape=self._shape)
+            self._array = array
+        return self._array
+
+    def __array__(self, dtype=None):
+        array = self.array
+        return array if dtype is None else array.astype(dtype)
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, idx):
+        return self.array[idx]
+
+    def __reduce__(self):
+        # the owner stays in the creating process, which removes the file
+        return SharedArray, (self._path, self._dtype.str, self._shape)
+
+    def __repr__(self):
+        return "SharedArray(path={!r}, dtype={}, shape={})".format(
+            self._path, self._dtype, self._shape)
+
+
+class SharedTable:
+    """Read-only table of strings (or bytes objects) stored in two :class:`SharedArray` instances:
+    the concatenated, encoded entries and the offsets of the entries.
+
+    Use :func:`shared_table` to create an instance. Indexing with an integer returns a new ``str``
+    (or ``bytes``), so no per-entry Python objects are kept alive in the workers.
+    """
+
+    def __init__(self, data, offsets, is_bytes=False):
+        self._data = data
+        self._offsets = offsets
+        self._is_bytes = is_bytes
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("SharedTable index out of range")
+        offsets = self._offsets.array
+        entry = self._data.array[offsets[idx]:offsets[idx + 1]].tobytes()
+        return entry if self._is_bytes else entry.decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reduce__(self):
+        return SharedTable, (self._data, self._offsets, self._is_bytes)
+
+
+def _write_array(array, dir=None):
+    array = np.ascontiguousarray(array)
+    fd, path = tempfile.mkstemp(prefix="dali_shared_", suffix=".bin", dir=dir or _default_dir())
+    with os.fdopen(fd, "wb") as f:
+        array.tofile(f)
+    return SharedArray(path, array.dtype, array.shape, owner=True)
+
+
+def shared_array(array, dir=None):
+    """Copies ``array`` into a memory-mapped file (in ``/dev/shm``, if available) and
+    returns :class:`SharedArray` that exposes it as a read-only NumPy array.
+
+    Create shared arrays for large data used by parallel ExternalSource callbacks
+    (labels, bounding boxes, etc.) before the Python workers are started, so that
+    the memory used by the workers does not grow with the size of the dataset.
+    The file is removed when the returned object is garbage collected in the creating process,
+    so it must be kept alive as long as the workers use it, for instance,
+    by referencing it in the callback.
+
+    Parameters
+    ----------
+    `array` : array_like
+        Data to share. Objects of ``object`` dtype are not supported.
+    `dir` : str, optional
+        Directory to create the file in.
+    """
+    _import_numpy()
+    array = np.asarray(array)
+    if array.dtype.hasobject:
+        raise TypeError("Arrays of Python objects cannot be shared, use `shared_table` "
+                        "for strings.")
+    return _write_array(array, dir)
+
+
+def shared_table(entries, dir=None):
+    """Stores a sequence of strings (or bytes objects), such as a list of file names,
+    in memory-mapped files and returns :class:`SharedTable` giving access to the entries.
+
+    Unlike a Python list, the table does not consist of Python objects, so accessing it
+    in a forked worker does not modify (and copy) the memory pages with the data.
+
+    Parameters
+    ----------
+    `entries` : sequence of str or bytes
+        Entries of the table. All entries must be of the same type.
+    `dir` : str, optional
+        Directory to create the files in.
+    """
+    _import_numpy()
+    entries = list(entries)
+    is_bytes = len(entries) > 0 and isinstance(entries[0], bytes)
+    encoded = []
+    for entry in entries:
+        if isinstance(entry, bytes) != is_bytes or not isinstance(entry, (str, bytes)):
+            raise TypeError("Entries of a shared table must be either all str or all bytes, "
+                            "got {}.".format(type(entry).__name__))
+        encoded.append(entry if is_bytes else entry.encode("utf-8"))
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(entry) for entry in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return SharedTable(_write_array(data, dir), _write_array(offsets, dir), is_bytes)
@@ -505,3 +505,16 @@ class SampleInfo:
         self.idx_in_epoch = idx_in_epoch
         self.idx_in_batch = idx_in_batch
         self.iteration = iteration
+
+class WorkerInfo:
+    """
+    Describes the Python worker running an instance of a generator function passed as ``source``
+    to :meth:`nvidia.dali.fn.external_source` with ``parallel`` set to True. The generator
+    should produce only the data of the shard identified by ``worker_id``.
+
+    :ivar worker_id:   0-based index of the worker
+    :ivar num_workers: total number of the workers, each running its own instance of the generator
+    """
+    def __init__(self, worker_id, num_workers):
+        self.worker_id = worker_id
+        self.num_workers = num_workers
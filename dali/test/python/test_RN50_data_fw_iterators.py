@@ -73,6 +73,8 @@ parser.add_argument('-i', '--iters', default=-1, type=int, metavar='N',
 parser.add_argument('-e', '--epochs', default=1, type=int, metavar='N',
                     help='Number of epochs to run (default: 1)')
 parser.add_argument('--framework', type=str)
+parser.add_argument('--tensor_pool_size', default=0, type=int, metavar='N',
+                    help='Number of reused output tensors, Paddle and MXNet only (default: 0 - disabled)')
 args = parser.parse_args()
 
 print("Framework: {}, GPUs: {}, batch: {}, workers: {}, prefetch depth: {}, loging interval: {}, fp16: {}, args.nhwc: {}"
@@ -165,7 +167,13 @@ def test_fw_iter(IteratorClass, args):
                         .format(iterator_name, j + 1, iters, data_time.avg, data_time.max_val, args.gpus * args.batch_size / data_time.avg))
                 end = time.time()
         else:
-            dali_train_iter = IteratorClass(pipes, reader_name="Reader")
+            iter_kwargs = {}
+            if args.tensor_pool_size:
+                if args.framework == "mxnet":
+                    iter_kwargs["ndarray_pool_size"] = args.tensor_pool_size
+                else:
+                    iter_kwargs["tensor_pool_size"] = args.tensor_pool_size
+            dali_train_iter = IteratorClass(pipes, reader_name="Reader", **iter_kwargs)
             j = 0
             for it in iter(dali_train_iter):
                 data_time.update(time.time() - end)
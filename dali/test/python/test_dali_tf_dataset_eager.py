@@ -333,6 +333,77 @@ def test_tf_with_dali_external_source():
     yield from gen_tf_with_dali_external_source(run_tf_with_dali_external_source)
 
 
+def parallel_sample_callback(sample_info):
+    if sample_info.iteration >= 10:
+        raise StopIteration()
+    return np.full((4, 3), sample_info.idx_in_epoch, dtype=np.int32)
+
+
+@with_setup(skip_inputs_for_incompatible_tf)
+def test_tf_dataset_parallel_external_source():
+    batch_size = 8
+    pipe = Pipeline(batch_size, 4, None, py_num_workers=3, py_start_method='spawn')
+    with pipe:
+        input = fn.external_source(source=parallel_sample_callback, batch=False, parallel=True)
+        pipe.set_outputs(fn.pad(input))
+
+    with tf.device('/cpu:0'):
+        dali_dataset = dali_tf.experimental.DALIDatasetWithInputs(
+                pipeline=pipe,
+                batch_size=pipe.max_batch_size,
+                output_shapes=None,
+                output_dtypes=tf.int32,
+                num_threads=pipe.num_threads,
+                device_id=None)
+
+    iterations = 0
+    for iteration, batch in enumerate(dali_dataset):
+        first_sample = iteration * batch_size
+        expected = np.arange(first_sample, first_sample + batch_size, dtype=np.int32)
+        expected = np.broadcast_to(expected[:, np.newaxis, np.newaxis], (batch_size, 4, 3))
+        assert np.array_equal(batch.numpy(), expected)
+        iterations += 1
+    assert iterations == 10
+
+
+def parallel_sample_callback_other(sample_info):
+    if sample_info.iteration >= 10:
+        raise StopIteration()
+    return np.full((2, 5), -sample_info.idx_in_epoch, dtype=np.int32)
+
+
+@with_setup(skip_inputs_for_incompatible_tf)
+def test_tf_dataset_two_parallel_external_sources():
+    # the generators of the inputs run in separate threads and share the worker pool
+    batch_size = 8
+    pipe = Pipeline(batch_size, 4, None, py_num_workers=3, py_start_method='spawn')
+    with pipe:
+        input = fn.external_source(source=parallel_sample_callback, batch=False, parallel=True)
+        other = fn.external_source(source=parallel_sample_callback_other, batch=False,
+                                   parallel=True, prefetch_queue_depth=3)
+        pipe.set_outputs(fn.pad(input), fn.pad(other))
+
+    with tf.device('/cpu:0'):
+        dali_dataset = dali_tf.experimental.DALIDatasetWithInputs(
+                pipeline=pipe,
+                batch_size=pipe.max_batch_size,
+                output_shapes=None,
+                output_dtypes=(tf.int32, tf.int32),
+                num_threads=pipe.num_threads,
+                device_id=None)
+
+    iterations = 0
+    for iteration, (batch, other_batch) in enumerate(dali_dataset):
+        first_sample = iteration * batch_size
+        idx = np.arange(first_sample, first_sample + batch_size, dtype=np.int32)
+        expected = np.broadcast_to(idx[:, np.newaxis, np.newaxis], (batch_size, 4, 3))
+        expected_other = np.broadcast_to(-idx[:, np.newaxis, np.newaxis], (batch_size, 2, 5))
+        assert np.array_equal(batch.numpy(), expected)
+        assert np.array_equal(other_batch.numpy(), expected_other)
+        iterations += 1
+    assert iterations == 10
+
+
 @with_setup(skip_inputs_for_incompatible_tf)
 def test_tf_dataset_layouts():
     for shape, layout in [((2, 3), "XY"), ((10, 20, 3), "HWC"), ((4, 128, 64, 3), "FHWC")]:
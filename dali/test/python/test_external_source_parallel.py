@@ -29,27 +29,9 @@ def multi_arg_fun(a, b, c):
     pass
 
 
-class Iterable:
-    def __init__(self):
-        pass
-
-    def __iter__(self):
-        return self
-
-    def __next__(self):
-        return np.full((2, 2), 42)
-
-
-def generator_fun():
-    while True:
-        yield np.full((2, 2), 42)
-
-
 disallowed_sources = [
     no_arg_fun,
     multi_arg_fun,
-    Iterable(),
-    generator_fun
 ]
 
 
@@ -62,9 +44,7 @@ def test_wrong_source():
     common_msg = "External Source in parallel mode (when `parallel=True`) accepts as `source` only *. Got {} instead"
     expected_error_msgs = [
         common_msg.format("a callable that does not accept arguments"),
-        "External source callback must be a callable with 0 or 1 argument",
-        common_msg.format("an iterable"),
-        common_msg.format("a generator function")]
+        "External source callback must be a callable with 0 or 1 argument"]
     assert len(disallowed_sources) == len(expected_error_msgs)
     for source, error_msg in zip(disallowed_sources, expected_error_msgs):
         yield raises(TypeError, error_msg)(check_source_build), source
@@ -242,3 +222,144 @@ def test_discard():
             sample_in_epoch = 0
             iteration = 0
             pipe.reset()
+
+
+def sample_gen():
+    for i in range(50):
+        yield np.full((2, 3), i, dtype=np.int32)
+
+
+def default_arg_gen(n=20):
+    for i in range(n):
+        yield np.full((2,), i, dtype=np.int32)
+
+
+def worker_sample_gen(worker_info):
+    for i in range(worker_info.worker_id, 30, worker_info.num_workers):
+        yield np.full((2,), i, dtype=np.int32)
+
+
+def collect_epochs(pipe, epochs):
+    result = []
+    for _ in range(epochs):
+        epoch = []
+        try:
+            while True:
+                out, = pipe.run()
+                epoch.append([np.array(out.at(i)) for i in range(len(out))])
+        except StopIteration:
+            pipe.reset()
+        result.append(epoch)
+    return result
+
+
+def collect_batches(pipe, num_batches):
+    result = []
+    for _ in range(num_batches):
+        out, = pipe.run()
+        result.append([np.array(out.at(i)) for i in range(len(out))])
+    return result
+
+
+def create_source_pipe(source, batch_size, batch, parallel, py_num_workers=3, cycle="raise"):
+    pipe = dali.Pipeline(batch_size=batch_size, device_id=None, num_threads=2,
+                         py_num_workers=py_num_workers, py_start_method='spawn')
+    with pipe:
+        pipe.set_outputs(dali.fn.external_source(
+            source, batch=batch, parallel=parallel, cycle=cycle))
+    return pipe
+
+
+@with_setup(setup_function, teardown_function)
+def _test_source_vs_non_parallel(source, batch_size, batch):
+    seq_pipe = create_source_pipe(source, batch_size, batch, parallel=False)
+    par_pipe = create_source_pipe(source, batch_size, batch, parallel=True)
+    seq_pipe.build()
+    par_pipe.build()
+    capture_processes(par_pipe._py_pool)
+    seq_epochs = collect_epochs(seq_pipe, 2)
+    par_epochs = collect_epochs(par_pipe, 2)
+    assert len(seq_epochs[0]) > 0
+    assert len(seq_epochs) == len(par_epochs)
+    for seq_epoch, par_epoch in zip(seq_epochs, par_epochs):
+        assert len(seq_epoch) == len(par_epoch)
+        for seq_batch, par_batch in zip(seq_epoch, par_epoch):
+            for s, p in zip(seq_batch, par_batch):
+                assert np.array_equal(s, p)
+
+
+def test_generator_vs_non_parallel():
+    for batch_size in [1, 4, 7]:
+        yield _test_source_vs_non_parallel, sample_gen, batch_size, False
+
+
+def test_iterable_vs_non_parallel():
+    batches = [[np.full((3,), 10 * i + j, dtype=np.int16) for j in range(4)] for i in range(11)]
+    yield _test_source_vs_non_parallel, batches, 4, True
+
+
+@with_setup(setup_function, teardown_function)
+def test_generator_worker_info():
+    batch_size = 2
+    num_workers = 3
+    pipe = create_source_pipe(worker_sample_gen, batch_size, False, parallel=True,
+                              py_num_workers=num_workers)
+    pipe.build()
+    capture_processes(pipe._py_pool)
+    for epoch in collect_epochs(pipe, 2):
+        # each worker yields 10 samples, i.e. 5 full batches, batches are assigned round-robin
+        assert len(epoch) == 15
+        for batch_idx, batch in enumerate(epoch):
+            worker_id = batch_idx % num_workers
+            worker_iter = batch_idx // num_workers
+            for sample_idx, sample in enumerate(batch):
+                expected = worker_id + num_workers * (worker_iter * batch_size + sample_idx)
+                assert np.array_equal(sample, np.full((2,), expected, dtype=np.int32))
+
+
+def test_generator_worker_info_non_parallel():
+    pipe = create_source_pipe(worker_sample_gen, 3, False, parallel=False)
+    pipe.build()
+    epoch, = collect_epochs(pipe, 1)
+    assert len(epoch) == 10
+    for batch_idx, batch in enumerate(epoch):
+        for sample_idx, sample in enumerate(batch):
+            assert np.array_equal(sample, np.full((2,), 3 * batch_idx + sample_idx, dtype=np.int32))
+
+
+def test_generator_default_arg_non_parallel():
+    # a parameter with a default value does not make the generator accept WorkerInfo
+    pipe = create_source_pipe(default_arg_gen, 4, False, parallel=False)
+    pipe.build()
+    epoch, = collect_epochs(pipe, 1)
+    assert len(epoch) == 5
+    for batch_idx, batch in enumerate(epoch):
+        for sample_idx, sample in enumerate(batch):
+            assert np.array_equal(sample, np.full((2,), 4 * batch_idx + sample_idx, dtype=np.int32))
+
+
+def test_generator_default_arg_vs_non_parallel():
+    yield _test_source_vs_non_parallel, default_arg_gen, 4, False
+
+
+@with_setup(setup_function, teardown_function)
+def _test_quiet_cycle_vs_non_parallel(source, batch_size, batch, num_batches):
+    seq_pipe = create_source_pipe(source, batch_size, batch, parallel=False, cycle="quiet")
+    par_pipe = create_source_pipe(source, batch_size, batch, parallel=True, cycle="quiet")
+    seq_pipe.build()
+    par_pipe.build()
+    capture_processes(par_pipe._py_pool)
+    seq_batches = collect_batches(seq_pipe, num_batches)
+    par_batches = collect_batches(par_pipe, num_batches)
+    for seq_batch, par_batch in zip(seq_batches, par_batches):
+        assert len(seq_batch) == len(par_batch)
+        for s, p in zip(seq_batch, par_batch):
+            assert np.array_equal(s, p)
+
+
+def test_quiet_cycle_vs_non_parallel():
+    # the number of batches in the epoch is not a multiple of the number of workers (3)
+    batches = [[np.full((3,), 10 * i + j, dtype=np.int16) for j in range(4)] for i in range(11)]
+    yield _test_quiet_cycle_vs_non_parallel, batches, 4, True, 40
+    # 50 samples, batches span the rewinds
+    yield _test_quiet_cycle_vs_non_parallel, sample_gen, 7, False, 30
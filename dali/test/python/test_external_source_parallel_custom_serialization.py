@@ -474,6 +474,34 @@ def _test_reader_closure(name, py_callback_pickler):
     _build_and_compare_pipelines_epochs(epochs_num, batch_size, parallel_pipeline, serial_pipeline)
 
 
+# large enough to be passed to the workers out-of-band, through the shared memory
+global_annotations_table = np.arange(256 * 1024, dtype=np.int32).reshape(-1, 4) + os.getpid()
+
+
+@register_case(tests_dali_pickling)
+@register_case(tests_dill_pickling)
+@register_case(tests_cloudpickle_pickling)
+def _test_large_global_array(name, py_callback_pickler):
+    def callback(sample_info):
+        return global_annotations_table[sample_info.idx_in_epoch % len(global_annotations_table)]
+    _create_and_compare_simple_pipelines(callback, py_callback_pickler, batch_size=8, py_num_workers=3)
+
+
+@restrict_python_version(3, 8)
+def test_out_of_band_buffers():
+    pickler = dali_pickle._CustomPickler.create(dali_pickle._DaliPickle)
+    small_array = np.full((4, 4), 42)
+    data, buffers = pickler.dumps_out_of_band([lambda: (global_annotations_table, small_array)])
+    assert len(buffers) == 1
+    assert len(data) < global_annotations_table.nbytes
+    read_only_buffers = [memoryview(buffer.raw()).toreadonly() for buffer in buffers]
+    callback, = pickler.loads_out_of_band(data, read_only_buffers)
+    table, small = callback()
+    assert np.array_equal(table, global_annotations_table)
+    assert not table.flags.writeable
+    assert np.array_equal(small, small_array)
+
+
 @restrict_python_version(3, 8)
 def test_dali_pickling():
     for i, test in enumerate(tests_dali_pickling, start=1):
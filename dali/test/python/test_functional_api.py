@@ -13,6 +13,9 @@
 # limitations under the License.
 
 from typing import Type
+import subprocess
+import sys
+import time
 import nvidia.dali.fn as fn
 from nvidia.dali.pipeline import Pipeline
 import nvidia.dali.types as types
@@ -177,3 +180,51 @@ def test_to_snake_case_impl():
 
     for inp, out in fn_name_tests:
         assert fn._to_snake_case(inp) == out, f"{fn._to_snake_case(inp)} != {out}"
+
+
+def test_lazy_ops_dir():
+    import nvidia.dali.ops as ops
+    from nvidia.dali import backend as _b
+    registered = set(_b.RegisteredCPUOps()).union(_b.RegisteredGPUOps(), _b.RegisteredMixedOps())
+    for op_name in registered:
+        _, submodule, name = ops._process_op_name(op_name)
+        ops_module = ops
+        fn_module = fn
+        for part in submodule:
+            ops_module = getattr(ops_module, part)
+            fn_module = getattr(fn_module, part)
+        assert name in dir(ops_module), "{} missing in dir()".format(op_name)
+        assert isinstance(getattr(ops_module, name), type), op_name
+        if name != "ExternalSource" and not name.startswith("_"):
+            fn_name = fn._to_snake_case(name)
+            assert fn_name in dir(fn_module), "{} missing in dir()".format(fn_name)
+            assert callable(getattr(fn_module, fn_name))
+    # the same object is returned after the materialization
+    assert ops.Resize is ops.Resize
+    assert fn.resize is fn.resize
+
+
+def _import_time(statement):
+    # the best of several runs in fresh processes, to limit the noise
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", statement])
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_lazy_ops_import_time():
+    import_stmt = "import nvidia.dali.fn; import nvidia.dali.ops"
+    materialize_stmt = import_stmt + "; [getattr(nvidia.dali.fn, name) for name in dir(nvidia.dali.fn)]; " \
+        "[getattr(nvidia.dali.ops, name) for name in dir(nvidia.dali.ops)]"
+    lazy_time = _import_time(import_stmt)
+    eager_time = _import_time(materialize_stmt)
+    print("Import: {:.3f} s, import with all top-level operators created: {:.3f} s".format(
+        lazy_time, eager_time))
+    assert lazy_time < eager_time
+    # the operators are registered, but not created at import
+    check_stmt = import_stmt + "; ops = nvidia.dali.ops; " \
+        "assert 'Resize' in dir(ops) and 'Resize' not in vars(ops); " \
+        "assert 'resize' in dir(nvidia.dali.fn) and 'resize' not in vars(nvidia.dali.fn)"
+    subprocess.check_call([sys.executable, "-c", check_stmt])
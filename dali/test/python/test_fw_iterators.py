@@ -1509,3 +1509,118 @@ def test_pytorch_feed_ndarray():
     out = pipe.run()[0]
     torch_tensor = torch.empty((1), dtype=torch.int8, device = 'cpu')
     assert_raises(AssertionError, feed_ndarray, out, torch_tensor, glob="The element type of DALI Tensor/TensorList doesn't match the element type of the target PyTorch Tensor:")
+
+def check_iterator_stats(Iterator, *args, **kwargs):
+    max_batch_size = 4
+    iter_limit = 5
+    test_data_shape = [2, 3, 4]
+    dataset = [[np.random.randint(0, 255, size=test_data_shape, dtype=np.uint8)
+                for _ in range(max_batch_size)] for _ in range(iter_limit)]
+
+    pipe = Pipeline(batch_size=max_batch_size, num_threads=1, device_id=0)
+    with pipe:
+        data = fn.external_source(source=dataset, cycle=True)
+    pipe.set_outputs(data)
+
+    it = Iterator([pipe], *args, size=iter_limit * max_batch_size, **kwargs)
+    assert_raises(RuntimeError, it.stats, glob="Statistics are not enabled")
+    recorded = []
+    it.enable_stats(window_size=3, callback=recorded.append)
+    for _ in it:
+        pass
+    stats = it.stats()
+    # the first batch is prepared ahead when the iterator is created
+    assert stats["iterations"] == iter_limit - 1
+    assert len(recorded) == iter_limit - 1
+    for metric in ["share_outputs", "copy", "schedule", "queue_depth"]:
+        assert all(metric in r for r in recorded), metric
+        assert stats[metric]["p50"] <= stats[metric]["p99"] <= stats[metric]["max"], metric
+    assert [r["iteration"] for r in recorded] == list(range(1, iter_limit))
+    it.disable_stats()
+    it.reset()
+    for _ in it:
+        pass
+    assert len(recorded) == iter_limit - 1
+
+def test_mxnet_iterator_stats():
+    from nvidia.dali.plugin.mxnet import DALIGenericIterator as MXNetIterator
+    check_iterator_stats(MXNetIterator, [("data", MXNetIterator.DATA_TAG)])
+
+def test_gluon_iterator_stats():
+    from nvidia.dali.plugin.mxnet import DALIGluonIterator as GluonIterator
+    check_iterator_stats(GluonIterator, output_types=[GluonIterator.DENSE_TAG])
+
+def test_pytorch_iterator_stats():
+    from nvidia.dali.plugin.pytorch import DALIGenericIterator as PyTorchIterator
+    check_iterator_stats(PyTorchIterator, output_map=["data"])
+
+def test_paddle_iterator_stats():
+    from nvidia.dali.plugin.paddle import DALIGenericIterator as PaddleIterator
+    check_iterator_stats(PaddleIterator, output_map=["data"])
+
+def test_paddle_iterator_tensor_pool():
+    from nvidia.dali.plugin.paddle import DALIGenericIterator as PaddleIterator
+    max_batch_size = 4
+    iter_limit = 6
+    pool_size = 2
+    test_data_shape = [2, 3, 4]
+    dataset = [[np.random.randint(0, 255, size=test_data_shape, dtype=np.uint8)
+                for _ in range(max_batch_size)] for _ in range(iter_limit)]
+
+    pipe = Pipeline(batch_size=max_batch_size, num_threads=1, device_id=0)
+    with pipe:
+        data = fn.external_source(source=dataset, cycle=True)
+    pipe.set_outputs(data, data.gpu())
+
+    it = PaddleIterator([pipe], ["cpu", "gpu"], size=iter_limit * max_batch_size,
+                        tensor_pool_size=pool_size)
+    alive = []
+    for j, batch in enumerate(it):
+        for category in ["cpu", "gpu"]:
+            assert (np.array(batch[0][category]) == np.stack(dataset[j])).all()
+        alive.append(batch[0]["gpu"])
+        if len(alive) > pool_size:
+            # a tensor is reused only after `pool_size` iterations
+            assert alive[-1] is alive[-1 - pool_size]
+        if len(alive) > 1:
+            assert alive[-1] is not alive[-2]
+
+def check_mxnet_iterator_ndarray_pool(Iterator, get_arrays, *args, **kwargs):
+    max_batch_size = 4
+    iter_limit = 6
+    pool_size = 2
+    test_data_shape = [2, 3, 4]
+    dataset = [[np.random.randint(0, 255, size=test_data_shape, dtype=np.uint8)
+                for _ in range(max_batch_size)] for _ in range(iter_limit)]
+
+    pipe = Pipeline(batch_size=max_batch_size, num_threads=1, device_id=0)
+    with pipe:
+        data = fn.external_source(source=dataset, cycle=True)
+    pipe.set_outputs(data, data.gpu())
+
+    it = Iterator([pipe], *args, size=iter_limit * max_batch_size,
+                  ndarray_pool_size=pool_size, **kwargs)
+    alive = []
+    for j, batch in enumerate(it):
+        arrays = get_arrays(batch[0])
+        for arr in arrays:
+            assert (arr.asnumpy() == np.stack(dataset[j])).all()
+        alive.append(arrays[0])
+        if len(alive) > pool_size:
+            # NDArrays are reused only after `pool_size` iterations
+            assert alive[-1] is alive[-1 - pool_size]
+        if len(alive) > 1:
+            assert alive[-1] is not alive[-2]
+
+def test_mxnet_iterator_ndarray_pool():
+    from nvidia.dali.plugin.mxnet import DALIGenericIterator as MXNetIterator
+    check_mxnet_iterator_ndarray_pool(MXNetIterator, lambda batch: batch.data + batch.label,
+                                      [("data", MXNetIterator.DATA_TAG),
+                                       ("label", MXNetIterator.LABEL_TAG)],
+                                      squeeze_labels=False)
+
+def test_gluon_iterator_ndarray_pool():
+    from nvidia.dali.plugin.mxnet import DALIGluonIterator as GluonIterator
+    check_mxnet_iterator_ndarray_pool(GluonIterator, lambda batch: batch,
+                                      output_types=[GluonIterator.DENSE_TAG,
+                                                    GluonIterator.DENSE_TAG])
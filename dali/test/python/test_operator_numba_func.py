@@ -14,6 +14,8 @@
 
 import numpy as np
 import os
+import subprocess
+import sys
 from numba import cfunc, types, carray, njit
 
 from nvidia.dali import pipeline_def
@@ -207,3 +209,67 @@ def test_multiple_ins():
         outs = pipe.run()
         out_arr = np.array(outs[0][0])
         assert np.array_equal(out_arr, np.zeros((10, 10, 3), dtype=np.uint8))
+
+def test_compilation_cache():
+    import nvidia.dali.plugin.numba.experimental as numba_experimental
+    from nvidia.dali.plugin.numba.experimental import NumbaFunction
+    def create(run_fn, out_types=[dali_types.UINT8]):
+        return NumbaFunction(run_fn=run_fn, out_types=out_types, in_types=[dali_types.UINT8],
+                             outs_ndim=[3], ins_ndim=[3], batch_processing=True)
+    op = create(set_all_values_to_255_batch)
+    compiled = []
+    original_njit = numba_experimental.njit
+    numba_experimental.njit = lambda fn: compiled.append(fn) or original_njit(fn)
+    try:
+        same_op = create(set_all_values_to_255_batch)
+        assert not compiled, "The cached function was compiled again"
+        assert same_op.run_fn == op.run_fn
+        assert create(reverse_col_batch).run_fn != op.run_fn
+        assert create(set_all_values_to_255_batch, [dali_types.INT64]).run_fn != op.run_fn
+    finally:
+        numba_experimental.njit = original_njit
+
+fill_value = 1
+
+def set_all_values_to_global_sample(out0, in0):
+    out0[:] = fill_value
+
+def test_compilation_cache_globals():
+    # numba freezes the globals at compile time, so a changed value must not hit the cache
+    global fill_value
+    shapes = [(10, 10, 10)]
+    try:
+        for value in (1, 2, 1):
+            fill_value = value
+            _testimpl_numba_func(shapes, np.uint8, set_all_values_to_global_sample,
+                                 [dali_types.UINT8], [dali_types.UINT8], [3], [3], None, None,
+                                 [np.full(shapes[0], value, dtype=np.uint8)])
+    finally:
+        fill_value = 1
+
+def test_function_digest_not_digestible_global():
+    import threading
+    from nvidia.dali.plugin.numba.experimental import _function_digest
+    global fill_value
+    try:
+        fill_value = threading.Lock()  # cannot be pickled
+        try:
+            _function_digest(set_all_values_to_global_sample)
+            assert False, "The digest of an unpicklable global should fail"
+        except TypeError:
+            pass
+    finally:
+        fill_value = 1
+
+def test_function_digest_across_processes():
+    # the key of the on-disk cache must not change between the processes
+    from nvidia.dali.plugin.numba.experimental import _function_digest
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    script = ("import sys; sys.path.insert(0, {!r}); "
+              "from test_operator_numba_func import set_all_values_to_255_batch; "
+              "from nvidia.dali.plugin.numba.experimental import _function_digest; "
+              "print(_function_digest(set_all_values_to_255_batch))").format(test_dir)
+    digests = {subprocess.check_output([sys.executable, "-c", script],
+                                       env=dict(os.environ, PYTHONHASHSEED=str(seed)))
+               .decode().strip().splitlines()[-1] for seed in range(2)}
+    assert digests == {_function_digest(set_all_values_to_255_batch)}
@@ -563,3 +563,147 @@ def test_invalid_layouts_arg():
         pipe.set_outputs(out)
     pipe.build()
     pipe.run()
+
+
+def dense_batch_pipeline(func, shapes, **kwargs):
+    pipe = Pipeline(batch_size=len(shapes), num_threads=1, device_id=None,
+                    exec_async=False, exec_pipelined=False)
+    with pipe:
+        data = fn.external_source(
+            source=lambda: [numpy.full(shape, i, dtype=numpy.float32) for i, shape in enumerate(shapes)])
+        pipe.set_outputs(fn.python_function(data, function=func, batch_processing=True,
+                                            batch_layout="dense", **kwargs))
+    pipe.build()
+    return pipe
+
+
+def test_dense_batch_layout():
+    shapes = [(3, 4)] * BATCH_SIZE
+    def scale(batch):
+        assert isinstance(batch, numpy.ndarray)
+        assert batch.shape == (len(shapes), 3, 4)
+        return batch * 2
+    out, = dense_batch_pipeline(scale, shapes).run()
+    assert len(out) == len(shapes)
+    for i in range(len(shapes)):
+        numpy.testing.assert_array_equal(out.at(i), numpy.full((3, 4), 2 * i, dtype=numpy.float32))
+
+
+def test_dense_batch_layout_multiple_outputs():
+    shapes = [(2, 5)] * BATCH_SIZE
+    def split(batch):
+        return batch[:, 0], [sample[1] for sample in batch]
+    first, second = dense_batch_pipeline(split, shapes, num_outputs=2).run()
+    for i in range(len(shapes)):
+        numpy.testing.assert_array_equal(first.at(i), numpy.full((5,), i, dtype=numpy.float32))
+        numpy.testing.assert_array_equal(second.at(i), numpy.full((5,), i, dtype=numpy.float32))
+
+
+def test_dense_batch_layout_view():
+    batch_size = 4
+    def check_view(batch):
+        # a dense input batch is passed as a single tensor, without stacking the samples
+        assert not batch.flags.owndata
+        return batch + 1
+    pipe = Pipeline(batch_size=batch_size, num_threads=1, device_id=None,
+                    exec_async=False, exec_pipelined=False)
+    with pipe:
+        data = fn.external_source(
+            source=lambda: numpy.arange(batch_size * 6, dtype=numpy.int32).reshape(batch_size, 2, 3))
+        pipe.set_outputs(fn.python_function(data, function=check_view, batch_processing=True,
+                                            batch_layout="dense"))
+    pipe.build()
+    out, = pipe.run()
+    for i in range(batch_size):
+        numpy.testing.assert_array_equal(
+            out.at(i), numpy.arange(6 * i, 6 * (i + 1), dtype=numpy.int32).reshape(2, 3) + 1)
+
+
+def test_dense_batch_layout_scalar_outputs():
+    shapes = [(3,)] * BATCH_SIZE
+    def total(batch):
+        # 1D output, one scalar per sample
+        return batch.sum(axis=1)
+    out, = dense_batch_pipeline(total, shapes).run()
+    assert len(out) == len(shapes)
+    for i in range(len(shapes)):
+        sample = out.at(i)
+        assert sample.shape == ()
+        assert sample == 3 * i
+
+
+def test_dense_batch_layout_strided_output():
+    shapes = [(4, 6)] * BATCH_SIZE
+    def transpose(batch):
+        return batch.transpose(0, 2, 1)[:, ::2]
+    out, = dense_batch_pipeline(transpose, shapes).run()
+    for i in range(len(shapes)):
+        numpy.testing.assert_array_equal(out.at(i), numpy.full((3, 4), i, dtype=numpy.float32))
+
+
+@raises(RuntimeError, glob="*batch_layout*requires*same shape*")
+def test_dense_batch_layout_non_uniform():
+    pipe = dense_batch_pipeline(lambda batch: batch, [(2, 2), (3, 2)])
+    pipe.run()
+
+
+@raises(ValueError, glob="*batch_layout*only with*batch_processing*")
+def test_dense_batch_layout_per_sample():
+    fn.python_function(function=lambda x: x, batch_layout="dense")
+
+
+@raises(ValueError, glob="Unsupported*batch_layout*")
+def test_unsupported_batch_layout():
+    fn.python_function(function=lambda x: x, batch_processing=True, batch_layout="ragged")
+
+
+def scale_and_sum(image):
+    return (image * 0.5).astype(numpy.uint8), numpy.array([image.sum()], dtype=numpy.int64)
+
+
+def parallel_function_pipeline(parallel, py_num_workers=3):
+    pipe = Pipeline(BATCH_SIZE, NUM_WORKERS, None, SEED, exec_async=False, exec_pipelined=False,
+                    py_num_workers=py_num_workers)
+    with pipe:
+        jpegs, _ = fn.readers.file(file_root=images_dir, random_shuffle=True, seed=SEED)
+        images = fn.decoders.image(jpegs, device='cpu')
+        scaled, sums = fn.python_function(images, function=scale_and_sum, num_outputs=2,
+                                          parallel=parallel)
+        pipe.set_outputs(images, scaled, sums)
+    return pipe
+
+
+def _test_parallel_python_function(py_num_workers):
+    pipe = parallel_function_pipeline(parallel=True, py_num_workers=py_num_workers)
+    pipe.build()
+    for _ in range(3):
+        images, scaled, sums = pipe.run()
+        for i in range(len(images)):
+            expected_scaled, expected_sum = scale_and_sum(images.at(i))
+            numpy.testing.assert_array_equal(scaled.at(i), expected_scaled)
+            numpy.testing.assert_array_equal(sums.at(i), expected_sum)
+
+
+def test_parallel_python_function():
+    for py_num_workers in [0, 1, 3]:
+        yield _test_parallel_python_function, py_num_workers
+
+
+def failing_function(image):
+    raise ValueError("Failing in the worker")
+
+
+@raises(RuntimeError, glob="*Failing in the worker*")
+def test_parallel_python_function_error():
+    pipe = Pipeline(BATCH_SIZE, NUM_WORKERS, None, SEED, exec_async=False, exec_pipelined=False,
+                    py_num_workers=2)
+    with pipe:
+        data = fn.external_source(lambda: [numpy.zeros((2, 2))] * BATCH_SIZE, batch=True)
+        pipe.set_outputs(fn.python_function(data, function=failing_function, parallel=True))
+    pipe.build()
+    pipe.run()
+
+
+@raises(ValueError, glob="*parallel=True*batch_processing=True*")
+def test_parallel_python_function_batch():
+    fn.python_function(function=lambda x: x, batch_processing=True, parallel=True)
@@ -18,6 +18,7 @@ from nose_utils import raises
 import nvidia.dali.fn as fn
 from test_utils import get_dali_extra_path, compare_pipelines
 import os
+import numpy as np
 
 data_root = get_dali_extra_path()
 images_dir = os.path.join(data_root, 'db', 'single', 'jpeg')
@@ -115,3 +116,76 @@ def pipeline_kwargs(arg1, arg2, *args, **kwargs):
 @raises(TypeError, regex="\*\*kwargs.*not allowed")
 def test_kwargs_exception():
     pipeline_kwargs(arg1=1, arg2=2, arg3=3)
+
+
+@pipeline_def(enable_graph_cache=True, batch_size=max_batch_size, num_threads=num_threads,
+              device_id=device_id)
+def pipeline_cached(flip_vertical, flip_horizontal):
+    data, _ = fn.readers.file(file_root=images_dir)
+    img = fn.decoders.image(data)
+    flipped = fn.flip(img, horizontal=flip_horizontal, vertical=flip_vertical)
+    return flipped, img
+
+
+def test_pipeline_graph_cache():
+    from nvidia.dali.pipeline import _graph_cache
+    _graph_cache.clear()
+    first = pipeline_cached(1, 0, seed=42)
+    # the cache is filled when the pipeline is built
+    assert len(_graph_cache) == 0
+    first.build()
+    assert len(_graph_cache) == 1
+    second = pipeline_cached(1, 0, seed=42)
+    assert len(_graph_cache) == 1
+    assert second._serialized_graph is not None and not second._py_graph_built
+    assert second.serialize() == first.serialize()
+    compare_pipelines(first, second, batch_size=max_batch_size, N_iterations=N_ITER)
+    # different arguments are cached separately
+    other = pipeline_cached(0, 1, seed=42)
+    ref = reference_pipeline(0, 1)
+    compare_pipelines(other, ref, batch_size=max_batch_size, N_iterations=N_ITER)
+    assert len(_graph_cache) == 2
+
+
+def test_pipeline_graph_cache_start_py_workers():
+    from nvidia.dali.pipeline import _graph_cache
+    _graph_cache.clear()
+    pipeline_cached(1, 0, seed=42).build()
+    pipe = pipeline_cached(1, 0, seed=42)
+    assert pipe._serialized_graph is not None
+    pipe.start_py_workers()
+    pipe.build()
+    ref = reference_pipeline(1, 0)
+    compare_pipelines(pipe, ref, batch_size=max_batch_size, N_iterations=N_ITER)
+
+
+def test_pipeline_graph_cache_size_limit():
+    from nvidia.dali import pipeline as dali_pipeline
+    dali_pipeline._graph_cache.clear()
+    for i in range(dali_pipeline._GRAPH_CACHE_SIZE + 1):
+        dali_pipeline._graph_cache_put(i, b'')
+    assert len(dali_pipeline._graph_cache) == dali_pipeline._GRAPH_CACHE_SIZE
+    # the least recently used entry is evicted first
+    assert 0 not in dali_pipeline._graph_cache
+    assert dali_pipeline._graph_cache_get(1) == b''
+    dali_pipeline._graph_cache_put(-1, b'')
+    assert 1 in dali_pipeline._graph_cache and 2 not in dali_pipeline._graph_cache
+    dali_pipeline._graph_cache.clear()
+
+
+def test_pipeline_graph_cache_not_cacheable():
+    from nvidia.dali.pipeline import _graph_cache
+    _graph_cache.clear()
+    # no fixed seed
+    pipeline_cached(1, 0).build()
+    assert len(_graph_cache) == 0
+
+    @pipeline_def(enable_graph_cache=True, batch_size=max_batch_size, num_threads=num_threads,
+                  device_id=device_id, seed=42)
+    def pipeline_es():
+        return fn.external_source(source=lambda: np.zeros((max_batch_size, 2)))
+
+    pipeline_es().build()
+    pipe = pipeline_es()
+    assert len(_graph_cache) == 0
+    assert pipe._serialized_graph is None
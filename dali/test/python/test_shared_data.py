@@ -0,0 +1,107 @@
+# Copyright (c) 2021, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import os
+import pickle
+import numpy as np
+from nose_utils import raises
+
+import nvidia.dali as dali
+import nvidia.dali.fn as fn
+from nvidia.dali import pipeline_def
+
+
+def test_shared_array():
+    data = np.arange(60, dtype=np.float32).reshape(3, 4, 5)
+    shared = dali.shared_array(data)
+    assert shared.shape == data.shape and shared.dtype == data.dtype
+    assert np.array_equal(np.asarray(shared), data)
+    assert np.array_equal(shared[1], data[1])
+    assert not shared[1].flags.writeable
+    unpickled = pickle.loads(pickle.dumps(shared))
+    assert unpickled.path == shared.path
+    assert np.array_equal(unpickled[2, 3], data[2, 3])
+
+
+def test_shared_array_removed():
+    shared = dali.shared_array(np.zeros(10))
+    path = shared.path
+    assert os.path.exists(path)
+    del shared
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_shared_array_empty():
+    shared = dali.shared_array(np.zeros((0, 4), dtype=np.int32))
+    assert np.asarray(shared).shape == (0, 4)
+
+
+@raises(TypeError, glob="*Python objects*")
+def test_shared_array_object():
+    dali.shared_array(np.array([{}, []], dtype=object))
+
+
+def test_shared_table():
+    entries = ["img_{}.jpg".format(i) for i in range(100)] + ["", "zażółć.png"]
+    table = dali.shared_table(entries)
+    assert len(table) == len(entries)
+    assert list(table) == entries
+    assert table[-1] == entries[-1]
+    assert table[3:7] == entries[3:7]
+    unpickled = pickle.loads(pickle.dumps(table))
+    assert list(unpickled) == entries
+
+
+def test_shared_table_bytes():
+    entries = [bytes([i] * i) for i in range(10)]
+    assert list(dali.shared_table(entries)) == entries
+
+
+@raises(TypeError, glob="*either all str or all bytes*")
+def test_shared_table_mixed():
+    dali.shared_table(["a", b"b"])
+
+
+def create_shared_callback(size):
+    labels = dali.shared_array(np.arange(size, dtype=np.int64) * 3)
+    names = dali.shared_table(["sample_{}".format(i) for i in range(size)])
+
+    # the closure is pickled by value in spawn mode, the workers map the same files
+    def callback(sample_info):
+        idx = sample_info.idx_in_epoch % len(labels)
+        return np.array(labels[idx]), np.frombuffer(names[idx].encode(), dtype=np.uint8)
+
+    return callback
+
+
+def _test_shared_data_in_workers(py_start_method):
+    @pipeline_def(batch_size=8, num_threads=1, device_id=None, py_num_workers=2,
+                  py_start_method=py_start_method)
+    def pipe():
+        return fn.external_source(create_shared_callback(1000), num_outputs=2, batch=False, parallel=True)
+    p = pipe()
+    p.build()
+    for it in range(3):
+        out_labels, out_names = p.run()
+        for i in range(8):
+            idx = it * 8 + i
+            assert out_labels.at(i) == idx * 3
+            assert out_names.at(i).tobytes().decode() == "sample_{}".format(idx)
+
+
+def test_shared_data_in_workers():
+    for py_start_method in ["fork", "spawn"]:
+        yield _test_shared_data_in_workers, py_start_method
@@ -30,6 +30,9 @@ flags.DEFINE_string("tfrecord_file_pattern", None, "Glob for tfrecord files.")
 flags.DEFINE_string(
     "tfrecord2idx_script", None, "Absolute path to tfrecord2idx script."
 )
+flags.DEFINE_integer(
+    "num_jobs", os.cpu_count(), "Number of tfrecord files indexed in parallel."
+)
 FLAGS = flags.FLAGS
 
 
@@ -46,9 +49,17 @@ def main(_):
             "{FLAGS.tfrecord2idx_script} does not lead to valid tfrecord2idx script."
         )
 
-    for tfrecord, tfrecord_idx in zip(tfrecord_files, tfrecord_idxs):
-        logging.info(f"Generating index file for {tfrecord}")
-        call([FLAGS.tfrecord2idx_script, tfrecord, tfrecord_idx])
+    if not tfrecord_files:
+        logging.warning(f"No files match {FLAGS.tfrecord_file_pattern}")
+        return
+
+    logging.info(f"Generating index files for {len(tfrecord_files)} tfrecord files")
+    files = [
+        filename
+        for pair in zip(tfrecord_files, tfrecord_idxs)
+        for filename in pair
+    ]
+    call([FLAGS.tfrecord2idx_script, "-j", str(FLAGS.num_jobs)] + files)
 
 
 if __name__ == "__main__":
@@ -310,7 +310,7 @@ class EfficientDetNet(tf.keras.Model):
         # )
 
         cls_out_list, box_out_list = self.call(features, training=False)
-        ltrb, scores, classes, _ = postprocess.postprocess_per_class(
+        ltrb, scores, classes, _ = postprocess.postprocess_batched(
             self.config, cls_out_list, box_out_list
         )
         classes = tf.cast(classes, dtype=tf.int32)
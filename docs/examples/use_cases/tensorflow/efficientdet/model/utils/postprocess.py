@@ -152,21 +152,8 @@ def pre_nms(params, cls_outputs, box_outputs, topk=True):
     return boxes, scores, classes
 
 
-def nms(params, boxes: T, scores: T, classes: T, padded: bool) -> Tuple[T, T, T, T]:
-    """Non-maximum suppression.
-
-    Args:
-      params: a dict of parameters.
-      boxes: a tensor with shape [N, 4], where N is the number of boxes. Box
-        format is [y_min, x_min, y_max, x_max].
-      scores: a tensor with shape [N].
-      classes: a tensor with shape [N].
-      padded: a bool vallue indicating whether the results are padded.
-
-    Returns:
-      A tuple (boxes, scores, classes, valid_lens), where valid_lens is a scalar
-      denoting the valid length of boxes/scores/classes outputs.
-    """
+def nms_thresholds(params) -> Tuple[float, float, float, int]:
+    """Returns (sigma, iou_thresh, score_thresh, max_output_size) of the nms method."""
     nms_configs = params["nms_configs"]
     method = nms_configs["method"]
     max_output_size = nms_configs["max_output_size"]
@@ -182,6 +169,25 @@ def nms(params, boxes: T, scores: T, classes: T, padded: bool) -> Tuple[T, T, T,
         score_thresh = nms_configs["score_thresh"] or 0.001
     else:
         raise ValueError("Inference has invalid nms method {}".format(method))
+    return sigma, iou_thresh, score_thresh, max_output_size
+
+
+def nms(params, boxes: T, scores: T, classes: T, padded: bool) -> Tuple[T, T, T, T]:
+    """Non-maximum suppression.
+
+    Args:
+      params: a dict of parameters.
+      boxes: a tensor with shape [N, 4], where N is the number of boxes. Box
+        format is [y_min, x_min, y_max, x_max].
+      scores: a tensor with shape [N].
+      classes: a tensor with shape [N].
+      padded: a bool vallue indicating whether the results are padded.
+
+    Returns:
+      A tuple (boxes, scores, classes, valid_lens), where valid_lens is a scalar
+      denoting the valid length of boxes/scores/classes outputs.
+    """
+    sigma, iou_thresh, score_thresh, max_output_size = nms_thresholds(params)
 
     # TF API's sigma is twice as the paper's value, so here we divide it by 2:
     # https://github.com/tensorflow/tensorflow/issues/40253.
@@ -288,3 +294,174 @@ def postprocess_per_class(params, cls_outputs, box_outputs, image_scales=None):
     box_outputs = to_list(box_outputs)
     boxes, scores, classes = pre_nms(params, cls_outputs, box_outputs)
     return per_class_nms(params, boxes, scores, classes, image_scales)
+
+
+def _pairwise_iou(box: T, boxes: T) -> T:
+    """IoU of boxes [N, 4] with boxes [N, K, 4] of the same batch element, [N, K]."""
+    box = tf.expand_dims(box, 1)
+    intersect_heights = tf.maximum(
+        0.0,
+        tf.minimum(box[..., 2], boxes[..., 2]) - tf.maximum(box[..., 0], boxes[..., 0]),
+    )
+    intersect_widths = tf.maximum(
+        0.0,
+        tf.minimum(box[..., 3], boxes[..., 3]) - tf.maximum(box[..., 1], boxes[..., 1]),
+    )
+    intersections = intersect_heights * intersect_widths
+    areas1 = (box[..., 2] - box[..., 0]) * (box[..., 3] - box[..., 1])
+    areas2 = (boxes[..., 2] - boxes[..., 0]) * (boxes[..., 3] - boxes[..., 1])
+    unions = areas1 + areas2 - intersections
+    return tf.math.divide_no_nan(intersections, unions)
+
+
+def batched_soft_nms(params, boxes, scores, classes):
+    """Class-aware soft (gaussian) nms over the whole batch.
+
+    Greedily selects the box with the highest score in every batch element and decays
+    the scores of the remaining boxes of the same class, max_output_size times. As the
+    decay only affects boxes of the same class, it gives the same results as per-class
+    soft nms followed by selecting the boxes with the highest scores.
+
+    Args:
+      params: a dict of parameters.
+      boxes: A tensor with shape [N, K, 4], where N is batch_size, K is num_boxes.
+        Box format is [y_min, x_min, y_max, x_max].
+      scores: A tensor with shape [N, K].
+      classes: A tensor with shape [N, K].
+
+    Returns:
+      A tuple of batch level (boxes, scores, classess, valid_len) after nms.
+    """
+    sigma, iou_thresh, score_thresh, max_output_size = nms_thresholds(params)
+    batch_size = tf.shape(boxes)[0]
+    removed = tf.constant(float("-inf"), scores.dtype)
+    scores = tf.where(scores > score_thresh, scores, removed)
+
+    def body(step, scores, nms_idx, nms_scores):
+        idx = tf.math.argmax(scores, axis=1, output_type=tf.int32)
+        best = tf.gather(scores, idx, batch_dims=1)
+        box = tf.gather(boxes, idx, batch_dims=1)
+        box_class = tf.gather(classes, idx, batch_dims=1)
+
+        iou = _pairwise_iou(box, boxes)
+        same_class = tf.equal(classes, tf.expand_dims(box_class, 1))
+        # TF API's sigma is twice as the paper's value, see nms.
+        weight = tf.math.exp(-iou * iou / sigma)
+        weight = tf.where(iou <= iou_thresh, weight, tf.zeros_like(weight))
+        scores = tf.where(same_class, scores * weight, scores)
+        scores = tf.where(scores > score_thresh, scores, removed)
+        scores = tf.tensor_scatter_nd_update(
+            scores,
+            tf.stack([tf.range(batch_size), idx], axis=1),
+            tf.fill([batch_size], removed),
+        )
+
+        nms_idx = nms_idx.write(step, idx)
+        nms_scores = nms_scores.write(step, best)
+        return step + 1, scores, nms_idx, nms_scores
+
+    _, _, nms_idx, nms_scores = tf.while_loop(
+        lambda step, *_: step < max_output_size,
+        body,
+        (
+            tf.constant(0),
+            scores,
+            tf.TensorArray(tf.int32, size=max_output_size),
+            tf.TensorArray(scores.dtype, size=max_output_size),
+        ),
+    )
+    nms_idx = tf.transpose(nms_idx.stack())
+    nms_scores = tf.transpose(nms_scores.stack())
+
+    # the selected scores are non-increasing, so the valid outputs come first
+    valid = nms_scores > score_thresh
+    nms_valid_len = tf.reduce_sum(tf.cast(valid, tf.int32), axis=1)
+    nms_boxes = tf.where(
+        tf.expand_dims(valid, -1), tf.gather(boxes, nms_idx, batch_dims=1), 0.0
+    )
+    nms_scores = tf.where(valid, nms_scores, tf.zeros_like(nms_scores))
+    nms_classes = tf.cast(tf.gather(classes, nms_idx, batch_dims=1) + CLASS_OFFSET, tf.float32)
+    nms_classes = tf.where(valid, nms_classes, tf.zeros_like(nms_classes))
+    return nms_boxes, nms_scores, nms_classes, nms_valid_len
+
+
+def batched_nms(params, boxes, scores, classes, image_scales=None):
+    """Class-aware nms over the whole batch, the batched counterpart of per_class_nms.
+
+    Hard nms runs as a single combined_non_max_suppression op, gaussian nms as
+    batched_soft_nms.
+
+    Args:
+      params: a dict of parameters.
+      boxes: A tensor with shape [N, K, 4], where N is batch_size, K is num_boxes.
+        Box format is [y_min, x_min, y_max, x_max].
+      scores: A tensor with shape [N, K].
+      classes: A tensor with shape [N, K].
+      image_scales: scaling factor or the final image and bounding boxes.
+
+    Returns:
+      A tuple of batch level (boxes, scores, classess, valid_len) after nms,
+      padded to max_output_size.
+    """
+    sigma, iou_thresh, score_thresh, max_output_size = nms_thresholds(params)
+    if sigma > 0:
+        nms_boxes, nms_scores, nms_classes, nms_valid_len = batched_soft_nms(
+            params, boxes, scores, classes
+        )
+    else:
+        # every box is a candidate only for its class, the other classes get a score
+        # below the threshold (sigmoid scores are non-negative)
+        score_thresh = max(score_thresh, -1.0)
+        class_scores = tf.where(
+            tf.equal(
+                tf.expand_dims(classes, -1),
+                tf.range(params["num_classes"], dtype=classes.dtype),
+            ),
+            tf.expand_dims(scores, -1),
+            -tf.ones_like(tf.expand_dims(scores, -1)),
+        )
+        nms_boxes, nms_scores, nms_classes, nms_valid_len = tf.image.combined_non_max_suppression(
+            tf.expand_dims(boxes, 2),
+            class_scores,
+            max_output_size_per_class=max_output_size,
+            max_total_size=max_output_size,
+            iou_threshold=iou_thresh,
+            score_threshold=score_thresh,
+            clip_boxes=False,
+        )
+        nms_classes = tf.cast(nms_classes + CLASS_OFFSET, tf.float32)
+        # padded outputs get class 0, as in per_class_nms
+        nms_classes = tf.where(
+            tf.range(max_output_size) < tf.expand_dims(nms_valid_len, 1),
+            nms_classes,
+            tf.zeros_like(nms_classes),
+        )
+
+    if image_scales is not None:
+        scales = tf.expand_dims(tf.expand_dims(image_scales, -1), -1)
+        nms_boxes = nms_boxes * tf.cast(scales, nms_boxes.dtype)
+    return nms_boxes, nms_scores, nms_classes, nms_valid_len
+
+
+def postprocess_batched(params, cls_outputs, box_outputs, image_scales=None):
+    """Post processing with class-aware NMS over the whole batch.
+
+    Gives the same results as postprocess_per_class, but runs the NMS of all the
+    images and classes at once instead of mapping over the batch and the classes.
+
+    Args:
+      params: a dict of parameters.
+      cls_outputs: a list of tensors for classes, each tensor denotes a level of
+        logits with shape [N, H, W, num_class * num_anchors].
+      box_outputs: a list of tensors for boxes, each tensor ddenotes a level of
+        boxes with shape [N, H, W, 4 * num_anchors]. Each box format is [y_min,
+        x_min, y_max, x_man].
+      image_scales: scaling factor or the final image and bounding boxes.
+
+    Returns:
+      A tuple of batch level (boxes, scores, classess, valid_len) after nms.
+    """
+    cls_outputs = to_list(cls_outputs)
+    box_outputs = to_list(box_outputs)
+    boxes, scores, classes = pre_nms(params, cls_outputs, box_outputs)
+    return batched_nms(params, boxes, scores, classes, image_scales)
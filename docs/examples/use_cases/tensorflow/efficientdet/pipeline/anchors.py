@@ -14,17 +14,66 @@
 # ==============================================================================
 """Anchor definition."""
 import collections
+import hashlib
+import os
+import tempfile
 import numpy as np
 import tensorflow as tf
 
 import utils
-from .anchors_utils import argmax_matcher
-from .anchors_utils import box_list
-from .anchors_utils import faster_rcnn_box_coder
-from .anchors_utils import region_similarity_calculator
-from .anchors_utils import target_assigner
 
 MAX_DETECTION_POINTS = 5000
+# same as in FasterRcnnBoxCoder, avoids NaN in division and log
+BOX_CODER_EPSILON = 1e-8
+
+# anchor boxes are shared by the input pipelines, the model and postprocessing, they
+# are computed once for given image size, levels, scales and aspect ratios
+_anchor_boxes_cache = {}
+
+# the boxes are also stored on disk, so that other processes (e.g. the workers of a multi-GPU
+# run or a later evaluation) load them instead of generating them again;
+# the directory can be changed with EFFICIENTDET_CACHE_DIR, an empty value disables it
+_ANCHOR_BOXES_CACHE_VERSION = 1
+
+
+def _anchor_boxes_cache_dir():
+    cache_dir = os.environ.get(
+        "EFFICIENTDET_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "efficientdet"),
+    )
+    return os.path.join(cache_dir, "anchors") if cache_dir else None
+
+
+def _anchor_boxes_cache_path(key):
+    cache_dir = _anchor_boxes_cache_dir()
+    if cache_dir is None:
+        return None
+    # the key consists of ints, floats and tuples of them, their repr is the same in every process
+    digest = hashlib.sha256(repr((_ANCHOR_BOXES_CACHE_VERSION, key)).encode()).hexdigest()
+    return os.path.join(cache_dir, digest + ".npy")
+
+
+def _load_anchor_boxes(path):
+    try:
+        return np.load(path, allow_pickle=False)
+    except (OSError, ValueError):
+        return None  # missing or damaged file
+
+
+def _store_anchor_boxes(path, boxes):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written to a temporary file first, so that readers never see a partial one
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, boxes, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass  # e.g. read-only file system, the boxes are generated again next time
 
 
 def decode_box_outputs(pred_boxes, anchor_boxes):
@@ -91,7 +140,8 @@ class Anchors:
         self.image_size = utils.parse_image_size(image_size)
         self.feat_sizes = utils.get_feat_sizes(image_size, max_level)
         self.config = self._generate_configs()
-        self.boxes = self._generate_boxes()
+        self.boxes_array = self._get_boxes_array()
+        self.boxes = tf.convert_to_tensor(self.boxes_array, dtype=tf.float32)
 
     def _generate_configs(self):
         """Generate configurations of anchor boxes."""
@@ -116,53 +166,88 @@ class Anchors:
                     )
         return anchor_configs
 
+    def _cache_key(self):
+        aspect_ratios = tuple(
+            tuple(aspect) if isinstance(aspect, list) else aspect
+            for aspect in self.aspect_ratios
+        )
+        return (
+            tuple(self.image_size),
+            self.min_level,
+            self.max_level,
+            self.num_scales,
+            aspect_ratios,
+            tuple(self.anchor_scales),
+        )
+
+    def _get_boxes_array(self):
+        """Returns read-only array of the anchor boxes, computed once per configuration."""
+        key = self._cache_key()
+        boxes = _anchor_boxes_cache.get(key)
+        if boxes is None:
+            path = _anchor_boxes_cache_path(key)
+            boxes = _load_anchor_boxes(path) if path is not None else None
+            if boxes is None:
+                boxes = self._generate_boxes()
+                if path is not None:
+                    _store_anchor_boxes(path, boxes)
+            boxes.flags.writeable = False
+            _anchor_boxes_cache[key] = boxes
+        return boxes
+
     def _generate_boxes(self):
         """Generates multiscale anchor boxes."""
+        aspect_x = np.array(
+            [aspect[0] if isinstance(aspect, list) else np.sqrt(aspect) for aspect in self.aspect_ratios]
+        )
+        aspect_y = np.array(
+            [aspect[1] if isinstance(aspect, list) else 1.0 / np.sqrt(aspect) for aspect in self.aspect_ratios]
+        )
+        octave_scales = np.arange(self.num_scales)[:, np.newaxis] / float(self.num_scales)
+
+        feat_sizes = self.feat_sizes
         boxes_all = []
-        for _, configs in self.config.items():
-            boxes_level = []
-            for config in configs:
-                stride, octave_scale, aspect, anchor_scale = config
-                base_anchor_size_x = anchor_scale * stride[1] * 2 ** octave_scale
-                base_anchor_size_y = anchor_scale * stride[0] * 2 ** octave_scale
-                if isinstance(aspect, list):
-                    aspect_x, aspect_y = aspect
-                else:
-                    aspect_x = np.sqrt(aspect)
-                    aspect_y = 1.0 / aspect_x
-                anchor_size_x_2 = base_anchor_size_x * aspect_x / 2.0
-                anchor_size_y_2 = base_anchor_size_y * aspect_y / 2.0
-
-                x = np.arange(stride[1] / 2, self.image_size[1], stride[1])
-                y = np.arange(stride[0] / 2, self.image_size[0], stride[0])
-                xv, yv = np.meshgrid(x, y)
-                xv = xv.reshape(-1)
-                yv = yv.reshape(-1)
-
-                boxes = np.vstack(
-                    (
-                        yv - anchor_size_y_2,
-                        xv - anchor_size_x_2,
-                        yv + anchor_size_y_2,
-                        xv + anchor_size_x_2,
-                    )
-                )
-                boxes = np.swapaxes(boxes, 0, 1)
-                boxes_level.append(np.expand_dims(boxes, axis=1))
-            # concat anchors on the same level to the reshape NxAx4
-            boxes_level = np.concatenate(boxes_level, axis=1)
+        for level in range(self.min_level, self.max_level + 1):
+            stride_y = feat_sizes[0]["height"] / float(feat_sizes[level]["height"])
+            stride_x = feat_sizes[0]["width"] / float(feat_sizes[level]["width"])
+            anchor_scale = self.anchor_scales[level - self.min_level]
+
+            # [num_scales * num_aspect_ratios] in the order of the anchor configs
+            anchor_size_x_2 = (anchor_scale * stride_x * 2 ** octave_scales * aspect_x / 2.0).reshape(-1)
+            anchor_size_y_2 = (anchor_scale * stride_y * 2 ** octave_scales * aspect_y / 2.0).reshape(-1)
+
+            x = np.arange(stride_x / 2, self.image_size[1], stride_x)
+            y = np.arange(stride_y / 2, self.image_size[0], stride_y)
+            # [height * width, 1] centers, row-major
+            xv = np.tile(x, len(y))[:, np.newaxis]
+            yv = np.repeat(y, len(x))[:, np.newaxis]
+
+            boxes_level = np.stack(
+                (
+                    yv - anchor_size_y_2,
+                    xv - anchor_size_x_2,
+                    yv + anchor_size_y_2,
+                    xv + anchor_size_x_2,
+                ),
+                axis=-1,
+            )
             boxes_all.append(boxes_level.reshape([-1, 4]))
 
-        anchor_boxes = np.vstack(boxes_all)
-        anchor_boxes = tf.convert_to_tensor(anchor_boxes, dtype=tf.float32)
-        return anchor_boxes
+        return np.concatenate(boxes_all).astype(np.float32)
 
     def get_anchors_per_location(self):
         return self.num_scales * len(self.aspect_ratios)
 
 
 class AnchorLabeler(object):
-    """Labeler for multiscale anchor boxes."""
+    """Labeler for multiscale anchor boxes.
+
+    Matches anchors with ground truth boxes (argmax matching on IoU, where every
+    ground truth box is matched with at least its best anchor), encodes the box
+    targets with the Faster R-CNN box coder and splits the results into pyramid
+    levels in a single vectorised pass. The results are the same as of composing
+    IouSimilarity, ArgMaxMatcher, TargetAssigner and FasterRcnnBoxCoder.
+    """
 
     def __init__(self, anchors, num_classes, match_threshold=0.5):
         """Constructs anchor labeler to assign labels to anchors.
@@ -173,42 +258,188 @@ class AnchorLabeler(object):
           match_threshold: float number between 0 and 1 representing the threshold
             to assign positive labels for anchors.
         """
-        similarity_calc = region_similarity_calculator.IouSimilarity()
-        matcher = argmax_matcher.ArgMaxMatcher(
-            match_threshold,
-            unmatched_threshold=match_threshold,
-            negatives_lower_than_unmatched=True,
-            force_match_for_each_row=True,
-        )
-        box_coder = faster_rcnn_box_coder.FasterRcnnBoxCoder()
-
-        self._target_assigner = target_assigner.TargetAssigner(
-            similarity_calc, matcher, box_coder
-        )
         self._anchors = anchors
         self._match_threshold = match_threshold
         self._num_classes = num_classes
 
-    def _unpack_labels(self, labels):
-        """Unpacks an array of labels into multiscales labels."""
-        labels_unpacked = collections.OrderedDict()
-        anchors = self._anchors
-        count = 0
+        self._anchor_boxes = anchors.boxes_array
+        self._num_anchors = self._anchor_boxes.shape[0]
+        self._level_shapes = []
+        self._level_sizes = []
         for level in range(anchors.min_level, anchors.max_level + 1):
             feat_size = anchors.feat_sizes[level]
-            steps = (
+            self._level_shapes.append((feat_size["height"], feat_size["width"]))
+            self._level_sizes.append(
                 feat_size["height"]
                 * feat_size["width"]
                 * anchors.get_anchors_per_location()
             )
-            indices = tf.range(count, count + steps)
-            count += steps
+
+    def _unpack_labels(self, labels):
+        """Unpacks a batch of labels [batch, num_anchors, d] into multiscale labels."""
+        labels_unpacked = collections.OrderedDict()
+        batch_size = tf.shape(labels)[0]
+        levels = tf.split(labels, self._level_sizes, axis=1)
+        for level, level_labels, (height, width) in zip(
+            range(self._anchors.min_level, self._anchors.max_level + 1),
+            levels,
+            self._level_shapes,
+        ):
             labels_unpacked[level] = tf.reshape(
-                tf.gather(labels, indices),
-                [feat_size["height"], feat_size["width"], -1],
+                level_labels, [batch_size, height, width, -1]
             )
         return labels_unpacked
 
+    def _encode(self, boxes):
+        """Encodes boxes [..., num_anchors, 4] with respect to the anchors."""
+        anchors = self._anchor_boxes
+        ycenter_a = (anchors[:, 0] + anchors[:, 2]) / 2
+        xcenter_a = (anchors[:, 1] + anchors[:, 3]) / 2
+        ha = np.maximum(BOX_CODER_EPSILON, anchors[:, 2] - anchors[:, 0])
+        wa = np.maximum(BOX_CODER_EPSILON, anchors[:, 3] - anchors[:, 1])
+
+        ycenter = (boxes[..., 0] + boxes[..., 2]) / 2
+        xcenter = (boxes[..., 1] + boxes[..., 3]) / 2
+        h = tf.maximum(BOX_CODER_EPSILON, boxes[..., 2] - boxes[..., 0])
+        w = tf.maximum(BOX_CODER_EPSILON, boxes[..., 3] - boxes[..., 1])
+
+        ty = (ycenter - ycenter_a) / ha
+        tx = (xcenter - xcenter_a) / wa
+        th = tf.math.log(h / ha)
+        tw = tf.math.log(w / wa)
+        return tf.stack([ty, tx, th, tw], axis=-1)
+
+    def _iou(self, gt_boxes):
+        """Pairwise IoU [..., num_gt, num_anchors] of boxes and the anchors."""
+        anchors = self._anchor_boxes
+        gt_boxes = gt_boxes[..., np.newaxis, :]
+        intersect_heights = tf.maximum(
+            0.0,
+            tf.minimum(gt_boxes[..., 2], anchors[:, 2])
+            - tf.maximum(gt_boxes[..., 0], anchors[:, 0]),
+        )
+        intersect_widths = tf.maximum(
+            0.0,
+            tf.minimum(gt_boxes[..., 3], anchors[:, 3])
+            - tf.maximum(gt_boxes[..., 1], anchors[:, 1]),
+        )
+        intersections = intersect_heights * intersect_widths
+        gt_areas = (gt_boxes[..., 2] - gt_boxes[..., 0]) * (gt_boxes[..., 3] - gt_boxes[..., 1])
+        anchor_areas = (anchors[:, 2] - anchors[:, 0]) * (anchors[:, 3] - anchors[:, 1])
+        unions = gt_areas + anchor_areas - intersections
+        return tf.where(
+            intersections == 0.0,
+            tf.zeros_like(intersections),
+            intersections / tf.where(unions == 0.0, tf.ones_like(unions), unions),
+        )
+
+    def label_anchors_batch(self, gt_boxes, gt_labels, chunk_size=None):
+        """Labels anchors with a batch of ground truth inputs.
+
+        Args:
+          gt_boxes: A float tensor with shape [batch_size, N, 4] representing
+            groundtruth boxes, padded with -1 at the end. For each row, it stores
+            [y0, x0, y1, x1] for four corners of a box.
+          gt_labels: A float tensor with shape [batch_size, N, 1] representing
+            groundtruth classes, padded with -1 at the end.
+          chunk_size: if set, the images are labeled in groups of at most that many
+            images, one after another. The IoU matrix [chunk_size, N, num_anchors]
+            is then the largest intermediate result, instead of [batch_size, N, num_anchors].
+        Returns:
+          cls_targets_dict: ordered dictionary with keys
+            [min_level, min_level+1, ..., max_level]. The values are tensor with
+            shape [batch_size, height_l, width_l, num_anchors].
+          box_targets_dict: ordered dictionary with keys
+            [min_level, min_level+1, ..., max_level]. The values are tensor with
+            shape [batch_size, height_l, width_l, num_anchors * 4].
+          num_positives: tensor with shape [batch_size] storing number of positives
+            in every image.
+        """
+        gt_boxes = tf.cast(gt_boxes, tf.float32)
+        gt_labels = tf.cast(gt_labels, tf.float32)
+        batch_size = tf.shape(gt_boxes)[0]
+        gt_labels = tf.reshape(gt_labels, [batch_size, -1])
+
+        if chunk_size is None:
+            cls_targets, box_targets, num_positives = self._match(gt_boxes, gt_labels)
+        else:
+            # the batch is padded with images without boxes to a multiple of chunk_size
+            num_chunks = (batch_size + chunk_size - 1) // chunk_size
+            padding = [[0, num_chunks * chunk_size - batch_size], [0, 0]]
+            gt_boxes = tf.pad(gt_boxes, padding + [[0, 0]], constant_values=-1)
+            gt_labels = tf.pad(gt_labels, padding, constant_values=-1)
+            num_gt = tf.shape(gt_labels)[1]
+            cls_targets, box_targets, num_positives = tf.map_fn(
+                lambda chunk: self._match(*chunk),
+                (
+                    tf.reshape(gt_boxes, [num_chunks, chunk_size, num_gt, 4]),
+                    tf.reshape(gt_labels, [num_chunks, chunk_size, num_gt]),
+                ),
+                fn_output_signature=(
+                    tf.TensorSpec([chunk_size, self._num_anchors, 1], tf.int32),
+                    tf.TensorSpec([chunk_size, self._num_anchors, 4], tf.float32),
+                    tf.TensorSpec([chunk_size], tf.float32),
+                ),
+                parallel_iterations=1,
+            )
+            cls_targets = tf.reshape(cls_targets, [-1, self._num_anchors, 1])[:batch_size]
+            box_targets = tf.reshape(box_targets, [-1, self._num_anchors, 4])[:batch_size]
+            num_positives = tf.reshape(num_positives, [-1])[:batch_size]
+
+        cls_targets_dict = self._unpack_labels(cls_targets)
+        box_targets_dict = self._unpack_labels(box_targets)
+        return cls_targets_dict, box_targets_dict, num_positives
+
+    def _match(self, gt_boxes, gt_labels):
+        """Matches the anchors with padded boxes [batch, N, 4] and labels [batch, N],
+        returns the class [batch, num_anchors, 1] and box [batch, num_anchors, 4] targets
+        and the number of positives [batch]."""
+        batch_size = tf.shape(gt_boxes)[0]
+        valid = gt_labels >= 0
+
+        # drop the padding present in all the images, but keep at least one row
+        num_gt = tf.reduce_max(tf.reduce_sum(tf.cast(valid, tf.int32), axis=1))
+        num_gt = tf.minimum(tf.maximum(num_gt, 1), tf.shape(gt_labels)[1])
+        gt_boxes = gt_boxes[:, :num_gt]
+        gt_labels = gt_labels[:, :num_gt]
+        valid = valid[:, :num_gt]
+
+        # padded boxes never win the argmax
+        ious = self._iou(gt_boxes)
+        ious = tf.where(valid[..., tf.newaxis], ious, -tf.ones_like(ious))
+
+        matches = tf.argmax(ious, axis=1, output_type=tf.int32)
+        matched_vals = tf.reduce_max(ious, axis=1)
+        matches = tf.where(
+            matched_vals < self._match_threshold, -tf.ones_like(matches), matches
+        )
+
+        # every groundtruth box is matched with its best anchor, on conflicts the first box wins
+        num_segments = batch_size * self._num_anchors
+        force_match_anchors = tf.argmax(ious, axis=2, output_type=tf.int32)
+        segment_ids = force_match_anchors + self._num_anchors * tf.range(batch_size)[:, tf.newaxis]
+        segment_ids = tf.where(valid, segment_ids, tf.fill(tf.shape(segment_ids), num_segments))
+        rows = tf.broadcast_to(tf.range(num_gt)[tf.newaxis], tf.shape(segment_ids))
+        force_matches = tf.math.unsorted_segment_min(
+            tf.reshape(rows, [-1]), tf.reshape(segment_ids, [-1]), num_segments + 1
+        )
+        force_matches = tf.reshape(force_matches[:-1], [batch_size, self._num_anchors])
+        matches = tf.where(force_matches < num_gt, force_matches, matches)
+
+        matched = matches >= 0
+        matched_idx = tf.maximum(matches, 0)
+        matched_boxes = tf.gather(gt_boxes, matched_idx, batch_dims=1)
+        matched_labels = tf.gather(gt_labels, matched_idx, batch_dims=1)
+
+        # class labels start from 1 and the background class = -1
+        cls_targets = tf.where(matched, matched_labels, tf.zeros_like(matched_labels)) - 1
+        cls_targets = tf.cast(cls_targets[..., tf.newaxis], tf.int32)
+        box_targets = self._encode(matched_boxes)
+        box_targets = tf.where(matched[..., tf.newaxis], box_targets, tf.zeros_like(box_targets))
+        num_positives = tf.reduce_sum(tf.cast(matched, tf.float32), axis=1)
+
+        return cls_targets, box_targets, num_positives
+
     def label_anchors(self, gt_boxes, gt_labels):
         """Labels anchors with ground truth inputs.
 
@@ -229,23 +460,13 @@ class AnchorLabeler(object):
             l-th level.
           num_positives: scalar tensor storing number of positives in an image.
         """
-        gt_box_list = box_list.BoxList(gt_boxes)
-        anchor_box_list = box_list.BoxList(self._anchors.boxes)
-
-        # cls_weights, box_weights are not used
-        cls_targets, _, box_targets, _, matches = self._target_assigner.assign(
-            anchor_box_list, gt_box_list, gt_labels
+        # a padding row allows images without any groundtruth boxes
+        gt_boxes = tf.concat([tf.cast(tf.reshape(gt_boxes, [-1, 4]), tf.float32), -tf.ones([1, 4])], axis=0)
+        gt_labels = tf.concat([tf.cast(tf.reshape(gt_labels, [-1, 1]), tf.float32), -tf.ones([1, 1])], axis=0)
+        cls_targets_dict, box_targets_dict, num_positives = self.label_anchors_batch(
+            gt_boxes[tf.newaxis], gt_labels[tf.newaxis]
         )
-
-        # class labels start from 1 and the background class = -1
-        cls_targets -= 1
-        cls_targets = tf.cast(cls_targets, tf.int32)
-
-        # Unpack labels.
-        cls_targets_dict = self._unpack_labels(cls_targets)
-        box_targets_dict = self._unpack_labels(box_targets)
-        num_positives = tf.reduce_sum(
-            tf.cast(tf.not_equal(matches.match_results, -1), tf.float32)
-        )
-
-        return cls_targets_dict, box_targets_dict, num_positives
+        for level in cls_targets_dict:
+            cls_targets_dict[level] = cls_targets_dict[level][0]
+            box_targets_dict[level] = box_targets_dict[level][0]
+        return cls_targets_dict, box_targets_dict, num_positives[0]
@@ -16,6 +16,7 @@ import nvidia.dali as dali
 from nvidia.dali import pipeline_def
 import nvidia.dali.plugin.tf as dali_tf
 import tensorflow as tf
+import numpy as np
 import math
 
 from absl import logging
@@ -76,12 +77,12 @@ class EfficientDetPipeline:
         )
 
     def _get_boxes(self):
-        boxes_t = self._anchors.boxes[:, 0] / self._image_size[0]
-        boxes_l = self._anchors.boxes[:, 1] / self._image_size[1]
-        boxes_b = self._anchors.boxes[:, 2] / self._image_size[0]
-        boxes_r = self._anchors.boxes[:, 3] / self._image_size[1]
-        boxes = tf.transpose(tf.stack([boxes_l, boxes_t, boxes_r, boxes_b]))
-        return tf.reshape(boxes, boxes.shape[0] * 4).numpy().tolist()
+        # ltrb, normalized
+        scale = np.array(
+            [self._image_size[1], self._image_size[0]] * 2, dtype=np.float32
+        )
+        boxes = self._anchors.boxes_array[:, [1, 0, 3, 2]] / scale
+        return boxes.reshape(-1).tolist()
 
     @pipeline_def
     def _define_pipeline(self):
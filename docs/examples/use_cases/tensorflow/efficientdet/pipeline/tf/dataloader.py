@@ -21,6 +21,9 @@ from pipeline import anchors
 from . import preprocessor
 from . import tf_example_decoder
 
+# number of images labeled at once in a batch, bounds the memory of the IoU matrix
+_LABEL_ANCHORS_CHUNK_SIZE = 8
+
 
 class InputProcessor:
     """Base class of Input processor."""
@@ -247,28 +250,19 @@ class InputReader:
         self._debug = params["seed"] is not None
 
     @tf.autograph.experimental.do_not_convert
-    def dataset_parser(self, value, example_decoder, anchor_labeler):
-        """Parse data to a fixed dimension input image and learning targets.
+    def dataset_parser(self, value, example_decoder):
+        """Parse data to a fixed dimension input image and groundtruth data.
+
+        Anchors are labeled for the whole batch in `process_example`.
 
         Args:
           value: a single serialized tf.Example string.
           example_decoder: TF example decoder.
-          anchor_labeler: anchor box labeler.
           params: a dict of extra parameters.
 
         Returns:
           image: Image tensor that is preprocessed to have normalized value and
             fixed dimension [image_height, image_width, 3]
-          cls_targets_dict: ordered dictionary with keys
-            [min_level, min_level+1, ..., max_level]. The values are tensor with
-            shape [height_l, width_l, num_anchors]. The height_l and width_l
-            represent the dimension of class logits at l-th level.
-          box_targets_dict: ordered dictionary with keys
-            [min_level, min_level+1, ..., max_level]. The values are tensor with
-            shape [height_l, width_l, num_anchors * 4]. The height_l and
-            width_l represent the dimension of bounding box regression output at
-            l-th level.
-          num_positives: Number of positive anchors in the image.
           boxes: Groundtruth bounding box annotations. The box is represented in
             [y1, x1, y2, x2] format. The tensor is padded with -1 to the fixed
             dimension [self._max_instances_per_image, 4].
@@ -309,37 +303,30 @@ class InputReader:
             image = input_processor.resize_and_crop_image()
             boxes, classes = input_processor.resize_and_crop_boxes()
 
-            # Assign anchors.
-            (cls_targets, box_targets, num_positives) = anchor_labeler.label_anchors(
-                boxes, classes
-            )
-
             # Pad groundtruth data for evaluation.
             boxes = pad_to_fixed_size(boxes, -1, [self._max_instances_per_image, 4])
             classes = pad_to_fixed_size(classes, -1, [self._max_instances_per_image, 1])
-            return (
-                image,
-                cls_targets,
-                box_targets,
-                num_positives,
-                boxes,
-                classes,
-            )
+            return image, boxes, classes
 
     @tf.autograph.experimental.do_not_convert
     def process_example(
         self,
         batch_size,
+        anchor_labeler,
         images,
-        cls_targets,
-        box_targets,
-        num_positives,
         boxes,
         classes,
     ):
         params = self._params
 
         """Processes one batch of data."""
+        # Assign anchors for the whole batch, a few images at a time: the IoU matrix of
+        # a whole batch of 64 images with 100 boxes and 49k anchors (512x512) takes 1.25 GB
+        # and several batches are processed in parallel.
+        (cls_targets, box_targets, num_positives) = anchor_labeler.label_anchors_batch(
+            boxes, classes, chunk_size=min(batch_size, _LABEL_ANCHORS_CHUNK_SIZE)
+        )
+
         if params["data_format"] == "channels_first":
             images = tf.transpose(images, [0, 3, 1, 2])
 
@@ -397,15 +384,16 @@ class InputReader:
 
         # Parse the fetched records to input tensors for model function.
         # pylint: disable=g-long-lambda
-        map_fn = lambda value: self.dataset_parser(
-            value, example_decoder, anchor_labeler
-        )
+        map_fn = lambda value: self.dataset_parser(value, example_decoder)
 
         # pylint: enable=g-long-lambda
         dataset = dataset.map(map_fn, num_parallel_calls=tf.data.experimental.AUTOTUNE)
         dataset = dataset.prefetch(batch_size)
         dataset = dataset.batch(batch_size, drop_remainder=params["drop_remainder"])
-        dataset = dataset.map(lambda *args: self.process_example(batch_size, *args))
+        dataset = dataset.map(
+            lambda *args: self.process_example(batch_size, anchor_labeler, *args),
+            num_parallel_calls=tf.data.experimental.AUTOTUNE,
+        )
         dataset = dataset.prefetch(tf.data.experimental.AUTOTUNE)
         if self._use_fake_data:
             # Turn this dataset into a semi-fake dataset which always loop at the
@@ -19,49 +19,62 @@ import tensorflow as tf
 import utils
 
 
-def decode_prediction(prediction, num_classes):
+SCORE_THRESHOLD = 0.25
+# boxes overlapping the selected one with IoU >= 0.213 are suppressed, while
+# tf.image.combined_non_max_suppression suppresses only IoU > threshold
+IOU_THRESHOLD = float(np.nextafter(np.float32(0.213), np.float32(0)))
+
 
-    pred_boxes = [[] for i in range(num_classes)]
+# decodes predictions for the whole batch and runs class-aware NMS on all images at once
+# returns ltrb boxes [batch, K, 4], scores [batch, K] and labels [batch, K] sorted by score
+# and the number of valid detections per image [batch]; the outputs are padded with zeros
+def decode_prediction_batch(prediction, num_classes):
 
+    boxes = []
+    scores = []
     for i, layer in enumerate(prediction):
         xywh, obj, conf = utils.decode_layer(layer, i)
+        batch_size = tf.shape(obj)[0]
+
         ltrb = utils.xywh_to_ltrb(xywh)
+        boxes.append(tf.reshape(ltrb, [batch_size, -1, 1, 4]))
 
+        # every box is a candidate only for its most probable class
         objectness = tf.math.reduce_max(conf, axis=-1) * obj
         clss = tf.argmax(conf, axis=-1)
+        cls_scores = tf.one_hot(clss, num_classes, dtype=objectness.dtype) * objectness[..., tf.newaxis]
+        scores.append(tf.reshape(cls_scores, [batch_size, -1, num_classes]))
 
-        detected = tf.where(objectness > 0.25)
-        for idx in detected:
-            batch, ix, iy, ir = idx
-            score = objectness[batch, ix, iy, ir].numpy()
-            cls = clss[batch, ix, iy, ir]
-            box = list(ltrb[batch, ix, iy, ir].numpy())
-            pred_boxes[cls].append((score, box))
-
-    # nms
-    def iou(box1, box2):
-        l = max(box1[0], box2[0])
-        t = max(box1[1], box2[1])
-        r = min(box1[2], box2[2])
-        b = min(box1[3], box2[3])
-        i = max(0, r - l) * max(0, b - t)
-        u = (box1[2] - box1[0]) * (box1[3] - box1[1]) + (box2[2] - box2[0]) * (box2[3] - box2[1]) - i
-        return i / u
+    boxes = tf.concat(boxes, axis=1)
+    scores = tf.concat(scores, axis=1)
 
-    boxes = []
-    scores = []
-    labels = []
-    for cls in range(num_classes):
-        cls_preds = sorted(pred_boxes[cls])
-        while len(cls_preds) > 0:
-            score, box = cls_preds[-1]
-            boxes.append(box)
-            scores.append(score)
-            labels.append(cls)
-            rem = []
-            for score2, box2 in cls_preds:
-                if iou(box, box2) < 0.213:
-                    rem.append((score2, box2))
-            cls_preds = rem
-
-    return boxes, scores, labels
+    # no limit on the number of detections, same as in the per-image NMS
+    num_boxes = tf.shape(boxes)[1]
+    boxes, scores, labels, valid = tf.image.combined_non_max_suppression(
+        boxes, scores,
+        max_output_size_per_class=num_boxes,
+        max_total_size=num_boxes,
+        iou_threshold=IOU_THRESHOLD,
+        score_threshold=SCORE_THRESHOLD,
+        clip_boxes=False,
+    )
+
+    max_valid = tf.math.reduce_max(valid)
+    return (boxes[:, :max_valid], scores[:, :max_valid],
+            tf.cast(labels[:, :max_valid], tf.int64), valid)
+
+
+# decodes prediction for a single image
+# returns lists of ltrb boxes, scores and labels, ordered by label and then by descending score
+def decode_prediction(prediction, num_classes):
+
+    boxes, scores, labels, valid = decode_prediction_batch(prediction, num_classes)
+    num_valid = int(valid[0])
+    boxes = boxes[0, :num_valid].numpy()
+    scores = scores[0, :num_valid].numpy()
+    labels = labels[0, :num_valid].numpy()
+
+    order = np.lexsort((-scores, labels))
+    return ([list(box) for box in boxes[order]],
+            list(scores[order]),
+            [int(label) for label in labels[order]])
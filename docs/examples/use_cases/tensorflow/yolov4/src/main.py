@@ -70,7 +70,7 @@ def run_eval(file_root, annotations_file, weights_file, batch_size, steps):
     )
     dataset = pipeline.dataset()
 
-    model.compile(run_eagerly=True)
+    model.compile()
     model.evaluate(pipeline.dataset(), steps=steps)
 
 
@@ -104,7 +104,7 @@ class YOLOv4Model(tf.keras.Model):
 
         self.loss_tracker = tf.keras.metrics.Mean(name="loss")
         self.lr_tracker = tf.keras.metrics.Mean(name="lr")
-        self.mAP_tracker = tf.keras.metrics.Mean(name="mAP")
+        self.mAP_tracker = utils.MeanAveragePrecision(classes_num, name="mAP")
 
 
     def fit(self, dataset, **kwargs):
@@ -137,14 +137,17 @@ class YOLOv4Model(tf.keras.Model):
 
         input, gt_boxes = data
         prediction = self(input, training=False)
-        ap = tf.py_function(
-            func=lambda *args: utils.calc_mAP(args[:-2], args[-2], args[-1]),
-            inp=[*prediction, gt_boxes, self.classes_num],
-            Tout=tf.float64,
-        )
-        self.mAP_tracker.update_state(ap)
-
-        return {"mAP" : self.mAP_tracker.result()}
+        updated = self.mAP_tracker.update_state(prediction, gt_boxes)
+
+        # all the replicas update the same (host side) state of the metric, wait until every one
+        # of them is done with this step, so that the result covers the whole global batch
+        replica_ctx = tf.distribute.get_replica_context()
+        with tf.control_dependencies([updated]):
+            num_images = replica_ctx.all_reduce(tf.distribute.ReduceOp.SUM, updated)
+        with tf.control_dependencies([num_images]):
+            mAP = self.mAP_tracker.result()
+
+        return {"mAP" : mAP}
 
 
     @property
@@ -0,0 +1,143 @@
+# Copyright 2021 Kacper Kluk. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+# Measures the throughput (images per second) of the mosaic augmentation:
+# the batched NumPy implementation, the previous per-sample one and optionally DALI.
+
+import argparse
+import time
+
+import numpy as np
+
+from np.mosaic import mosaic, mosaic_tiles
+
+
+def random_batch(rng, batch_size, image_size, max_boxes):
+    images = rng.random((batch_size, image_size[0], image_size[1], 3), dtype=np.float32)
+    bboxes = []
+    classes = []
+    for _ in range(batch_size):
+        n = rng.integers(max_boxes + 1)
+        wh = rng.uniform(0.05, 0.5, size=(n, 2))
+        xy = rng.uniform(wh / 2, 1 - wh / 2)
+        bboxes.append(np.concatenate([xy, wh], axis=-1))
+        classes.append(rng.integers(80, size=n))
+    return images, bboxes, classes
+
+
+def mosaic_per_sample(images, bboxes, classes, image_size):
+    def trim_bboxes(bboxes, classes, x0, y0, x1, y1):
+        bboxes_ltrb = np.copy(bboxes)
+        bboxes_ltrb[ : , 0] -= bboxes[ : , 2] / 2
+        bboxes_ltrb[ : , 1] -= bboxes[ : , 3] / 2
+        bboxes_ltrb[ : , 2] += bboxes_ltrb[ : , 0]
+        bboxes_ltrb[ : , 3] += bboxes_ltrb[ : , 1]
+
+        bboxes_ltrb[ : , 0] = np.maximum(x0, bboxes_ltrb[ : , 0])
+        bboxes_ltrb[ : , 1] = np.maximum(y0, bboxes_ltrb[ : , 1])
+        bboxes_ltrb[ : , 2] = np.minimum(x1, bboxes_ltrb[ : , 2])
+        bboxes_ltrb[ : , 3] = np.minimum(y1, bboxes_ltrb[ : , 3])
+
+        bboxes_xywh = np.copy(bboxes_ltrb)
+        bboxes_xywh[ : , 2] -= bboxes_xywh[ : , 0]
+        bboxes_xywh[ : , 3] -= bboxes_xywh[ : , 1]
+        bboxes_xywh[ : , 0] += bboxes_xywh[ : , 2] / 2
+        bboxes_xywh[ : , 1] += bboxes_xywh[ : , 3] / 2
+
+        not_null = np.logical_and(bboxes_xywh[ : , 2] > 0, bboxes_xywh[ : , 3] > 0)
+        return bboxes_xywh[not_null, : ], classes[not_null]
+
+    batch_size = len(images)
+    images_out = np.zeros(images.shape)
+    bboxes_out = []
+    classes_out = []
+    for i in range(batch_size):
+        if np.random.randint(2) == 0:
+            images_out[i, ...] = images[i, ...]
+            bboxes_out.append(bboxes[i])
+            classes_out.append(classes[i])
+        else:
+            ids = np.random.choice(batch_size, 4)
+            prop_x = np.random.uniform(0.2, 0.8)
+            prop_y = np.random.uniform(0.2, 0.8)
+            size_x = int(prop_x * image_size[0])
+            size_y = int(prop_y * image_size[1])
+            images_out[i, : size_y, : size_x, : ] = images[ids[0], : size_y, : size_x, : ]
+            images_out[i, : size_y, size_x :, : ] = images[ids[1], : size_y, size_x :, : ]
+            images_out[i, size_y :, : size_x, : ] = images[ids[2], size_y :, : size_x, : ]
+            images_out[i, size_y :, size_x :, : ] = images[ids[3], size_y :, size_x :, : ]
+            bboxes00, classes00 = trim_bboxes(bboxes[ids[0]], classes[ids[0]], 0.0, 0.0, prop_x, prop_y)
+            bboxes10, classes10 = trim_bboxes(bboxes[ids[1]], classes[ids[1]], prop_x, 0.0, 1.0, prop_y)
+            bboxes01, classes01 = trim_bboxes(bboxes[ids[2]], classes[ids[2]], 0.0, prop_y, prop_x, 1.0)
+            bboxes11, classes11 = trim_bboxes(bboxes[ids[3]], classes[ids[3]], prop_x, prop_y, 1.0, 1.0)
+            bboxes_out.append(np.concatenate((bboxes00, bboxes10, bboxes01, bboxes11)))
+            classes_out.append(np.concatenate((classes00, classes10, classes01, classes11)))
+
+    return images_out, bboxes_out, classes_out
+
+
+def run(name, fn, iters, batch_size):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    print("%-20s %10.1f images/s" % (name, iters * batch_size / (time.perf_counter() - start)))
+
+
+# The DALI mosaic is already batched: multi_paste composes all the tiles of the batch at once.
+# Only the tile choice (random_bbox_crop) and the box adjustment run once per quadrant, because
+# DALI arithmetic broadcasts only per-sample scalars, not the [4] scale and offset of a tile.
+def dali_mosaic(batch, batch_size, image_size):
+    # src/dali of this example (imported by name, as train.py does), not nvidia.dali
+    from dali import ops as yolo_dali_ops
+    import nvidia.dali.fn as fn
+    from nvidia.dali.pipeline import Pipeline
+
+    images, bboxes, classes = batch
+    images_u8 = (images * 255).astype(np.uint8)
+    bboxes_ltrb = [np.concatenate([b[:, : 2] - b[:, 2 :] / 2, b[:, : 2] + b[:, 2 :] / 2], axis=-1)
+                   .astype(np.float32) for b in bboxes]
+    labels = [c.astype(np.int32) for c in classes]
+
+    pipe = Pipeline(batch_size=batch_size, num_threads=4, device_id=0)
+    with pipe:
+        images_in = fn.external_source(source=lambda: list(images_u8), layout="HWC")
+        bboxes_in = fn.external_source(source=lambda: bboxes_ltrb)
+        labels_in = fn.external_source(source=lambda: labels)
+        pipe.set_outputs(*yolo_dali_ops.mosaic(images_in, bboxes_in, labels_in, image_size))
+    pipe.build()
+    return pipe.run
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch_size", "-b", default=8, type=int)
+    parser.add_argument("--image_size", default=608, type=int)
+    parser.add_argument("--max_boxes", default=20, type=int)
+    parser.add_argument("--iters", default=50, type=int)
+    parser.add_argument("--dali", action="store_true", help="also measure the DALI mosaic (CPU)")
+    args = parser.parse_args()
+
+    image_size = (args.image_size, args.image_size)
+    rng = np.random.default_rng(0)
+    batch = random_batch(rng, args.batch_size, image_size, args.max_boxes)
+    out = np.empty_like(batch[0])
+
+    run("numpy per-sample", lambda: mosaic_per_sample(*batch, image_size), args.iters, args.batch_size)
+    run("numpy batched",
+        lambda: mosaic(*batch, mosaic_tiles(args.batch_size, image_size, rng), out=out),
+        args.iters, args.batch_size)
+    if args.dali:
+        run("dali", dali_mosaic(batch, args.batch_size, image_size), args.iters, args.batch_size)
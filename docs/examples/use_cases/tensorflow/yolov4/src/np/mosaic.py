@@ -0,0 +1,105 @@
+# Copyright 2021 Kacper Kluk. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import numpy as np
+
+
+# Generates the tiles of the mosaic for the whole batch.
+# Every sample gets mosaic with probability 0.5 and then consists of four tiles
+# (upper left, upper right, lower left, lower right) taken from random samples of the batch,
+# otherwise it is a single tile with the sample itself.
+# Returns a dict of arrays with one entry per tile:
+#   sample, source - output and input sample index,
+#   y0, y1, x0, x1 - tile region in pixels, the same in the input and the output,
+#   window - tile region as normalized ltrb, boxes are trimmed to it if trim is set.
+def mosaic_tiles(batch_size, image_size, rng):
+    do_mosaic = rng.integers(2, size=batch_size) == 1
+    num_tiles = np.where(do_mosaic, 4, 1)
+    sample = np.repeat(np.arange(batch_size), num_tiles)
+    quadrant = np.arange(len(sample)) - np.repeat(np.cumsum(num_tiles) - num_tiles, num_tiles)
+    trim = np.repeat(do_mosaic, num_tiles)
+
+    sources = rng.integers(batch_size, size=(batch_size, 4))
+    source = np.where(trim, sources[sample, quadrant], sample)
+
+    prop_x = rng.uniform(0.2, 0.8, size=batch_size)[sample]
+    prop_y = rng.uniform(0.2, 0.8, size=batch_size)[sample]
+    size_x = (prop_x * image_size[0]).astype(int)
+    size_y = (prop_y * image_size[1]).astype(int)
+
+    right = (quadrant % 2 == 1)
+    lower = (quadrant >= 2)
+    x0 = np.where(trim & right, size_x, 0)
+    x1 = np.where(trim & ~right, size_x, image_size[1])
+    y0 = np.where(trim & lower, size_y, 0)
+    y1 = np.where(trim & ~lower, size_y, image_size[0])
+
+    window = np.stack([
+        np.where(right, prop_x, 0.0),
+        np.where(lower, prop_y, 0.0),
+        np.where(right | ~trim, 1.0, prop_x),
+        np.where(lower | ~trim, 1.0, prop_y),
+    ], axis=-1)
+
+    return {
+        "sample": sample, "source": source,
+        "y0": y0, "y1": y1, "x0": x0, "x1": x1,
+        "window": window, "trim": trim,
+    }
+
+
+# Composes the mosaic of the images [batch, height, width, channels] and their xywh boxes
+# (lists of [n, 4] arrays and [n] class arrays) according to tiles from mosaic_tiles.
+# Boxes are trimmed to the tiles and the empty ones are dropped, for all the samples at once.
+def mosaic(images, bboxes, classes, tiles, out=None):
+    batch_size = len(images)
+    if out is None:
+        out = np.empty_like(images)
+
+    sample, source = tiles["sample"], tiles["source"]
+    for i, src, y0, y1, x0, x1 in zip(sample, source, tiles["y0"], tiles["y1"], tiles["x0"], tiles["x1"]):
+        out[i, y0 : y1, x0 : x1] = images[src, y0 : y1, x0 : x1]
+
+    # concatenated boxes of all the samples, gathered per tile
+    counts = np.array([len(b) for b in bboxes], dtype=int)
+    offsets = np.cumsum(counts) - counts
+    all_bboxes = np.concatenate(bboxes).reshape(-1, 4) if batch_size else np.zeros((0, 4))
+    all_classes = np.concatenate(classes) if batch_size else np.zeros(0, dtype=int)
+
+    tile_counts = counts[source]
+    box_tile = np.repeat(np.arange(len(source)), tile_counts)
+    box_idx = np.arange(len(box_tile)) - np.repeat(np.cumsum(tile_counts) - tile_counts, tile_counts)
+    box_idx += offsets[source][box_tile]
+
+    boxes = all_bboxes[box_idx]
+    window = tiles["window"][box_tile]
+    ltrb = np.concatenate([boxes[:, : 2] - boxes[:, 2 :] / 2, boxes[:, : 2] + boxes[:, 2 :] / 2], axis=-1)
+    ltrb[:, : 2] = np.maximum(ltrb[:, : 2], window[:, : 2])
+    ltrb[:, 2 :] = np.minimum(ltrb[:, 2 :], window[:, 2 :])
+    wh = ltrb[:, 2 :] - ltrb[:, : 2]
+    trimmed = np.concatenate([ltrb[:, : 2] + wh / 2, wh], axis=-1)
+
+    # the samples without mosaic keep their boxes as they are
+    trim = tiles["trim"][box_tile]
+    boxes = np.where(trim[:, np.newaxis], trimmed, boxes)
+    keep = ~trim | ((wh[:, 0] > 0) & (wh[:, 1] > 0))
+
+    box_sample = sample[box_tile][keep]
+    out_counts = np.bincount(box_sample, minlength=batch_size)
+    split = np.cumsum(out_counts)[:-1]
+    bboxes_out = np.split(boxes[keep], split)
+    classes_out = np.split(all_classes[box_idx][keep], split)
+
+    return out, bboxes_out, classes_out
@@ -14,12 +14,13 @@
 # ==============================================================================
 
 from .coco import COCO
+from .mosaic import mosaic, mosaic_tiles
 import numpy as np
 import tensorflow as tf
 
 import os
 import cv2
-import random
+from concurrent.futures import ThreadPoolExecutor
 
 
 class YOLOv4PipelineNumpy:
@@ -39,6 +40,10 @@ class YOLOv4PipelineNumpy:
         self._is_training = kwargs.get('is_training', False)
         self._use_mosaic = kwargs.get('use_mosaic', False)
 
+        # OpenCV releases the GIL, so decoding and resizing scale with the number of threads
+        self._executor = ThreadPoolExecutor(max_workers=kwargs.get('num_workers', os.cpu_count()))
+        self._rng = np.random.default_rng(seed)
+
         self._coco = COCO(annotations_file)
 
         self._batch_id = 0
@@ -84,116 +89,66 @@ class YOLOv4PipelineNumpy:
             return images, tf.concat([bboxes, classes], axis=-1)
 
     def __len__(self):
-        return self.num_batches
+        return self._num_batches
 
 
     def _input(self, image_ids):
         image_data = self._coco.loadImgs(image_ids)
-        images = np.zeros((self._batch_size, self._image_size[0], self._image_size[1], 3), dtype=np.float32)
-        bboxes = []
-        classes = []
-        for i in range(self._batch_size):
+        images = np.empty((self._batch_size, self._image_size[0], self._image_size[1], 3), dtype=np.float32)
+
+        def load_sample(i):
             image_path = os.path.join(self._file_root, image_data[i]['file_name'])
             image_width = image_data[i]['width']
             image_height = image_data[i]['height']
             image = cv2.imread(image_path)
+            image = cv2.resize(image, (self._image_size[1], self._image_size[0]), interpolation=cv2.INTER_LINEAR)
             image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            image = tf.image.resize(image, self._image_size) / 255
-            image = tf.reshape(image, (1, self._image_size[0], self._image_size[1], 3))
-            images[i, ...] = image
+            np.multiply(image, np.float32(1 / 255), out=images[i])
 
             ann_ids = self._coco.getAnnIds(image_ids[i])
             anns = self._coco.loadAnns(ann_ids)
-            sample_bboxes = np.array([ann['bbox'] for ann in anns])
-            if len(sample_bboxes.shape) == 1:
-                sample_bboxes = np.zeros((0, 4))
-            sample_bboxes[ : , 0] /= image_width
-            sample_bboxes[ : , 1] /= image_height
-            sample_bboxes[ : , 2] /= image_width
-            sample_bboxes[ : , 3] /= image_height
-            sample_bboxes[ : , 0] += sample_bboxes[ : , 2] / 2
-            sample_bboxes[ : , 1] += sample_bboxes[ : , 3] / 2
-
-            bboxes.append(sample_bboxes)
-            classes.append(np.array([ann['category_id'] for ann in anns], dtype=int))
+            sample_bboxes = np.array([ann['bbox'] for ann in anns], dtype=np.float64).reshape(-1, 4)
+            sample_bboxes /= [image_width, image_height, image_width, image_height]
+            sample_bboxes[ : , : 2] += sample_bboxes[ : , 2 : ] / 2
+            sample_classes = np.array([ann['category_id'] for ann in anns], dtype=int)
+            return sample_bboxes, sample_classes
+
+        samples = list(self._executor.map(load_sample, range(self._batch_size)))
+        bboxes = [sample_bboxes for sample_bboxes, _ in samples]
+        classes = [sample_classes for _, sample_classes in samples]
 
         return images, bboxes, classes
 
     def _color_twist(self, images):
         def random_value():
-            value = random.uniform(1.0, 1.5)
-            coin = random.randrange(2)
-            return coin * value + (1 - coin) * (1.0 / value)
-
-        for i in range(self._batch_size):
-            image = images[i, ...]
+            value = self._rng.uniform(1.0, 1.5, size=self._batch_size).astype(np.float32)
+            coin = self._rng.integers(2, size=self._batch_size)
+            return np.where(coin == 1, value, 1.0 / value)
 
-            hue = random.uniform(-18.0, 18.0)
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
-            image[..., 0] += hue
-            image = cv2.cvtColor(image, cv2.COLOR_HSV2RGB)
+        hue = self._rng.uniform(-18.0, 18.0, size=self._batch_size).astype(np.float32)
+        brightness = random_value()
+        contrast = random_value()
 
-            brightness = random_value()
-            contrast = random_value()
-            image *= brightness * contrast
-            image += (0.5 - 0.5 * contrast) * brightness
+        # the whole batch is converted at once, viewed as a single tall image
+        height, width = self._image_size
+        hsv = cv2.cvtColor(images.reshape(-1, width, 3), cv2.COLOR_RGB2HSV)
+        hsv = hsv.reshape(images.shape)
+        hsv[..., 0] += hue[ : , np.newaxis, np.newaxis]
+        rgb = cv2.cvtColor(hsv.reshape(-1, width, 3), cv2.COLOR_HSV2RGB)
+        images[...] = rgb.reshape(images.shape)
 
-            images[i, ...] = image
+        images *= (brightness * contrast)[ : , np.newaxis, np.newaxis, np.newaxis]
+        images += ((0.5 - 0.5 * contrast) * brightness)[ : , np.newaxis, np.newaxis, np.newaxis]
 
     def _flip(self, images, bboxes):
-        for i in range(self._batch_size):
-            if random.randrange(2) == 0:
-                images[i, ...] = images[i, : , ::-1 , : ]
-                bboxes[i][: , 0] = 1.0 - bboxes[i][: , 0]
+        flipped = np.flatnonzero(self._rng.integers(2, size=self._batch_size) == 0)
+        images[flipped] = images[flipped, : , ::-1 , : ]
+        for i in flipped:
+            bboxes[i][: , 0] = 1.0 - bboxes[i][: , 0]
 
     def _mosaic(self, images, bboxes, classes):
-        def trim_bboxes(bboxes, classes, x0, y0, x1, y1):
-            bboxes_ltrb = np.copy(bboxes)
-            bboxes_ltrb[ : , 0] -= bboxes[ : , 2] / 2
-            bboxes_ltrb[ : , 1] -= bboxes[ : , 3] / 2
-            bboxes_ltrb[ : , 2] += bboxes_ltrb[ : , 0]
-            bboxes_ltrb[ : , 3] += bboxes_ltrb[ : , 1]
-
-            bboxes_ltrb[ : , 0] = np.maximum(x0, bboxes_ltrb[ : , 0])
-            bboxes_ltrb[ : , 1] = np.maximum(y0, bboxes_ltrb[ : , 1])
-            bboxes_ltrb[ : , 2] = np.minimum(x1, bboxes_ltrb[ : , 2])
-            bboxes_ltrb[ : , 3] = np.minimum(y1, bboxes_ltrb[ : , 3])
-
-            bboxes_xywh = np.copy(bboxes_ltrb)
-            bboxes_xywh[ : , 2] -= bboxes_xywh[ : , 0]
-            bboxes_xywh[ : , 3] -= bboxes_xywh[ : , 1]
-            bboxes_xywh[ : , 0] += bboxes_xywh[ : , 2] / 2
-            bboxes_xywh[ : , 1] += bboxes_xywh[ : , 3] / 2
-
-            not_null = np.logical_and(bboxes_xywh[ : , 2] > 0, bboxes_xywh[ : , 3] > 0)
-            return bboxes_xywh[not_null, : ], classes[not_null]
-
-        images_out = np.zeros(images.shape)
-        bboxes_out = []
-        classes_out = []
-        for i in range(self._batch_size):
-            if random.randrange(2) == 0:
-                images_out[i, ...] = images[i, ...]
-                bboxes_out.append(bboxes[i])
-                classes_out.append(classes[i])
-            else:
-                ids = np.random.choice(self._batch_size, 4)
-                prop_x = np.random.uniform(0.2, 0.8)
-                prop_y = np.random.uniform(0.2, 0.8)
-                size_x = int(prop_x * self._image_size[0])
-                size_y = int(prop_y * self._image_size[1])
-                images_out[i, : size_y, : size_x, : ] = images[ids[0], : size_y, : size_x, : ]
-                images_out[i, : size_y, size_x :, : ] = images[ids[1], : size_y, size_x :, : ]
-                images_out[i, size_y :, : size_x, : ] = images[ids[2], size_y :, : size_x, : ]
-                images_out[i, size_y :, size_x :, : ] = images[ids[3], size_y :, size_x :, : ]
-                bboxes00, classes00 = trim_bboxes(bboxes[ids[0]], classes[ids[0]], 0.0, 0.0, prop_x, prop_y)
-                bboxes10, classes10 = trim_bboxes(bboxes[ids[1]], classes[ids[1]], prop_x, 0.0, 1.0, prop_y)
-                bboxes01, classes01 = trim_bboxes(bboxes[ids[2]], classes[ids[2]], 0.0, prop_y, prop_x, 1.0)
-                bboxes11, classes11 = trim_bboxes(bboxes[ids[3]], classes[ids[3]], prop_x, prop_y, 1.0, 1.0)
-                bboxes_out.append(np.concatenate((bboxes00, bboxes10, bboxes01, bboxes11)))
-                classes_out.append(np.concatenate((classes00, classes10, classes01, classes11)))
-
-        return images_out, bboxes_out, classes_out
+        tiles = mosaic_tiles(self._batch_size, self._image_size, self._rng)
+        return mosaic(images, bboxes, classes, tiles)
 
 
     def dataset(self):
@@ -16,7 +16,8 @@
 import numpy as np
 import tensorflow as tf
 import numpy as np
-from inference import decode_prediction
+import threading
+from inference import decode_prediction_batch
 
 
 ANCHORS = [
@@ -118,68 +119,121 @@ def decode_layer(layer, layer_id):
             tf.stack(output_cls, axis=-2))
 
 
-# probably slow and works only in eager mode
-def calc_mAP(predictions, gt_boxes, num_classes):
+# mean average precision over all the images passed to update_state since the last reset
+# predictions are decoded with tensor ops, matching with the ground truth and accumulation of
+# the results happen in numpy, so the metric can be updated in graph mode as well
+# the state lives in this process: the replicas of a MirroredStrategy share it, but strategies
+# spanning several processes (MultiWorkerMirroredStrategy) would see only their local part
+class MeanAveragePrecision(tf.keras.metrics.Metric):
+    def __init__(self, num_classes, iou_threshold=0.5, name="mAP", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.num_classes = num_classes
+        self.iou_threshold = iou_threshold
+        self._lock = threading.Lock()
+        self._scores = np.empty(1024, dtype=np.float32)
+        self._found = np.empty(1024, dtype=bool)
+        self._num_preds = 0
+        self._num_gt_boxes = 0
+        self._cached_result = None
+
+    def update_state(self, predictions, gt_boxes, sample_weight=None):
+        if isinstance(tf.distribute.get_strategy(), tf.distribute.MultiWorkerMirroredStrategy):
+            raise ValueError("MeanAveragePrecision does not support multi-worker strategies")
+        boxes, scores, labels, valid = decode_prediction_batch(predictions, self.num_classes)
+        # returns the number of the processed images, so that other ops can depend on the update
+        return tf.numpy_function(
+            func=self._update, inp=[boxes, scores, labels, valid, gt_boxes], Tout=tf.int64,
+        )
+
+    def result(self):
+        return tf.numpy_function(func=self._result, inp=[], Tout=tf.float64)
+
+    def reset_state(self):
+        with self._lock:
+            self._num_preds = 0
+            self._num_gt_boxes = 0
+            self._cached_result = None
+
+    def reset_states(self):
+        self.reset_state()
+
+    def _append(self, scores, found):
+        end = self._num_preds + len(scores)
+        if end > len(self._scores):
+            capacity = max(end, 2 * len(self._scores))
+            self._scores = np.resize(self._scores, capacity)
+            self._found = np.resize(self._found, capacity)
+        self._scores[self._num_preds : end] = scores
+        self._found[self._num_preds : end] = found
+        self._num_preds = end
+
+    def _update(self, boxes, scores, labels, valid, gt_boxes):
+        for batch_idx in range(len(valid)):
+            num_valid = valid[batch_idx]
+            # predictions are matched ordered by label and then by descending score
+            order = np.lexsort((-scores[batch_idx, :num_valid], labels[batch_idx, :num_valid]))
+            pred_boxes = boxes[batch_idx, order]
+            pred_scores = scores[batch_idx, order]
+            pred_classes = labels[batch_idx, order]
+
+            # ground truth is padded with boxes of class -1
+            gt = gt_boxes[batch_idx]
+            gt = gt[gt[:, 4] >= 0]
+            gt_ltrb = np.concatenate([gt[:, :2] - gt[:, 2:4] / 2, gt[:, :2] + gt[:, 2:4] / 2], axis=-1)
+
+            l = np.maximum(pred_boxes[:, np.newaxis, 0], gt_ltrb[np.newaxis, :, 0])
+            t = np.maximum(pred_boxes[:, np.newaxis, 1], gt_ltrb[np.newaxis, :, 1])
+            r = np.minimum(pred_boxes[:, np.newaxis, 2], gt_ltrb[np.newaxis, :, 2])
+            b = np.minimum(pred_boxes[:, np.newaxis, 3], gt_ltrb[np.newaxis, :, 3])
+            i = np.maximum(0, r - l) * np.maximum(0, b - t)
+            pred_areas = (pred_boxes[:, 2] - pred_boxes[:, 0]) * (pred_boxes[:, 3] - pred_boxes[:, 1])
+            gt_areas = (gt_ltrb[:, 2] - gt_ltrb[:, 0]) * (gt_ltrb[:, 3] - gt_ltrb[:, 1])
+            u = pred_areas[:, np.newaxis] + gt_areas[np.newaxis, :] - i
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ious = i / u
+
+            candidates = (ious >= self.iou_threshold) & (pred_classes[:, np.newaxis] == gt[np.newaxis, :, 4])
+
+            # every prediction takes the first unused matching ground truth box
+            found = np.zeros(len(pred_scores), dtype=bool)
+            used = np.zeros(len(gt), dtype=bool)
+            for pred_idx in np.flatnonzero(candidates.any(axis=1)):
+                available = candidates[pred_idx] & ~used
+                if available.any():
+                    used[np.argmax(available)] = True
+                    found[pred_idx] = True
+
+            with self._lock:
+                self._append(pred_scores, found)
+                self._num_gt_boxes += len(gt)
+                self._cached_result = None
+        return np.int64(len(valid))
+
+    def _result(self):
+        # the result is requested after every step, but sorting all the predictions is only
+        # needed when there were updates since the last call
+        with self._lock:
+            if self._cached_result is None:
+                self._cached_result = self._compute_result(
+                    self._scores[: self._num_preds], self._found[: self._num_preds],
+                    self._num_gt_boxes)
+            return self._cached_result
+
+    @staticmethod
+    def _compute_result(scores, found, num_gt_boxes):
+        if len(scores) == 0 or num_gt_boxes == 0:
+            return np.float64(0.0)
+
+        # descending by score, true positives first among equal scores
+        order = np.lexsort((found, scores))[::-1]
+        found = found[order]
+        precision = np.cumsum(found) / np.arange(1, len(found) + 1)
+        # interpolated precision: the maximum precision at any higher recall
+        precision = np.maximum.accumulate(precision[::-1])[::-1]
+        return np.float64(np.sum(precision[found]) / num_gt_boxes)
+
 
-    def iou(box1, box2):
-        l = max(box1[0], box2[0])
-        t = max(box1[1], box2[1])
-        r = min(box1[2], box2[2])
-        b = min(box1[3], box2[3])
-        i = max(0, r - l) * max(0, b - t)
-        u = (box1[2] - box1[0]) * (box1[3] - box1[1]) + (box2[2] - box2[0]) * (box2[3] - box2[1]) - i
-        return i / u
-
-    batch_size = predictions[0].shape[0]
-    num_pred_boxes = 0
-    num_gt_boxes = 0
-    num_true_positives = 0
-
-    stats = []
-    for batch_idx in range(batch_size):
-        prediction = tuple(p[batch_idx : batch_idx + 1, ...] for p in predictions)
-        pred_boxes, scores, pred_classes = decode_prediction(prediction, num_classes)
-
-        boxes = gt_boxes[batch_idx, :, : 4]
-        classes = gt_boxes[batch_idx, :, 4]
-
-        gt_used_idx = []
-        num_pred_boxes += len(pred_boxes)
-        num_gt_boxes += len(classes)
-
-        for pred_idx, (pred_box, pred_class) in enumerate(zip(pred_boxes, pred_classes)):
-            found = False
-            for gt_idx, (gt_box, gt_class) in enumerate(zip(boxes, classes)):
-
-                if gt_idx in gt_used_idx:
-                    continue
-
-                if pred_class != gt_class:
-                    continue
-
-                gt_ltrb = (gt_box[0] - gt_box[2] / 2, gt_box[1] - gt_box[3] / 2,
-                    gt_box[0] + gt_box[2] / 2, gt_box[1] + gt_box[3] / 2)
-                if iou(pred_box, gt_ltrb) < 0.5:
-                    continue
-
-                found = True
-                num_true_positives += 1
-                break
-
-            stats.append((scores[pred_idx], found))
-
-    if num_pred_boxes == 0:
-        return 0.0
-
-    ap = 0.0
-    max_prec = num_true_positives / num_pred_boxes
-    for _, found in sorted(stats):
-        if found:
-            ap += max_prec / num_gt_boxes
-            num_true_positives -= 1
-        num_pred_boxes -= 1
-        if num_pred_boxes == 0:
-            break
-        max_prec = max(max_prec, num_true_positives / num_pred_boxes)
-
-    return ap
+def calc_mAP(predictions, gt_boxes, num_classes):
+    metric = MeanAveragePrecision(num_classes)
+    metric.update_state(predictions, gt_boxes)
+    return metric.result()
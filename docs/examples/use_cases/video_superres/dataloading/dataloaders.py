@@ -7,7 +7,7 @@ import os
 import torch
 from torch.utils.data import DataLoader
 
-from dataloading.datasets import imageDataset
+from dataloading.datasets import imageDataset, read_manifest
 
 from nvidia.dali.pipeline import pipeline_def
 from nvidia.dali.plugin import pytorch
@@ -31,7 +31,11 @@ def create_video_reader_pipeline(sequence_length, files, crop_size):
 
 class DALILoader():
     def __init__(self, batch_size, file_root, sequence_length, crop_size):
-        container_files = os.listdir(file_root)
+        manifest = read_manifest(file_root)
+        if manifest is not None:
+            container_files = [entry['name'] for entry in manifest['entries']]
+        else:
+            container_files = [f for f in os.listdir(file_root) if f.endswith('.mp4')]
         container_files = [file_root + '/' + f for f in container_files]
         self.pipeline = create_video_reader_pipeline(batch_size=batch_size,
                                                      sequence_length=sequence_length,
@@ -3,6 +3,7 @@ import sys, time, argparse, os, subprocess, shutil
 import math, numbers, random, bisect
 
 from random import Random
+from collections import OrderedDict
 
 from skimage import io, transform
 from os import listdir
@@ -14,16 +15,108 @@ import numpy as np
 import torch
 import torch.utils.data as data
 
+from dataloading.manifest import read_manifest, read_index
+
+
+class FrameCache():
+    """LRU cache of decoded frames with a limit on the total size in bytes.
+
+    The cached frames are read-only, so they can be handed out without copying.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        self.frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        frame = self.frames.get(path)
+        if frame is not None:
+            self.frames.move_to_end(path)
+            self.hits += 1
+            return frame
+
+        self.misses += 1
+        frame = io.imread(path)
+        if frame.nbytes > self.max_bytes:
+            return frame
+        frame.flags.writeable = False
+        while self.num_bytes + frame.nbytes > self.max_bytes:
+            _, evicted = self.frames.popitem(last=False)
+            self.num_bytes -= evicted.nbytes
+        self.frames[path] = frame
+        self.num_bytes += frame.nbytes
+        return frame
+
 
 class imageDataset():
+    """Sequences of ``frames`` consecutive frames of the scenes in ``root``.
+
+    ``cache_bytes`` is the size of the cache of decoded frames of every DataLoader worker,
+    disabled by default. Consecutive samples share all but one frame, so it only helps when
+    the samples are read in order or their windows overlap otherwise (see
+    tools/dataset_benchmark.py). With the RandomSampler or DistributedSampler used for
+    training, the samples are scattered over the whole dataset and the frames are rarely reused.
+    """
     def __init__(self, frames, is_cropped, crop_size,
-                 root, batch_size, world_size):
+                 root, batch_size, world_size, cache_bytes=0):
         self.root = root
         self.frames = frames
         self.is_cropped = is_cropped
         self.crop_size = crop_size
 
-        self.files = glob(os.path.join(self.root, '*/*.png'))
+        self.files = None
+        self.index = read_index(self.root)
+        if self.index is not None:
+            self._init_from_index()
+        else:
+            self._init_from_files()
+
+        if self.is_cropped:
+            self.image_shape = self.crop_size
+        elif self.index is not None:
+            self.image_shape = [int(self.index['height'][0]), int(self.index['width'][0])]
+        else:
+            self.image_shape = list(io.imread(self.files[0]).shape[:2])
+
+        # Frames are enforced to be mod64 in each dimension
+        # as required by FlowNetSD convolutions
+        self.frame_size = self.image_shape
+        self.frame_size[0] = int(math.floor(self.image_shape[0]/64.)*64)
+        self.frame_size[1] = int(math.floor(self.image_shape[1]/64.)*64)
+
+        # decoded frames shared by overlapping samples are reused
+        # (each DataLoader worker has its own cache)
+        self.frame_cache = FrameCache(cache_bytes)
+
+    def _init_from_index(self):
+        # no filesystem access, the paths of the frames are built when needed
+        # scenes without frames (indices written before they were dropped) would count
+        # towards the scene boundaries and have no frame shape
+        self.index = self.index[self.index['frames'] > 0]
+        if len(self.index) < 1:
+            print(("[Error] Empty frame index in %s" % (self.root)))
+            raise LookupError
+        manifest = read_manifest(self.root)
+        self.pattern = manifest['pattern'] if manifest is not None else '%05d.png'
+        self.scene_start = np.asarray(self.index['start'])
+        num_files = int(self.scene_start[-1] + self.index['frames'][-1])
+        num_scenes = len(self.index)
+
+        # the same as computed by _init_from_files
+        self.start_index = [0] + [int(start) for start in self.scene_start[1:]] + [num_files - 1]
+        self.total_frames = num_files - (num_scenes - 1) - num_scenes * (self.frames + 1)
+
+    def _init_from_files(self):
+        manifest = read_manifest(self.root)
+        if manifest is not None:
+            # avoids listing all the frames on (possibly network) storage
+            self.files = [os.path.join(self.root, entry['name'], manifest['pattern'] % (i + 1))
+                          for entry in manifest['entries']
+                          for i in range(entry['frames'])]
+        else:
+            self.files = glob(os.path.join(self.root, '*/*.png'))
 
         if len(self.files) < 1:
             print(("[Error] No image files in %s" % (self.root)))
@@ -46,20 +139,12 @@ class imageDataset():
         self.total_frames -= (self.frames + 1)
         self.start_index.append(i)
 
-        if self.is_cropped:
-            self.image_shape = self.crop_size
-        else:
-            self.image_shape = list(io.imread(self.files[0]).shape[:2])
-
-        # Frames are enforced to be mod64 in each dimension
-        # as required by FlowNetSD convolutions
-        self.frame_size = self.image_shape
-        self.frame_size[0] = int(math.floor(self.image_shape[0]/64.)*64)
-        self.frame_size[1] = int(math.floor(self.image_shape[1]/64.)*64)
-
-        self.frame_buffer = np.zeros((3, self.frames,
-                                      self.frame_size[0], self.frame_size[1]),
-                                      dtype = np.float32)
+    def _frame_path(self, file_idx):
+        if self.files is not None:
+            return self.files[file_idx]
+        scene = int(np.searchsorted(self.scene_start, file_idx, side='right')) - 1
+        frame = file_idx - int(self.scene_start[scene])
+        return os.path.join(self.root, str(self.index['name'][scene]), self.pattern % (frame + 1))
 
     def __len__(self):
         return self.total_frames
@@ -73,9 +158,15 @@ class imageDataset():
         if self.start_index[next_file_index] < index + self.frames:
             index = self.start_index[next_file_index] - self.frames - 1
 
+        # a new buffer for every sample, the returned tensors are not overwritten
+        # by the following samples
+        frame_buffer = np.empty((3, self.frames,
+                                 self.frame_size[0], self.frame_size[1]),
+                                dtype = np.float32)
+
         for (i, file_idx) in enumerate(range(index, index + self.frames)):
 
-            image = io.imread(self.files[file_idx])
+            image = self.frame_cache.get(self._frame_path(file_idx))
 
             #TODO(jbarker): Tidy this up and remove redundant computation
             if i == 0 and self.is_cropped:
@@ -90,6 +181,6 @@ class imageDataset():
                           crop_x:crop_x + self.crop_size[1],
                           :]
 
-            self.frame_buffer[:, i, :, :] = np.rollaxis(image, 2, 0)
+            frame_buffer[:, i, :, :] = np.rollaxis(image, 2, 0)
 
-        return torch.from_numpy(self.frame_buffer)
+        return torch.from_numpy(frame_buffer)
@@ -0,0 +1,35 @@
+import json
+import os
+
+import numpy as np
+
+# written by the tools/ to every output subset directory, lists the outputs with their frame counts
+MANIFEST = "manifest.json"
+# written by tools/extract_frames.py next to the manifest of the extracted frames
+INDEX = "index.npy"
+
+
+def read_manifest(root):
+    """Reads the manifest written by the tools/ to ``root``, returns None if there is none.
+
+    The manifest lists the videos or the frame directories with their frame counts
+    and, for the frames, the file name pattern of the frames.
+    """
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_index(root):
+    """Memory-maps the frame index written by tools/extract_frames.py to ``root``,
+    returns None if there is none.
+
+    The index is a structured array with the ``name``, ``start`` offset (in the list
+    of all the frames), ``frames`` count, ``height`` and ``width`` of every scene.
+    """
+    path = os.path.join(root, INDEX)
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode='r')
@@ -0,0 +1,53 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dataloading.datasets import imageDataset
+
+
+def run(dataset, indices):
+    start = time.perf_counter()
+    for index in indices:
+        dataset[index]
+    return len(indices) / (time.perf_counter() - start)
+
+
+def benchmark(root, frames, crop_size, samples, cache_mb, shuffle):
+    indices = None
+    for name, cache_bytes in [('no cache', 0), ('frame cache', cache_mb << 20)]:
+        dataset = imageDataset(frames, crop_size is not None,
+                               list(crop_size) if crop_size else None, root, 1, 1,
+                               cache_bytes=cache_bytes)
+        if indices is None:
+            indices = list(range(min(samples, len(dataset))))
+            if shuffle:
+                random.shuffle(indices)
+        samples_per_sec = run(dataset, indices)
+        print("%-12s %8.2f samples/s" % (name, samples_per_sec))
+        if cache_bytes:
+            cache = dataset.frame_cache
+            print("%-12s %8d hits, %d misses" % ('', cache.hits, cache.misses))
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(
+        description="Compares samples per second of the PyTorch dataset with "
+                    "and without the decoded frame cache")
+    parser.add_argument('--root', type=str, required=True,
+                        help="Directory with the scene directories of .png frames")
+    parser.add_argument('--frames', type=int, default=3,
+                        help="num frames in input sequence")
+    parser.add_argument('--crop_size', type=int, nargs=2, default=None,
+                        help="crop size [height, width], no cropping if not given")
+    parser.add_argument('--samples', type=int, default=500,
+                        help="number of samples to read")
+    parser.add_argument('--cache_mb', type=int, default=1024,
+                        help="size of the frame cache in MiB")
+    parser.add_argument('--shuffle', action='store_true',
+                        help="read the samples in random order")
+    args = parser.parse_args()
+    benchmark(**vars(args))
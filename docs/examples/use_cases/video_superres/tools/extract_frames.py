@@ -1,12 +1,14 @@
 import argparse
 import os
-import subprocess
+
+from ffmpeg_jobs import add_job_arguments, num_jobs, run_jobs, write_manifest
+from ffmpeg_jobs import probe_frame_shape, write_index
 
 default_format = "png"
 default_qscale_jpg = "4"
 
 def extract_frames(main_data, resolution, format, q, quiet,
-                   transcoded, codec, crf, keyint):
+                   transcoded, codec, crf, keyint, jobs, threads):
 
     if transcoded:
         desc = [resolution, 'scenes']
@@ -63,29 +65,40 @@ def extract_frames(main_data, resolution, format, q, quiet,
     else:
         raise ValueError("Unknown format")
 
-    if quiet:
-        cmdout = subprocess.DEVNULL
-    else:
-        cmdout = None
-
+    pattern = "%05d."+format
+    extract_jobs = []
     for subset_name, subset_dir in [('training', 'train'), ('validation', 'val')]:
         if not os.path.exists(os.path.join(in_path,subset_dir)):
             raise ValueError("No "+subset_name+" data found in "+in_path+", " +
                              "did you run split_scenes.py?")
 
-        for in_file in os.listdir(os.path.join(in_path,subset_dir)):
-            if in_file.endswith('.mp4'):
+        if not os.path.isdir(os.path.join(out_path,subset_dir)):
+            os.makedirs(os.path.join(out_path,subset_dir))
+        for in_file in sorted(os.listdir(os.path.join(in_path,subset_dir))):
+            if in_file.endswith('.mp4') and not in_file.startswith('.'):
                 scene = in_file.split('_')[1].split('.')[0]
                 cur_out_path = os.path.join(out_path,subset_dir,scene)
-                if not os.path.isdir(cur_out_path):
-                    os.makedirs(cur_out_path)
                 cur_in_path = os.path.join(in_path,subset_dir,in_file)
                 cmd = ["ffmpeg", "-n", "-i", cur_in_path]
                 cmd += res_args
                 cmd += codec_args
-                cmd += [os.path.join(cur_out_path, "%05d."+format)]
-                print("Running:", " ".join(cmd))
-                subprocess.run(cmd, stdout=cmdout, stderr=cmdout)
+                cmd += ["-threads", str(threads)]
+                cmd += [os.path.join(cur_out_path, pattern)]
+                extract_jobs.append((cmd, cur_out_path, True))
+    run_jobs(extract_jobs, num_jobs(jobs, threads), quiet)
+
+    for subset_dir in ['train', 'val']:
+        subset_path = os.path.join(out_path,subset_dir)
+        entries = {}
+        shapes = {}
+        for scene in os.listdir(subset_path):
+            scene_path = os.path.join(subset_path, scene)
+            if os.path.isdir(scene_path) and not scene.startswith('.'):
+                entries[scene] = len([f for f in os.listdir(scene_path) if f.endswith('.'+format)])
+                shapes[scene] = (probe_frame_shape(os.path.join(scene_path, pattern % 1))
+                                 if entries[scene] else (0, 0))
+        write_manifest(subset_path, entries, pattern)
+        write_index(subset_path, entries, shapes)
 
 if __name__=='__main__':
     parser = argparse.ArgumentParser()
@@ -108,5 +121,6 @@ if __name__=='__main__':
                         help="crf value of transcoded video to use")
     parser.add_argument('--keyint', type=str, default=None,
                         help="keyframe interval of transcoded video to use")
+    add_job_arguments(parser)
     args = parser.parse_args()
     extract_frames(**vars(args))
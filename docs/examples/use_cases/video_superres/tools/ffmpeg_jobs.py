@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# the file names are shared with the data loaders
+from dataloading.manifest import MANIFEST, INDEX
+
+
+def add_job_arguments(parser):
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="number of ffmpeg processes run at once, "
+                             "by default the number of CPUs divided by --threads")
+    parser.add_argument('--threads', type=int, default=4,
+                        help="number of threads used by each ffmpeg process")
+
+
+def num_jobs(jobs, threads):
+    if jobs:
+        return jobs
+    return max(1, (os.cpu_count() or 1) // threads)
+
+
+def _partial_path(out_path):
+    head, tail = os.path.split(out_path)
+    return os.path.join(head, ".partial." + tail)
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _run(cmd, out_path, make_dir, quiet):
+    # ffmpeg writes to a temporary path that is renamed once it succeeds,
+    # so an existing output is always complete
+    partial_path = _partial_path(out_path)
+    _remove(partial_path)
+    if make_dir:
+        os.makedirs(partial_path)
+        out_arg = os.path.join(partial_path, os.path.basename(cmd[-1]))
+    else:
+        out_arg = partial_path
+    cmd = cmd[:-1] + [out_arg]
+    print("Running:", " ".join(cmd))
+    cmdout = subprocess.DEVNULL if quiet else None
+    result = subprocess.run(cmd, stdout=cmdout, stderr=cmdout)
+    if result.returncode != 0:
+        _remove(partial_path)
+        raise RuntimeError("ffmpeg failed with code %d: %s" % (result.returncode, " ".join(cmd)))
+    os.replace(partial_path, out_path)
+
+
+def run_jobs(jobs, num_jobs, quiet):
+    """Runs ffmpeg commands, at most ``num_jobs`` at once.
+
+    ``jobs`` is a list of ``(cmd, out_path, make_dir)``, where the last element of ``cmd`` is
+    the output of ffmpeg: ``out_path`` itself, or a file pattern inside the ``out_path``
+    directory if ``make_dir`` is set. Jobs with an existing ``out_path`` are skipped.
+    """
+    pending = [job for job in jobs if not os.path.exists(job[1])]
+    skipped = len(jobs) - len(pending)
+    if skipped:
+        print("Skipping %d outputs that already exist" % skipped)
+    with ThreadPoolExecutor(max_workers=num_jobs) as executor:
+        futures = [executor.submit(_run, cmd, out_path, make_dir, quiet)
+                   for cmd, out_path, make_dir in pending]
+        errors = [future.exception() for future in futures]
+    errors = [error for error in errors if error is not None]
+    if errors:
+        raise errors[0]
+
+
+def count_video_frames(path):
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-count_packets",
+           "-show_entries", "stream=nb_read_packets", "-of", "csv=p=0", path]
+    return int(subprocess.check_output(cmd).decode().strip())
+
+
+def probe_frame_shape(path):
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0",
+           "-show_entries", "stream=width,height", "-of", "csv=p=0", path]
+    width, height = subprocess.check_output(cmd).decode().strip().split(",")
+    return int(height), int(width)
+
+
+def write_index(subset_path, entries, shapes):
+    """Writes the frame index of the subset directory.
+
+    ``entries`` maps the scene directories to their frame counts and ``shapes`` to
+    the (height, width) of their frames. The scenes are in the order of the manifest,
+    the ones without frames are left out.
+    """
+    names = sorted(name for name in entries if entries[name] > 0)
+    index = np.zeros(len(names), dtype=[
+        ('name', 'U%d' % max([len(name) for name in names] + [1])),
+        ('start', np.int64),
+        ('frames', np.int64),
+        ('height', np.int32),
+        ('width', np.int32),
+    ])
+    index['name'] = names
+    index['frames'] = [entries[name] for name in names]
+    index['start'][1:] = np.cumsum(index['frames'])[:-1]
+    index['height'] = [shapes[name][0] for name in names]
+    index['width'] = [shapes[name][1] for name in names]
+    tmp_path = os.path.join(subset_path, ".index.tmp.npy")
+    np.save(tmp_path, index)
+    os.replace(tmp_path, os.path.join(subset_path, INDEX))
+
+
+def write_manifest(subset_path, entries, pattern=None):
+    """Writes the manifest of the subset directory.
+
+    ``entries`` is a dict mapping output names (video files or frame directories) to
+    their frame counts, ``pattern`` is the name pattern of the frames in the directories.
+    """
+    manifest = {"entries": [{"name": name, "frames": entries[name]} for name in sorted(entries)]}
+    if pattern is not None:
+        manifest["pattern"] = pattern
+    tmp_path = os.path.join(subset_path, "." + MANIFEST)
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(subset_path, MANIFEST))
@@ -1,12 +1,13 @@
 import argparse
 import os
-import subprocess
+
+from ffmpeg_jobs import add_job_arguments, num_jobs, run_jobs, count_video_frames, write_manifest
 
 default_codec = "h264"
 default_crf = "18"
 default_keyint = "4"
 
-def downsample_scenes(main_data, resolution, codec, crf, keyint, quiet):
+def downsample_scenes(main_data, resolution, codec, crf, keyint, quiet, jobs, threads):
 
     desc = [resolution, 'scenes']
     if not codec:
@@ -57,25 +58,28 @@ def downsample_scenes(main_data, resolution, codec, crf, keyint, quiet):
     else:
         raise ValueError("Unknown codec")
 
-    if quiet:
-        cmdout = subprocess.DEVNULL
-    else:
-        cmdout = None
-
     def transcode(in_path, out_path):
         cmd = ["ffmpeg", "-y", "-i", in_path]
         cmd += res_args
         cmd += codec_args
+        cmd += ["-threads", str(threads)]
         cmd += ["-crf", crf, "-an", out_path]
-        print("Running:", " ".join(cmd))
-        subprocess.run(cmd, stdout=cmdout, stderr=cmdout)
+        return (cmd, out_path, False)
 
+    transcode_jobs = []
     for subset in ['train', 'val']:
-        for in_file in os.listdir(os.path.join(main_data,'orig','scenes',subset)):
+        for in_file in sorted(os.listdir(os.path.join(main_data,'orig','scenes',subset))):
             if in_file.endswith('.mp4'):
                 in_path = os.path.join(main_data,'orig','scenes',subset,in_file)
                 out_path = os.path.join(main_out_path,subset,in_file)
-                transcode(in_path, out_path)
+                transcode_jobs.append(transcode(in_path, out_path))
+    run_jobs(transcode_jobs, num_jobs(jobs, threads), quiet)
+
+    for subset in ['train', 'val']:
+        subset_path = os.path.join(main_out_path,subset)
+        entries = {f: count_video_frames(os.path.join(subset_path, f))
+                   for f in os.listdir(subset_path) if f.endswith('.mp4') and not f.startswith('.')}
+        write_manifest(subset_path, entries)
 
 if __name__=='__main__':
     parser = argparse.ArgumentParser()
@@ -91,6 +95,7 @@ if __name__=='__main__':
                         help="keyframe interval")
     parser.add_argument('--quiet', action='store_true',
                         help="Suppress ffmpeg output")
+    add_job_arguments(parser)
     args = parser.parse_args()
     assert args.main_data is not None, 'Provide --main_data path to root data directory containing split scenes'
     assert args.resolution in ['4K', '1080p', '720p', '540p'], '--resolution must be one of 1080p, 720p, 540p'
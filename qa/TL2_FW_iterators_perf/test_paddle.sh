@@ -12,6 +12,9 @@ test_body() {
     for fw in "paddle"; do
         python test_RN50_data_fw_iterators.py --framework ${fw} --gpus ${NUM_GPUS} -b 13 \
             --workers 3 --prefetch 2 --epochs 3
+        # reused output tensors skip the allocation, compare the throughput with the run above
+        python test_RN50_data_fw_iterators.py --framework ${fw} --gpus ${NUM_GPUS} -b 13 \
+            --workers 3 --prefetch 2 --epochs 3 --tensor_pool_size 3
     done
 }
 
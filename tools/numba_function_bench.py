@@ -0,0 +1,76 @@
+# Copyright (c) 2021, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description='NumbaFunction pipeline construction benchmark')
+parser.add_argument('-n', dest='num_builds', help='number of pipelines built in one process',
+                    default=10, type=int)
+parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+args = parser.parse_args()
+
+
+def construct_pipelines(num_builds):
+    import numpy as np
+    import nvidia.dali.fn as fn
+    import nvidia.dali.types as types
+    from nvidia.dali import pipeline_def
+    from nvidia.dali.plugin.numba.fn.experimental import numba_function
+
+    def invert(out0, in0):
+        for out_sample, in_sample in zip(out0, in0):
+            out_sample[:] = 255 - in_sample
+
+    @pipeline_def(batch_size=8, num_threads=1, device_id=None)
+    def pipe():
+        data = fn.external_source(lambda: [np.zeros((16, 16, 3), dtype=np.uint8)] * 8, batch=True)
+        return numba_function(data, run_fn=invert, out_types=[types.UINT8],
+                              in_types=[types.UINT8], outs_ndim=[3], ins_ndim=[3],
+                              batch_processing=True)
+
+    times = []
+    for _ in range(num_builds):
+        start = time.perf_counter()
+        p = pipe()
+        p.build()
+        times.append(time.perf_counter() - start)
+        p.run()
+    return times
+
+
+if args.child:
+    times = construct_pipelines(args.num_builds)
+    print(" ".join(str(t) for t in times))
+    sys.exit(0)
+
+
+def run_process(cache_dir):
+    env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+    out = subprocess.check_output([sys.executable, __file__, '--child', '-n', str(args.num_builds)],
+                                  env=env)
+    return [float(t) for t in out.decode().split()]
+
+
+with tempfile.TemporaryDirectory() as cache_dir:
+    cold = run_process(cache_dir)
+    warm = run_process(cache_dir)
+print("New process, empty disk cache, first build: {:.3f} s".format(cold[0]))
+print("New process, populated disk cache, first build: {:.3f} s".format(warm[0]))
+print("Subsequent builds in the same process (in-memory cache): {:.6f} s on average".format(
+      sum(cold[1:]) / max(1, len(cold) - 1)))
@@ -0,0 +1,67 @@
+# Copyright (c) 2021, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nvidia.dali.pipeline import pipeline_def
+import nvidia.dali.fn as fn
+import numpy as np
+import argparse
+import time
+
+parser = argparse.ArgumentParser(description='Parallel CPU PythonFunction benchmark')
+parser.add_argument('-b', dest='batch_size', help='batch size', default=32, type=int)
+parser.add_argument('-s', dest='sample_size', help='size of a sample (square side)', default=512, type=int)
+parser.add_argument('-i', dest='iterations', help='number of measured iterations', default=20, type=int)
+parser.add_argument('-w', dest='workers', help='comma separated numbers of Python workers to test',
+                    default='0,1,2,4,8', type=str)
+parser.add_argument('--py_start_method', default='fork', choices=['fork', 'spawn'])
+args = parser.parse_args()
+
+
+def augment(image):
+    # deliberately Python/NumPy heavy, per-sample work
+    out = image.astype(np.float32)
+    for _ in range(4):
+        out = np.sqrt(out * out + 1.0)
+    return out.astype(np.uint8)
+
+
+def get_batch():
+    return [np.full((args.sample_size, args.sample_size, 3), i, dtype=np.uint8)
+            for i in range(args.batch_size)]
+
+
+@pipeline_def(batch_size=args.batch_size, num_threads=1, device_id=None,
+              exec_async=False, exec_pipelined=False)
+def pipe(parallel):
+    data = fn.external_source(source=get_batch, batch=True)
+    return fn.python_function(data, function=augment, parallel=parallel)
+
+
+def run(py_num_workers):
+    p = pipe(parallel=py_num_workers > 0, py_num_workers=py_num_workers,
+             py_start_method=args.py_start_method)
+    p.build()
+    p.run()  # warmup
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        p.run()
+    return args.iterations * args.batch_size / (time.perf_counter() - start)
+
+
+baseline = None
+for py_num_workers in [int(w) for w in args.workers.split(',')]:
+    throughput = run(py_num_workers)
+    baseline = baseline or throughput
+    print("py_num_workers={}: {:.1f} samples/s (x{:.2f})".format(
+        py_num_workers, throughput, throughput / baseline))
@@ -17,21 +17,30 @@
 
 import os
 import time
-import ctypes
-from mxnet.base import _LIB
-from mxnet.base import check_call
-import mxnet as mx
+import mmap
+import struct
 import argparse
+from multiprocessing import Pool
 
-class IndexCreator(mx.recordio.MXRecordIO):
+# RecordIO chunk header: uint32 magic, uint32 with 3-bit continuation flag and 29-bit length
+_kMagic = 0xced7230a
+_HEADER = struct.Struct('<II')
+_LENGTH_MASK = (1 << 29) - 1
+# Continuation flags: whole record, first, middle and last chunk of the split record
+_FULL_RECORD, _FIRST_CHUNK = 0, 1
+
+
+class IndexCreator(object):
     """Reads `RecordIO` data format, and creates index file
     that enables random access.
 
+    The record file is scanned directly (memory mapped), MXNet is not needed.
+
     Example usage:
     ----------
     >>> creator = IndexCreator('data/test.rec','data/test.idx')
-    >>> record.create_index()
-    >>> record.close()
+    >>> creator.create_index()
+    >>> creator.close()
     >>> !ls data/
     test.rec  test.idx
 
@@ -45,28 +54,72 @@ class IndexCreator(mx.recordio.MXRecordIO):
         Data type for keys (optional, default = int).
     """
     def __init__(self, uri, idx_path, key_type=int):
+        self.uri = uri
         self.key_type = key_type
-        self.fidx = None
         self.idx_path = idx_path
-        super(IndexCreator, self).__init__(uri, 'r')
+        self.frec = None
+        self.fidx = None
+        self.data = None
+        self.pos = 0
+        self.is_open = False
+        self.open()
 
     def open(self):
-        super(IndexCreator, self).open()
+        """Opens the record and index files and maps the record file."""
+        self.frec = open(self.uri, 'rb')
+        size = os.fstat(self.frec.fileno()).st_size
+        self.data = mmap.mmap(self.frec.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
         self.fidx = open(self.idx_path, 'w')
+        self.pos = 0
+        self.is_open = True
 
     def close(self):
         """Closes the record and index files."""
         if not self.is_open:
             return
-        super(IndexCreator, self).close()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.frec.close()
         self.fidx.close()
+        self.is_open = False
+
+    def reset(self):
+        """Resets the read head of the record file and truncates the index file."""
+        self.close()
+        self.open()
 
     def tell(self):
         """Returns the current position of read head.
         """
-        pos = ctypes.c_size_t()
-        check_call(_LIB.MXRecordIOReaderTell(self.handle, ctypes.byref(pos)))
-        return pos.value
+        return self.pos
+
+    def _read_chunk_header(self, pos):
+        """Returns the continuation flag and the position of the next chunk"""
+        if pos + _HEADER.size > len(self.data):
+            raise ValueError("Truncated record header at position %d in %s" % (pos, self.uri))
+        magic, lrecord = _HEADER.unpack_from(self.data, pos)
+        if magic != _kMagic:
+            raise ValueError("Invalid RecordIO magic number at position %d in %s" % (pos, self.uri))
+        length = lrecord & _LENGTH_MASK
+        # the chunks are aligned to 4 bytes
+        next_pos = pos + _HEADER.size + ((length + 3) & ~3)
+        if next_pos > len(self.data):
+            raise ValueError("Truncated record at position %d in %s" % (pos, self.uri))
+        return lrecord >> 29, next_pos
+
+    def skip_record(self):
+        """Moves the read head past the next record, the record may consist of many chunks.
+        Returns False at the end of the file."""
+        if self.pos >= len(self.data):
+            return False
+        cflag, self.pos = self._read_chunk_header(self.pos)
+        if cflag == _FIRST_CHUNK:
+            while cflag != 3:
+                cflag, self.pos = self._read_chunk_header(self.pos)
+        elif cflag != _FULL_RECORD:
+            raise ValueError("Unexpected continuation chunk at position %d in %s" %
+                             (self.pos, self.uri))
+        return True
 
     def create_index(self):
         """Creates the index file from open record file
@@ -74,17 +127,33 @@ class IndexCreator(mx.recordio.MXRecordIO):
         self.reset()
         counter = 0
         pre_time = time.time()
+        lines = []
         while True:
             if counter % 1000 == 0:
                 cur_time = time.time()
                 print('time:', cur_time - pre_time, ' count:', counter)
+                self.fidx.write(''.join(lines))
+                lines = []
             pos = self.tell()
-            cont = self.read()
-            if cont is None:
+            if not self.skip_record():
                 break
             key = self.key_type(counter)
-            self.fidx.write('%s\t%d\n'%(str(key), pos))
+            lines.append('%s\t%d\n'%(str(key), pos))
             counter = counter + 1
+        self.fidx.write(''.join(lines))
+
+
+def create_index(record, index):
+    creator = IndexCreator(record, index)
+    try:
+        creator.create_index()
+    finally:
+        creator.close()
+
+
+def _create_index(paths):
+    create_index(*paths)
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -92,16 +161,26 @@ def parse_args():
         description='Create an index file from .rec file')
     parser.add_argument('record', help='path to .rec file.')
     parser.add_argument('index', help='path to index file.')
+    parser.add_argument('more', nargs='*', metavar='record index',
+                        help='more pairs of .rec and index files.')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of record files indexed in parallel.')
     args = parser.parse_args()
-    args.record = os.path.abspath(args.record)
-    args.index = os.path.abspath(args.index)
+    if len(args.more) % 2 != 0:
+        parser.error('Expected pairs of .rec and index files.')
+    files = [os.path.abspath(f) for f in [args.record, args.index] + args.more]
+    args.paths = list(zip(files[::2], files[1::2]))
     return args
 
 def main():
     args = parse_args()
-    creator = IndexCreator(args.record, args.index)
-    creator.create_index()
-    creator.close()
+    if args.jobs > 1 and len(args.paths) > 1:
+        with Pool(min(args.jobs, len(args.paths))) as pool:
+            for _ in pool.imap_unordered(_create_index, args.paths):
+                pass
+    else:
+        for record, index in args.paths:
+            create_index(record, index)
 
 if __name__ == '__main__':
     main()
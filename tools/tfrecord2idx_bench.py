@@ -0,0 +1,78 @@
+# Copyright (c) 2021, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description='tfrecord2idx benchmark on synthetic TFRecord shards')
+parser.add_argument('-n', dest='num_shards', help='number of shards', default=4, type=int)
+parser.add_argument('-s', dest='shard_size', help='size of a shard in MB', default=2048, type=int)
+parser.add_argument('-r', dest='record_size', help='size of a record payload in KB', default=100, type=int)
+parser.add_argument('-j', dest='jobs', help='number of parallel jobs', default=os.cpu_count(), type=int)
+parser.add_argument('-d', dest='dir', help='directory for the synthetic shards', default=None)
+parser.add_argument('--crc', choices=['header', 'full'], default=None, help='validate checksums')
+parser.add_argument('--npy', action='store_true', help='write binary index as well')
+args = parser.parse_args()
+
+tfrecord2idx = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tfrecord2idx')
+
+
+def masked_crc32c(data):
+    crc = 0xFFFFFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ (0x82F63B78 if crc & 1 else 0)
+    crc ^= 0xFFFFFFFF
+    return (((crc >> 15) | (crc << 17)) + 0xA282EAD8) & 0xFFFFFFFF
+
+
+def write_shard(path, shard_size, record_size):
+    # the payload is zeroed, the checksums are valid so that --crc reports no errors
+    length = struct.pack('<q', record_size)
+    payload = bytes(record_size)
+    record = length + struct.pack('<I', masked_crc32c(length)) + payload + \
+        struct.pack('<I', masked_crc32c(payload))
+    chunk = record * max(1, (64 << 20) // len(record))
+    with open(path, 'wb') as f:
+        written = 0
+        while written < shard_size:
+            f.write(chunk)
+            written += len(chunk)
+
+
+def run(cmd):
+    start = time.perf_counter()
+    subprocess.check_call(cmd)
+    return time.perf_counter() - start
+
+
+with tempfile.TemporaryDirectory(dir=args.dir) as tmp_dir:
+    shards = [os.path.join(tmp_dir, 'shard_{}.tfrecord'.format(i)) for i in range(args.num_shards)]
+    for shard in shards:
+        write_shard(shard, args.shard_size << 20, args.record_size << 10)
+    files = [name for shard in shards for name in (shard, shard + '.idx')]
+    extra_args = (['--crc', args.crc] if args.crc else []) + (['--npy'] if args.npy else [])
+
+    serial = sum(run([sys.executable, tfrecord2idx] + extra_args + [shard, shard + '.idx'])
+                 for shard in shards)
+    parallel = run([sys.executable, tfrecord2idx, '-j', str(args.jobs)] + extra_args + files)
+    total_mb = args.num_shards * args.shard_size
+    print("Serial, one process per shard: {:.2f} s ({:.0f} MB/s)".format(serial, total_mb / serial))
+    print("Parallel, {} jobs: {:.2f} s ({:.0f} MB/s)".format(args.jobs, parallel, total_mb / parallel))
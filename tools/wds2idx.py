@@ -17,9 +17,10 @@ import os
 import sys
 import time
 import argparse
-import subprocess
-from shutil import which
-import tarfile
+import shutil
+import tempfile
+from glob import glob
+from multiprocessing import Pool
 
 
 class IndexCreator:
@@ -73,62 +74,82 @@ class IndexCreator:
         dot_pos = filepath.find(".", filepath.rfind("/") + 1)
         return filepath[:dot_pos], filepath[dot_pos + 1 :]
 
+    @staticmethod
+    def _parse_str(field):
+        """Decodes null-terminated string field of the tar header"""
+        null_pos = field.find(b"\0")
+        if null_pos != -1:
+            field = field[:null_pos]
+        return field.decode("utf-8", "surrogateescape")
+
+    @staticmethod
+    def _parse_number(field):
+        """Decodes numeric field of the tar header, either octal or GNU base-256 encoded"""
+        if field[0] & 0x80:
+            value = int.from_bytes(field[1:], "big")
+            return value - (1 << (8 * (len(field) - 1))) if field[0] & 0x40 else value
+        field = field.strip(b" \0")
+        return int(field, 8) if field else 0
+
+    @staticmethod
+    def _parse_pax(data):
+        """Parses the records (`<length> <key>=<value>\\n`) of the PAX extended header"""
+        records = {}
+        pos = 0
+        while pos < len(data) and data[pos:pos + 1] != b"\0":
+            space = data.index(b" ", pos)
+            length = int(data[pos:space])
+            key, value = data[space + 1:pos + length - 1].split(b"=", 1)
+            records[key.decode("utf-8")] = value.decode("utf-8", "surrogateescape")
+            pos += length
+        return records
+
     def _get_data_tar(self):
         """Retreives the data about the offset, name and size of each component
-        using the gnu tar utility, while also filtering out non-file entries"""
-
-        tar_blocks_proc = subprocess.Popen(
-            ["tar", "--list", "--block-num", "--file", self.uri],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        tar_types_sizes_proc = subprocess.Popen(
-            ["tar", "--verbose", "--list", "--file", self.uri],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-
-        tar_blocks = tar_blocks_proc.communicate()[0].split(b"\n")  # block <n>: <filepath>
-        tar_types_sizes = tar_types_sizes_proc.communicate()[0].split(
-            b"\n"
-        )  # <type>... <size> <date> <name>
-
-        # Extracting
-        for blocks_line, next_blocks_line, types_sizes_line in zip(tar_blocks, tar_blocks[1:], tar_types_sizes):
-            if not blocks_line or not types_sizes_line:
-                continue
-
-            name = str(blocks_line[blocks_line.find(b":") + 2 :], "ascii")
-            entry_type = types_sizes_line[0:1]
-
-            if entry_type != b"-":
-                continue
-
-            offset = int(next_blocks_line[next_blocks_line.find(b"block") + 6 : next_blocks_line.find(b":")]) * 512
-            size = types_sizes_line[: -len(name)]
-            size = size[: size.rfind(b"-") - 8]  # "... <size> 20yy-mm-...."
-            size = int(size[size.rfind(b" ") :])
-            offset -= size
-            offset -= offset % 512
-
-            yield offset, name, size
-
-    def _get_data_tarfile(self):
-        """Retreives the data about the offset, name and size of each component
-        using the tarfile module, while also filtering out non-file entries
-        Intended as a fallback for the gnu tar version (since it is much slower)"""
-
-        print(
-            "Warning: tar utility not found. Falling back to tarfile."
-            + " Processing will most likely take much longer",
-            file=sys.stderr,
-        )
-        farchive = tarfile.open(self.uri)
-        for member in iter(farchive):
-            if member.type != tarfile.REGTYPE:
-                continue
-            offset = farchive.fileobj.tell()
-            yield offset, member.name, member.size
+        by parsing the tar headers, while also filtering out non-file entries.
+
+        Only the 512-byte headers (and the GNU long name and PAX extended headers) are read,
+        the bodies of the files are skipped."""
+        block_size = IndexCreator.tar_block_size
+        long_name = None
+        pax_records = {}
+        with open(self.uri, "rb") as farchive:
+            while True:
+                header = farchive.read(block_size)
+                if len(header) < block_size or header.count(b"\0") == block_size:
+                    break  # end of the archive
+                name = IndexCreator._parse_str(header[0:100])
+                size = IndexCreator._parse_number(header[124:136])
+                entry_type = header[156:157]
+                if header[257:263] == b"ustar\0":
+                    # POSIX ustar splits the long paths into prefix and name
+                    prefix = IndexCreator._parse_str(header[345:500])
+                    if prefix:
+                        name = prefix + "/" + name
+                offset = farchive.tell()
+                blocks_end = offset + (size + block_size - 1) // block_size * block_size
+
+                if entry_type == b"L":  # GNU long name of the next entry
+                    long_name = IndexCreator._parse_str(farchive.read(size))
+                elif entry_type == b"x":  # PAX extended header of the next entry
+                    pax_records = IndexCreator._parse_pax(farchive.read(size))
+                elif entry_type in (b"g", b"K"):  # PAX global header, GNU long link name
+                    pass
+                else:
+                    if long_name is not None:
+                        name = long_name
+                    if "path" in pax_records:
+                        name = pax_records["path"]
+                    if "size" in pax_records:
+                        size = int(pax_records["size"])
+                        blocks_end = offset + (size + block_size - 1) // block_size * block_size
+                    long_name = None
+                    pax_records = {}
+                    is_file = entry_type in (b"0", b"7") or \
+                        (entry_type == b"\0" and not name.endswith("/"))
+                    if is_file:
+                        yield offset, name, size
+                farchive.seek(blocks_end)
 
     def create_index(self):
         """Creates the index file from a tar archive"""
@@ -140,71 +161,121 @@ class IndexCreator:
 
         print(f"time: {time.time() - pre_time:.2f} count: {counter} stage: collect")
 
-        # Aggregates extensions in samples
-        aggregated_data = []
+        # Aggregates extensions in samples, the samples are streamed to the temporary file,
+        # as the number of samples is written at the beginning of the index
+        num_samples = 0
+        bundle = []
         last_basename = None
 
-        for offset, name, size in (
-            self._get_data_tar() if which("tar") is not None else self._get_data_tarfile()
-        ):
-            if counter % report_step == 0 and counter > 0:
-                cur_time = time.time()
-                print(f"time: {cur_time - pre_time:.2f} count: {counter} stage: collect")
-            counter += 1
-
-            basename, extension = IndexCreator.split_name(name)
-
-            # check for the files starting with a dot (hidden files)
-            if not basename or basename.endswith("/"):
-                continue
-
-            if last_basename != basename:
-                aggregated_data.append([(extension, offset, size)])
-                last_basename = basename
-            else:
-                aggregated_data[-1].append((extension, offset, size))
-
-        if not aggregated_data:
-            raise ValueError("Webdataset Tar File empty")
-
-        # Constructs the index file out of the aggregated extensions
-        self.fidx.write(f"{IndexCreator.index_file_version} {len(aggregated_data)}\n")
-        for bundle in aggregated_data:
-            if counter % report_step == 0:
-                cur_time = time.time()
-                print(f"time: {cur_time - pre_time:.2f} count: {counter} stage: index")
-            self.fidx.write(" ".join(map(lambda component: " ".join(map(str, component)), bundle)))
-            self.fidx.write("\n")
-            counter += 1
+        with tempfile.TemporaryFile("w+") as samples_file:
+            for offset, name, size in self._get_data_tar():
+                if counter % report_step == 0 and counter > 0:
+                    cur_time = time.time()
+                    print(f"time: {cur_time - pre_time:.2f} count: {counter} stage: collect")
+                counter += 1
+
+                basename, extension = IndexCreator.split_name(name)
+
+                # check for the files starting with a dot (hidden files)
+                if not basename or basename.endswith("/"):
+                    continue
+
+                if last_basename != basename:
+                    if bundle:
+                        IndexCreator._write_bundle(samples_file, bundle)
+                        num_samples += 1
+                    bundle = [(extension, offset, size)]
+                    last_basename = basename
+                else:
+                    bundle.append((extension, offset, size))
+
+            if bundle:
+                IndexCreator._write_bundle(samples_file, bundle)
+                num_samples += 1
+
+            if not num_samples:
+                raise ValueError("Webdataset Tar File empty")
+
+            # Constructs the index file out of the aggregated extensions
+            self.fidx.write(f"{IndexCreator.index_file_version} {num_samples}\n")
+            samples_file.seek(0)
+            shutil.copyfileobj(samples_file, self.fidx)
 
         cur_time = time.time()
         print(f"time: {cur_time - pre_time:.2f} count: {counter} stage: done")
 
+    @staticmethod
+    def _write_bundle(f, bundle):
+        f.write(" ".join(map(lambda component: " ".join(map(str, component)), bundle)))
+        f.write("\n")
+
+
+def default_index_path(archive, index_dir=None):
+    """Index path next to the archive (or in `index_dir`) with the `.idx` extension"""
+    index = archive[: archive.find(".", archive.rfind("/") + 2)] + ".idx"
+    if index_dir is not None:
+        index = os.path.join(index_dir, os.path.basename(index))
+    return index
+
+
+def create_index(archive, index):
+    creator = IndexCreator(archive, index)
+    try:
+        creator.create_index()
+    finally:
+        creator.close()
+
+
+def _create_index(paths):
+    create_index(*paths)
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
         description="Creates a webdataset index file for the use with the fn.readers.webdataset from DALI.",
     )
-    parser.add_argument("archive", help="path to .tar file.")
+    parser.add_argument(
+        "archive",
+        help="path to .tar file or to a directory, in which case every .tar file in it is indexed.",
+    )
     parser.add_argument(
         "index",
-        help="path to index file",
+        help="path to index file (or to the directory for the index files)",
         nargs="?",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="number of archives indexed in parallel, when indexing a directory",
+    )
     args = parser.parse_args()
-    if args.index is None:
-        args.index = args.archive[: args.archive.find(".", args.archive.rfind("/") + 2)] + ".idx"
     args.archive = os.path.abspath(args.archive)
-    args.index = os.path.abspath(args.index)
+    if os.path.isdir(args.archive):
+        args.archives = sorted(glob(os.path.join(args.archive, "*.tar")))
+        index_dir = os.path.abspath(args.index) if args.index is not None else args.archive
+        os.makedirs(index_dir, exist_ok=True)
+        args.indices = [default_index_path(archive, index_dir) for archive in args.archives]
+    else:
+        if args.index is None:
+            args.index = default_index_path(args.archive)
+        args.archives = [args.archive]
+        args.indices = [os.path.abspath(args.index)]
     return args
 
 
 def main():
     args = parse_args()
-    creator = IndexCreator(args.archive, args.index)
-    creator.create_index()
-    creator.close()
+    paths = list(zip(args.archives, args.indices))
+    if args.jobs > 1 and len(paths) > 1:
+        with Pool(min(args.jobs, len(paths))) as pool:
+            for _ in pool.imap_unordered(_create_index, paths):
+                pass
+    else:
+        for archive, index in paths:
+            create_index(archive, index)
 
 
 if __name__ == "__main__":